@@ -11,6 +11,8 @@ from alembic import context
 from app.models.base import Base
 from app.models.user import User
 from app.models.kudos import Kudos
+from app.models.reaction import Reaction
+from app.models.reaction_count import ReactionCount
 from app.core.config import settings
 
 # this is the Alembic Config object, which provides
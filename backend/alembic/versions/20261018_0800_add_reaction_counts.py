@@ -0,0 +1,44 @@
+"""add_reaction_counts_table
+
+Revision ID: 20261018080000
+Revises: 20250728000001
+Create Date: 2026-10-18 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261018080000'
+down_revision = '20250728000001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('reaction_counts',
+    sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('kudos_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('reaction_type', sa.String(length=10), nullable=False),
+    sa.Column('count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.ForeignKeyConstraint(['kudos_id'], ['kudos.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kudos_id', 'reaction_type', name='uq_reaction_counts_kudos_type')
+    )
+    
+    # Backfill counters from existing reactions
+    op.execute(
+        """
+        INSERT INTO reaction_counts (kudos_id, reaction_type, count)
+        SELECT kudos_id, reaction_type, count(*)
+        FROM reactions
+        GROUP BY kudos_id, reaction_type
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reaction_counts')
@@ -0,0 +1,52 @@
+"""add_reaction_and_keyset_indexes
+
+Revision ID: 20261018090000
+Revises: 20261018080000
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261018090000'
+down_revision = '20261018080000'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns); built with CREATE INDEX CONCURRENTLY so writes to
+# the tables keep flowing while the indexes build
+NEW_INDEXES = [
+    # Reaction lookups by kudos_id alone; uq_user_kudos_reaction leads with user_id
+    ('ix_reactions_kudos_type_user', 'reactions', ['kudos_id', 'reaction_type', 'user_id']),
+    # Keyset pagination orders by (created_at, id)
+    ('ix_kudos_created_at_id', 'kudos', ['created_at', 'id']),
+    ('ix_kudos_receiver_created_at', 'kudos', ['receiver_id', 'created_at', 'id']),
+    ('ix_users_created_at_id', 'users', ['created_at', 'id']),
+]
+
+# Prefixes of the new kudos indexes
+OLD_INDEXES = [
+    ('ix_kudos_created_at', 'kudos', ['created_at']),
+    ('ix_kudos_receiver_id', 'kudos', ['receiver_id']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in NEW_INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True
+            )
+        for name, table, _ in OLD_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in OLD_INDEXES:
+            op.create_index(
+                name, table, columns, postgresql_concurrently=True, if_not_exists=True
+            )
+        for name, table, _ in reversed(NEW_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,50 @@
+"""add_kudos_search
+
+Revision ID: 20261018120000
+Revises: 20261018090000
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20261018120000'
+down_revision = '20261018090000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A stored generated column rewrites kudos under an ACCESS EXCLUSIVE lock,
+    # so writes to it pause while this runs; schedule it for a quiet window
+    op.add_column(
+        'kudos',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', message)", persisted=True),
+        ),
+    )
+    # CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_kudos_search_vector',
+            'kudos',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_kudos_search_vector',
+            table_name='kudos',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('kudos', 'search_vector')
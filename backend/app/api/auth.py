@@ -1,21 +1,19 @@
 from datetime import timedelta
-from typing import Annotated
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-
-from app.core.auth import (
-    ACCESS_TOKEN_EXPIRE_MINUTES,
-    create_access_token,
-    get_password_hash,
-    verify_password,
-    verify_token,
-)
-from app.graphql.sync_db import get_sync_db
-from app.graphql.sync_repositories import sync_user_repository
+from sqlalchemy.exc import IntegrityError
+
+from app.core.auth import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token
+from app.core.cache import cache
+from app.core.middleware import get_user_for_token_async
+from app.core.password_hashing import password_hasher
+from app.db.session import async_session_factory
 from app.models.user import User
+from app.repository.user_repository import user_repository
 from app.schemas.auth import Token, UserLogin, UserRegister, UserResponse
+from app.services.user_service import UserService
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -23,20 +21,18 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> User:
     """Get the current authenticated user from JWT token."""
-    token_data = verify_token(token)
-    with get_sync_db() as db:
-        user = sync_user_repository.get(db, id=token_data.user_id)
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Inactive user"
-            )
+    user = await get_user_for_token_async(token)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
     return user
 
 
@@ -50,78 +46,112 @@ async def get_current_active_user(
 
 
 @router.post("/register", response_model=UserResponse)
-def register_user(user_data: UserRegister):
+async def register_user(user_data: UserRegister):
     """Register a new user."""
-    with get_sync_db() as db:
-        # Check if user already exists
-        existing_user = sync_user_repository.get_by_email(db, email=user_data.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-        
-        # Create new user
-        hashed_password = get_password_hash(user_data.password)
-        new_user = User(
-            email=user_data.email,
-            name=user_data.name,
-            password_hash=hashed_password,
-            is_active=True
-        )
-        created_user = sync_user_repository.create(db, new_user)
-        
-        return UserResponse(
-            id=str(created_user.id),
-            email=created_user.email,
-            name=created_user.name,
-            avatar_url=created_user.avatar_url,
-            is_active=created_user.is_active
-        )
+    # Sessions are opened around the queries only: a connection held while
+    # the password is hashed would sit idle in a transaction for the whole wait
+    async with async_session_factory() as db:
+        existing_user = await user_repository.get_by_email(db, email=user_data.email)
+    if existing_user:
+        raise _email_taken()
+
+    # Create new user
+    hashed_password = await password_hasher.hash(user_data.password)
+    new_user = User(
+        email=user_data.email,
+        name=user_data.name,
+        password_hash=hashed_password,
+        is_active=True
+    )
+    async with async_session_factory() as db:
+        db.add(new_user)
+        try:
+            # Commit before invalidating, or a concurrent read could cache the
+            # old user lists under the new generation
+            await db.commit()
+        except IntegrityError:
+            # Registered by a concurrent request while this one was hashing
+            raise _email_taken()
+    await cache.invalidate_async()
+
+    return UserResponse(
+        id=str(new_user.id),
+        email=new_user.email,
+        name=new_user.name,
+        avatar_url=new_user.avatar_url,
+        is_active=new_user.is_active
+    )
+
+
+def _email_taken() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Email already registered"
+    )
+
+
+async def authenticate(email: str, password: str) -> Optional[User]:
+    """Check credentials, upgrading the stored hash when the hashing policy changed.
+
+    No session is open while the password is verified.
+    """
+    async with async_session_factory() as db:
+        user = await user_repository.get_by_email(db, email=email)
+    if not user:
+        return None
+    valid, new_hash = await password_hasher.verify(password, user.password_hash)
+    if not valid:
+        return None
+    if new_hash:
+        async with async_session_factory() as db:
+            db.add(user)
+            user.password_hash = new_hash
+            await db.commit()
+    return user
 
 
 @router.post("/login", response_model=Token)
-def login_user(user_data: UserLogin):
+async def login_user(user_data: UserLogin):
     """Login user and return access token."""
-    with get_sync_db() as db:
-        user = sync_user_repository.get_by_email(db, email=user_data.email)
-        if not user or not verify_password(user_data.password, user.password_hash):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect email or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Inactive user"
-            )
-        
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": str(user.id)}, expires_delta=access_token_expires
+    user = await authenticate(user_data.email, user_data.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
         )
-        return Token(access_token=access_token, token_type="bearer")
+
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
+    )
+    return Token(access_token=access_token, token_type="bearer")
 
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
+async def login_for_access_token(
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+):
     """OAuth2 compatible token endpoint."""
-    with get_sync_db() as db:
-        user = sync_user_repository.get_by_email(db, email=form_data.username)
-        if not user or not verify_password(form_data.password, user.password_hash):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect username or password",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": str(user.id)}, expires_delta=access_token_expires
+    user = await authenticate(form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        return Token(access_token=access_token, token_type="bearer")
+
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
+    )
+    return Token(access_token=access_token, token_type="bearer")
 
 
 @router.get("/me", response_model=UserResponse)
@@ -133,4 +163,20 @@ def get_current_user_info(current_user: Annotated[User, Depends(get_current_acti
         name=current_user.name,
         avatar_url=current_user.avatar_url,
         is_active=current_user.is_active
-    )
\ No newline at end of file
+    )
+
+
+@router.post("/me/deactivate", response_model=UserResponse)
+async def deactivate_current_user(current_user: Annotated[User, Depends(get_current_active_user)]):
+    """Deactivate the current user's account and drop their cached sign-ins."""
+    async with async_session_factory() as db:
+        user = await UserService(db).deactivate_user(current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return UserResponse(
+        id=str(user.id),
+        email=user.email,
+        name=user.name,
+        avatar_url=user.avatar_url,
+        is_active=user.is_active
+    )
@@ -0,0 +1,113 @@
+import secrets
+
+from anyio.to_thread import current_default_thread_limiter
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.middleware import token_user_cache_stats
+from app.core.password_hashing import password_hasher
+from app.db.engines import engines
+from app.graphql.extensions import DocumentCache
+from app.graphql.reaction_buffer import reaction_buffer
+
+router = APIRouter()
+
+
+def _pool_metric(name: str, type: str, help: str, field: str) -> None:
+    @registry.collector(name, type, help)
+    def collect():
+        for engine, stats in engines.stats().items():
+            yield {"engine": engine}, stats[field]
+
+
+_pool_metric("db_pool_capacity", "gauge", "Most connections the pool may open", "capacity")
+_pool_metric("db_pool_checked_out", "gauge", "Connections in use", "checked_out")
+_pool_metric("db_pool_idle", "gauge", "Open connections waiting in the pool", "idle")
+_pool_metric("db_pool_saturation", "gauge", "Connections in use over capacity", "saturation")
+_pool_metric("db_pool_checkouts_total", "counter", "Connections handed out", "checkouts")
+_pool_metric(
+    "db_pool_checkout_timeouts_total", "counter", "Checkouts that gave up waiting", "timeouts"
+)
+_pool_metric(
+    "db_pool_checkout_wait_seconds_total", "counter",
+    "Time spent waiting for a connection", "wait_seconds_total",
+)
+
+
+def _cache_lookups():
+    yield "response", cache.hits, cache.misses
+    yield "graphql_document", DocumentCache.documents.hits, DocumentCache.documents.misses
+    yield ("auth_user", *token_user_cache_stats())
+
+
+@registry.collector("cache_hits_total", "counter", "Cache lookups that found an entry")
+def _cache_hits():
+    for name, hits, _ in _cache_lookups():
+        yield {"cache": name}, hits
+
+
+@registry.collector("cache_misses_total", "counter", "Cache lookups that found nothing")
+def _cache_misses():
+    for name, _, misses in _cache_lookups():
+        yield {"cache": name}, misses
+
+
+@registry.collector("cache_hit_ratio", "gauge", "Share of cache lookups that hit since startup")
+def _cache_hit_ratio():
+    for name, hits, misses in _cache_lookups():
+        yield {"cache": name}, hits / (hits + misses) if hits + misses else 0.0
+
+
+# The thread-pool metrics read the event loop's limiter, which is reachable
+# because they are collected inside the /metrics endpoint
+@registry.collector("threadpool_workers_busy", "gauge", "Worker threads running sync code")
+def _threadpool_busy():
+    yield {}, current_default_thread_limiter().borrowed_tokens
+
+
+@registry.collector("threadpool_workers_total", "gauge", "Worker thread limit")
+def _threadpool_total():
+    yield {}, current_default_thread_limiter().total_tokens
+
+
+@registry.collector("threadpool_queue_depth", "gauge", "Calls waiting for a worker thread")
+def _threadpool_queue():
+    yield {}, current_default_thread_limiter().statistics().tasks_waiting
+
+
+@registry.collector("password_hash_pending", "gauge", "bcrypt calls in the process pool")
+def _password_hash_pending():
+    yield {}, password_hasher.pending
+
+
+@registry.collector("password_hash_rejected_total", "counter", "Sign-ins refused with 503")
+def _password_hash_rejected():
+    yield {}, password_hasher.rejected
+
+
+@registry.collector("reaction_buffer_pending", "gauge", "Reaction toggles not yet written")
+def _reaction_buffer_pending():
+    if reaction_buffer:
+        yield {}, reaction_buffer.stats()["pending"]
+
+
+def require_metrics_token(request: Request) -> None:
+    """Refuse scrapes without METRICS_TOKEN, when one is configured."""
+    if not settings.METRICS_TOKEN:
+        return
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not secrets.compare_digest(request.headers.get("Authorization", "").encode(), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
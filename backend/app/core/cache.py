@@ -0,0 +1,232 @@
+"""
+Shared cache for GraphQL responses and user lookups.
+
+Values live in Redis (`REDIS_URL`) so every uvicorn worker shares them. When
+Redis is unreachable the cache falls back to a per-process LRU and retries
+Redis after a short back-off, so an outage degrades hit rates, not requests.
+
+Entries are invalidated by bumping a generation counter that is part of every
+response key, which drops all cached responses in one round trip.
+
+redis-py blocks until Redis answers, up to its socket timeout. Code running on
+the event loop uses the `*_async` methods, which make the call in the
+threadpool instead.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is a declared dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = "cache:generation"
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with per-entry TTLs."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_matching(self, predicate: Callable[[Any], bool]) -> int:
+        """Delete every entry whose value matches; returns how many were removed."""
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            _, value = self._data.get(key, (0.0, 0))
+            value = int(value) + 1
+            # Counters never expire
+            self._data[key] = (float("inf"), value)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class Cache:
+    """Redis-backed cache with an in-process LRU fallback."""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        *,
+        client: Any = None,
+        maxsize: int = 1024,
+        retry_after: float = 30.0,
+    ):
+        if client is None and url and redis is not None:
+            client = redis.Redis.from_url(
+                url, socket_timeout=0.25, socket_connect_timeout=0.25
+            )
+        self._redis = client
+        self._local = LRUCache(maxsize)
+        self._retry_after = retry_after
+        self._down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _client(self):
+        if self._redis is None or time.monotonic() < self._down_until:
+            return None
+        return self._redis
+
+    def _mark_down(self, error: Exception) -> None:
+        if not self._down_until:
+            logger.warning("Redis unavailable, using in-process cache: %s", error)
+        self._down_until = time.monotonic() + self._retry_after
+
+    def _mark_up(self) -> None:
+        if self._down_until:
+            logger.info("Redis reachable again")
+            self._down_until = 0.0
+            # Writes during the outage only bumped the local generation, so
+            # anything Redis still holds from before may be stale
+            self._redis.incr(GENERATION_KEY)
+
+    def _get(self, key: str) -> Optional[str]:
+        client = self._client()
+        if client is not None:
+            try:
+                # First, so a generation read as Redis comes back is already bumped
+                self._mark_up()
+                raw = client.get(key)
+                return raw.decode() if isinstance(raw, bytes) else raw
+            except redis.RedisError as error:
+                self._mark_down(error)
+        return self._local.get(key)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        client = self._client()
+        if client is not None:
+            try:
+                client.set(key, value, px=int(ttl * 1000))
+                self._mark_up()
+                return
+            except redis.RedisError as error:
+                self._mark_down(error)
+        self._local.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        # Always clear the local copy too, it may hold entries from an outage
+        self._local.delete(key)
+        client = self._client()
+        if client is not None:
+            try:
+                client.delete(key)
+                self._mark_up()
+            except redis.RedisError as error:
+                self._mark_down(error)
+
+    def incr(self, key: str) -> int:
+        # Bump the local counter as well so local entries left over from an
+        # earlier outage are never served once Redis goes down again
+        local = self._local.incr(key)
+        client = self._client()
+        if client is not None:
+            try:
+                value = client.incr(key)
+                self._mark_up()
+                return int(value)
+            except redis.RedisError as error:
+                self._mark_down(error)
+        return local
+
+    @property
+    def shared(self) -> bool:
+        """Whether the last operation reached Redis, so workers agree on the generation."""
+        return self._client() is not None
+
+    def generation(self) -> str:
+        """Current invalidation generation, to be embedded in cache keys."""
+        # The local counter is an int
+        return str(self._get(GENERATION_KEY) or 0)
+
+    def invalidate(self) -> str:
+        """Drop every cached response by bumping the generation; returns the new one."""
+        return str(self.incr(GENERATION_KEY))
+
+    async def _off_loop(self, method: Callable, *args) -> Any:
+        # The local LRU never blocks, so without Redis there is nothing to move
+        if self._client() is None:
+            return method(*args)
+        return await run_in_threadpool(method, *args)
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """Async counterpart of get."""
+        return await self._off_loop(self.get, key)
+
+    async def set_async(self, key: str, value: str, ttl: float) -> None:
+        """Async counterpart of set."""
+        await self._off_loop(self.set, key, value, ttl)
+
+    async def delete_async(self, key: str) -> None:
+        """Async counterpart of delete."""
+        await self._off_loop(self.delete, key)
+
+    async def generation_async(self) -> str:
+        """Async counterpart of generation."""
+        return await self._off_loop(self.generation)
+
+    async def invalidate_async(self) -> str:
+        """Async counterpart of invalidate."""
+        return await self._off_loop(self.invalidate)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "redis_up": self._client() is not None}
+
+
+cache = Cache(settings.REDIS_URL, maxsize=settings.CACHE_LOCAL_MAXSIZE)
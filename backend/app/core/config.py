@@ -24,10 +24,83 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     DATABASE_URI: Optional[str] = None
+    # Connections one worker may hold across all its pools, split between the
+    # asyncpg and psycopg2 engines
+    DB_POOL_BUDGET: int = 30
+    DB_POOL_SYNC_SHARE: float = 0.5
+    # Seconds a request waits for a free connection before failing
+    DB_POOL_TIMEOUT: float = 30
+    DB_ECHO: bool = False
+    # Read replicas, in the same form as DATABASE_URI. Reads are routed to
+    # them; a requester who wrote reads from the primary for the sticky window
+    DATABASE_REPLICA_URIS: List[str] = []
+    DB_REPLICA_STICKY_SECONDS: float = 5
+    # Statements slower than this are logged with their parameters; 0 disables
+    DB_SLOW_QUERY_MS: int = 200
+    # Count each request's queries; a statement repeated this often in one
+    # request is logged as a suspected N+1
+    DB_QUERY_STATS_ENABLED: bool = True
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+    
+    # GraphQL
+    # Run resolvers natively on asyncio/asyncpg instead of sync psycopg2 sessions
+    GRAPHQL_ASYNC_RESOLVERS: bool = False
+    # Serve first-page feed requests from an in-process buffer of the newest kudos.
+    # Needs Redis: the buffer only answers while it matches the shared cache generation
+    HOT_FEED_ENABLED: bool = False
+    HOT_FEED_SIZE: int = 500
+    # Parsed and validated documents kept per worker, keyed by query hash
+    GRAPHQL_DOCUMENT_CACHE_SIZE: int = 256
+    # Only execute queries listed in the persisted query manifest (JSON of {sha256: query})
+    GRAPHQL_PERSISTED_QUERIES_ONLY: bool = False
+    GRAPHQL_PERSISTED_QUERIES_MANIFEST: Optional[str] = None
+    # Coalesce reaction toggles in memory and write them in batches
+    REACTION_BUFFER_ENABLED: bool = False
+    REACTION_BUFFER_FLUSH_MS: int = 250
+    REACTION_BUFFER_MAX_PENDING: int = 500
+    # ETags on GraphQL queries sent over GET; a matching If-None-Match gets a 304
+    GRAPHQL_HTTP_CACHE_ENABLED: bool = True
+    # Compress GraphQL responses at least this large (brotli if installed, else gzip); 0 disables
+    GRAPHQL_COMPRESS_MIN_BYTES: int = 1024
+    # searchKudos ranks at most this many of the newest matches by relevance.
+    # It filters the newest SEARCH_SCAN_ROWS kudos first. Terms too rare to
+    # fill the window from them are scanned for again, further back but no
+    # more than SEARCH_MAX_SCAN_ROWS kudos; only rarer terms, or ones too rare
+    # to fill a page newest first, are looked up in the full-text index
+    SEARCH_RANK_WINDOW: int = 1000
+    SEARCH_SCAN_ROWS: int = 10000
+    SEARCH_MAX_SCAN_ROWS: int = 200000
+    SEARCH_QUERY_MAX_LENGTH: int = 200
+    # Most kudos accepted by one sendKudosBatch call
+    KUDOS_BATCH_MAX_SIZE: int = 10000
+    # Messages buffered per subscription before a slow client is dropped
+    SUBSCRIPTION_QUEUE_SIZE: int = 100
     
     # Redis
     REDIS_URL: str = "redis://redis:6379/0"
     
+    # Response and user-lookup caching (Redis, with an in-process LRU fallback)
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_SECONDS: int = 30
+    CACHE_LOCAL_MAXSIZE: int = 1024
+    # Per-process token -> user cache; 0 disables it
+    AUTH_USER_CACHE_TTL_SECONDS: int = 5
+    AUTH_USER_CACHE_MAXSIZE: int = 1024
+    # bcrypt runs in a dedicated process pool; sign-ins beyond the pending limit get a 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    
+    # Prometheus metrics at /metrics, plus the request and resolver timing feeding them.
+    # Off by default; when METRICS_TOKEN is set, scrapes must send it as a bearer token
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: Optional[str] = None
+    # Share of GraphQL operations traced (0 disables tracing). Spans are
+    # appended as OpenTelemetry JSON lines to TRACE_FILE, rotated by size
+    TRACE_SAMPLE_RATE: float = 0.0
+    TRACE_FILE: str = "traces.jsonl"
+    TRACE_FILE_MAX_BYTES: int = 10 * 1024 * 1024
+    TRACE_FILE_BACKUPS: int = 3
+    
     # Environment (optional field)
     ENVIRONMENT: str = "development"
     
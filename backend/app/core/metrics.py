@@ -0,0 +1,163 @@
+"""
+Prometheus metrics, rendered in the text exposition format at `/metrics`.
+
+Only histograms are touched on the request path. Observing costs a bisect
+and two additions under a lock. Everything else (pool usage, thread-pool
+queue depth, cache hit ratios, ...) is read from its owner when `/metrics`
+is scraped, via collectors registered with `registry.collector`.
+"""
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Seconds; Prometheus' defaults plus finer steps at the fast end
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# (labels, value) samples yielded by collectors
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [count per bucket (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self.histograms: List[Histogram] = []
+        # (name, type, help, collect) where collect() yields samples of one metric
+        self.collectors: List[Tuple[str, str, str, Callable[[], Iterable[Sample]]]] = []
+
+    def histogram(self, name: str, help: str, labels: Sequence[str], **kwargs) -> Histogram:
+        histogram = Histogram(name, help, labels, **kwargs)
+        self.histograms.append(histogram)
+        return histogram
+
+    def collector(self, name: str, type: str, help: str):
+        """Register a function yielding the (labels, value) samples of a metric at scrape time."""
+
+        def register(collect: Callable[[], Iterable[Sample]]):
+            self.collectors.append((name, type, help, collect))
+            return collect
+
+        return register
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for histogram in self.histograms:
+            lines.extend(histogram.render())
+        for name, type, help, collect in self.collectors:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {type}")
+            for labels, value in collect():
+                lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+graphql_operation_duration = registry.histogram(
+    "graphql_operation_duration_seconds",
+    "GraphQL operation latency by operation name",
+    ["operation_type", "operation_name"],
+)
+graphql_resolver_duration = registry.histogram(
+    "graphql_resolver_duration_seconds",
+    "Root field resolver latency",
+    ["field"],
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency per route template.
+
+    The route comes from the matched FastAPI route, so `/api/users/{id}`
+    stays one series however many IDs are requested.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status),
+            )
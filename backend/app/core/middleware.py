@@ -1,15 +1,23 @@
-from typing import Optional
+import json
+from typing import Optional, Tuple
+from uuid import UUID
 from fastapi import Request
 from strawberry.types import Info
 
 from app.core.auth import verify_token
+from app.core.cache import LRUCache, cache
+from app.core.config import settings
+from app.core.tracing import traced
+from app.db.routing import on_primary
+from app.graphql.db_context import GraphQLSession
 from app.graphql.sync_db import get_sync_db
 from app.graphql.sync_repositories import sync_user_repository
 from app.models.user import User
+from app.repository.user_repository import user_repository
 
 
-def get_current_user_from_context(info: Info) -> Optional[User]:
-    """Extract current user from GraphQL context."""
+def get_bearer_token(info: Info) -> Optional[str]:
+    """Extract the bearer token from the GraphQL request's Authorization header."""
     request: Request = info.context["request"]
     
     # Get authorization header
@@ -25,17 +33,154 @@ def get_current_user_from_context(info: Info) -> Optional[User]:
     except ValueError:
         return None
     
-    # Verify token and get user
-    try:
-        token_data = verify_token(token)
-        with get_sync_db() as db:
-            user = sync_user_repository.get(db, id=token_data.user_id)
-            if user and user.is_active:
-                return user
-    except Exception:
-        pass
-    
-    return None
+    return token
+
+
+# Context key holding the user resolved for the current request
+CURRENT_USER_KEY = "current_user"
+
+# Token -> user for a few seconds, so bursts of requests from one client skip
+# JWT decoding and the user lookup. This is per process: `invalidate_user`
+# clears the calling worker, others catch up within the TTL.
+_token_users = LRUCache(settings.AUTH_USER_CACHE_MAXSIZE)
+
+
+def _user_cache_key(user_id: UUID) -> str:
+    return f"user:{user_id}"
+
+
+def _dump_user(user: User) -> str:
+    return json.dumps({
+        "id": str(user.id),
+        "email": user.email,
+        "name": user.name,
+        "avatar_url": user.avatar_url,
+        "is_active": user.is_active,
+    })
+
+
+def _load_user(raw: str) -> User:
+    """Rebuild a detached User from its cached columns (no password hash)."""
+    data = json.loads(raw)
+    return User(
+        id=UUID(data["id"]),
+        email=data["email"],
+        name=data["name"],
+        avatar_url=data["avatar_url"],
+        is_active=data["is_active"],
+    )
+
+
+def get_user_cached(user_id: UUID) -> Optional[User]:
+    """Load a user by ID through the shared cache."""
+    if settings.CACHE_ENABLED:
+        cached = cache.get(_user_cache_key(user_id))
+        if cached is not None:
+            return _load_user(cached)
+
+    # Read from the primary, so a user who just signed up is found
+    with on_primary(), get_sync_db() as db:
+        user = sync_user_repository.get(db, id=user_id)
+
+    if user and settings.CACHE_ENABLED:
+        cache.set(_user_cache_key(user_id), _dump_user(user), settings.CACHE_TTL_SECONDS)
+    return user
+
+
+async def get_user_cached_async(user_id: UUID) -> Optional[User]:
+    """Async counterpart of get_user_cached."""
+    if settings.CACHE_ENABLED:
+        cached = await cache.get_async(_user_cache_key(user_id))
+        if cached is not None:
+            return _load_user(cached)
+
+    with on_primary():
+        async with GraphQLSession() as db:
+            user = await user_repository.get(db, user_id)
+
+    if user and settings.CACHE_ENABLED:
+        await cache.set_async(_user_cache_key(user_id), _dump_user(user), settings.CACHE_TTL_SECONDS)
+    return user
+
+
+async def invalidate_user(user_id: UUID) -> None:
+    """Forget cached lookups of a user, e.g. after deactivating them."""
+    _token_users.delete_matching(lambda user: user.id == user_id)
+    await cache.delete_async(_user_cache_key(user_id))
+
+
+def token_user_cache_stats() -> Tuple[int, int]:
+    """Hits and misses of the per-process token -> user cache."""
+    return _token_users.hits, _token_users.misses
+
+
+def get_user_for_token(token: str) -> Optional[User]:
+    """Resolve a bearer token to its user; raises if the token is invalid."""
+    ttl = settings.AUTH_USER_CACHE_TTL_SECONDS
+    if ttl > 0:
+        user = _token_users.get(token)
+        if user is not None:
+            return user
+
+    user = get_user_cached(verify_token(token).user_id)
+    if user is not None and ttl > 0:
+        _token_users.set(token, user, ttl)
+    return user
+
+
+async def get_user_for_token_async(token: str) -> Optional[User]:
+    """Async counterpart of get_user_for_token."""
+    ttl = settings.AUTH_USER_CACHE_TTL_SECONDS
+    if ttl > 0:
+        user = _token_users.get(token)
+        if user is not None:
+            return user
+
+    user = await get_user_cached_async(verify_token(token).user_id)
+    if user is not None and ttl > 0:
+        _token_users.set(token, user, ttl)
+    return user
+
+
+@traced("get_current_user_from_context")
+def get_current_user_from_context(info: Info) -> Optional[User]:
+    """Extract current user from GraphQL context."""
+    # Resolve once per request, every resolver asking again gets the same user
+    if CURRENT_USER_KEY in info.context:
+        return info.context[CURRENT_USER_KEY]
+
+    user = None
+    token = get_bearer_token(info)
+    if token:
+        try:
+            user = get_user_for_token(token)
+        except Exception:
+            pass
+
+    if user is not None and not user.is_active:
+        user = None
+    info.context[CURRENT_USER_KEY] = user
+    return user
+
+
+@traced("get_current_user_from_context")
+async def get_current_user_from_context_async(info: Info) -> Optional[User]:
+    """Extract current user from GraphQL context using the async engine."""
+    if CURRENT_USER_KEY in info.context:
+        return info.context[CURRENT_USER_KEY]
+
+    user = None
+    token = get_bearer_token(info)
+    if token:
+        try:
+            user = await get_user_for_token_async(token)
+        except Exception:
+            pass
+
+    if user is not None and not user.is_active:
+        user = None
+    info.context[CURRENT_USER_KEY] = user
+    return user
 
 
 def require_authenticated_user(info: Info) -> User:
@@ -43,4 +188,12 @@ def require_authenticated_user(info: Info) -> User:
     user = get_current_user_from_context(info)
     if not user:
         raise Exception("Authentication required")
-    return user
\ No newline at end of file
+    return user
+
+
+async def require_authenticated_user_async(info: Info) -> User:
+    """Require authenticated user, raise exception if not found."""
+    user = await get_current_user_from_context_async(info)
+    if not user:
+        raise Exception("Authentication required")
+    return user
@@ -0,0 +1,89 @@
+"""
+Password hashing off the event loop and out of the request thread pool.
+
+bcrypt at 12 rounds costs a few hundred ms of CPU per call. Hashes and
+verifications run in a small dedicated process pool; once
+`PASSWORD_HASH_MAX_PENDING` calls are in flight, further calls are refused
+with 503 instead of queueing behind a login rush.
+"""
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.auth import pwd_context
+from app.core.config import settings
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rejected = 0
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Don't fork a process that is running an event loop and threads
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent sign-ins, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            return await asyncio.wrap_future(self._pool().submit(fn, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    @property
+    def pending(self) -> int:
+        """Hashes and verifications submitted and not finished yet."""
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        """Hash a password."""
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also returns a new hash if the stored one is outdated."""
+        return await self._run(_verify_and_update, password, hashed)
+
+    def start(self) -> None:
+        """Spawn the worker processes ahead of the first sign-in."""
+        pool = self._pool()
+        for future in [pool.submit(int) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
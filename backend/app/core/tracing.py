@@ -0,0 +1,272 @@
+"""
+Sampled request tracing, exported as OpenTelemetry JSON to a local file.
+
+A trace starts with `start_trace`, called by the GraphQL `Tracing` extension
+for a sampled share of operations. While it is open, `span()` blocks and
+`traced` functions record child spans, and `trace_statements` adds one span
+per SQL statement. The current span lives in a context variable, so sync
+resolvers, thread-pool calls and asyncpg's greenlets nest under the request
+that started them. Outside a sampled trace all of these return immediately.
+
+A finished trace is written as one line of OTLP/JSON (`{"resourceSpans":
+[...]}`, the format the Collector's file exporter writes and its otlpjson
+receiver reads) to TRACE_FILE, rotated by size. No collector is needed to
+record; ship or inspect the file later.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+# OTLP status codes
+STATUS_ERROR = 2
+
+# Longest SQL statement kept on a span
+_STATEMENT_LIMIT = 2000
+
+
+class Span:
+    __slots__ = (
+        "trace", "span_id", "parent_id", "name", "kind", "start", "end", "attributes", "error"
+    )
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], kind: int,
+                 attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.end = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.trace.spans.append(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items()],
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+
+class Trace:
+    """Spans of one sampled request, exported together once the root span ends."""
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+
+def _attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class SpanFileExporter:
+    """Append traces as OTLP/JSON lines to a size-rotated file."""
+
+    def __init__(self, path: str, max_bytes: int, backups: int, service_name: str):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.resource = {"attributes": [_attribute("service.name", service_name)]}
+        self._handler: Optional[RotatingFileHandler] = None
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": self.resource,
+                "scopeSpans": [{
+                    "scope": {"name": "app.core.tracing"},
+                    "spans": [span.to_otlp() for span in trace.spans],
+                }],
+            }]
+        }, separators=(",", ":"))
+        with self._lock:
+            if self._handler is None:
+                # Opened on first export, so workers that never sample create no file
+                self._handler = RotatingFileHandler(
+                    self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8"
+                )
+                self._handler.setFormatter(logging.Formatter("%(message)s"))
+            self._handler.emit(logging.makeLogRecord({"msg": line}))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handler is not None:
+                self._handler.close()
+                self._handler = None
+
+
+exporter = SpanFileExporter(
+    settings.TRACE_FILE,
+    settings.TRACE_FILE_MAX_BYTES,
+    settings.TRACE_FILE_BACKUPS,
+    settings.PROJECT_NAME,
+)
+
+
+def enabled() -> bool:
+    return settings.TRACE_SAMPLE_RATE > 0
+
+
+def start_trace(name: str, **attributes: Any) -> Optional[Span]:
+    """Open the root span of a new trace, or None if this request isn't sampled."""
+    if _current.get() is not None or random.random() >= settings.TRACE_SAMPLE_RATE:
+        return None
+    return Span(Trace(), name, None, SERVER, attributes)
+
+
+def end_trace(root: Span, error: Optional[BaseException] = None) -> None:
+    root.finish(error)
+    exporter.export(root.trace)
+
+
+def start_span(name: str, kind: int = INTERNAL, **attributes: Any) -> Optional[Span]:
+    """Open a child of the current span; returns None outside a sampled trace.
+
+    The caller must `finish` it; it does not become the current span.
+    """
+    parent = _current.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+
+@contextmanager
+def activate(span: Optional[Span]) -> Iterator[Optional[Span]]:
+    """Make `span` the parent of spans started in the block."""
+    if span is None:
+        yield None
+        return
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Record the block as a child of the current span, if any."""
+    child = start_span(name, **attributes)
+    if child is None:
+        yield None
+        return
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as error:
+        child.finish(error)
+        raise
+    else:
+        child.finish()
+    finally:
+        _current.reset(token)
+
+
+def traced(name: str):
+    """Decorate a function or coroutine function to record a span per call.
+
+    With tracing disabled the function is returned undecorated.
+    """
+
+    def decorate(fn):
+        if not enabled():
+            return fn
+
+        if iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    child = start_span("db.query", CLIENT)
+    if child is not None:
+        child.attributes.update({
+            "db.system": "postgresql",
+            "db.statement": statement[:_STATEMENT_LIMIT],
+        })
+    conn.info.setdefault("trace_spans", []).append(child)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    child = conn.info["trace_spans"].pop()
+    if child is not None:
+        child.set("db.rows", cursor.rowcount)
+        child.finish()
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("trace_spans"):
+        child = conn.info["trace_spans"].pop()
+        if child is not None:
+            child.finish(exception_context.original_exception)
+
+
+def trace_statements(engine: Engine) -> None:
+    """Add a span per SQL statement sent through `engine` during a sampled trace."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,243 @@
+"""
+Registry of the process's database engines.
+
+Engines are built on first use, not at import time. One asyncpg engine serves
+the REST endpoints, the async GraphQL resolvers and the auth lookups; one
+psycopg2 engine serves the sync GraphQL resolvers and the background
+workers. Each engine's pool is sized from the worker's `DB_POOL_BUDGET`, so
+`pool_size + max_overflow` summed over both never exceeds it. Pools record
+how long checkouts wait, which `stats` reports alongside their saturation
+for `/metrics`. Statements are timed by `app.db.query_stats`, and traced by
+`app.core.tracing` when tracing is on.
+
+With DATABASE_REPLICA_URIS set, each engine gets a replica counterpart per
+URI, with the same pool size as its primary (replicas are separate servers,
+so they don't share its connection budget), and sessions route reads to them
+(see `app.db.routing`).
+"""
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core import tracing
+from app.core.config import settings
+from app.db.query_stats import instrument
+from app.db.routing import RoutingSession
+
+
+class PoolStats:
+    """Checkout counters for one pool; updated from any thread."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.peak_checked_out = 0
+        self._lock = threading.Lock()
+
+    def record(self, waited: float, checked_out: int, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+class _TimedCheckout:
+    """Pool mixin timing each checkout, including waits for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_stats.record(time.perf_counter() - started, 0, timed_out=True)
+            raise
+        self.checkout_stats.record(time.perf_counter() - started, self.checkedout())
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def split_budget(budget: int, sync_share: float) -> Dict[str, int]:
+    """Connections each engine may open; both get at least one."""
+    sync = min(max(round(budget * sync_share), 1), max(budget - 1, 1))
+    return {"async": max(budget - sync, 1), "sync": sync}
+
+
+def _pool_args(connections: int) -> dict:
+    # Keep about two thirds open; the rest are opened for bursts and closed after
+    pool_size = max(math.ceil(connections * 2 / 3), 1)
+    return {
+        "pool_size": pool_size,
+        "max_overflow": connections - pool_size,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+    }
+
+
+def _instrument(engine: Engine) -> None:
+    instrument(engine)
+    if tracing.enabled():
+        tracing.trace_statements(engine)
+
+
+class EngineRegistry:
+    def __init__(
+        self, database_uri: str, budget: int, sync_share: float, replica_uris: Sequence[str] = ()
+    ):
+        self.database_uri = database_uri
+        self.replica_uris = list(replica_uris)
+        self.allotment = split_budget(budget, sync_share)
+        self._async_engine: Optional[AsyncEngine] = None
+        self._sync_engine: Optional[Engine] = None
+        self._async_replicas: List[AsyncEngine] = []
+        self._sync_replicas: List[Engine] = []
+        self._async_sessions: Optional[sessionmaker] = None
+        self._sync_sessions: Optional[sessionmaker] = None
+        self._lock = threading.Lock()
+
+    def _create_async_engine(self, uri: str) -> AsyncEngine:
+        pool = (
+            {"poolclass": NullPool}
+            if settings.TESTING
+            else {"poolclass": InstrumentedAsyncQueuePool, **_pool_args(self.allotment["async"])}
+        )
+        engine = create_async_engine(uri, echo=settings.DB_ECHO, **pool)
+        _instrument(engine.sync_engine)
+        return engine
+
+    def _create_sync_engine(self, uri: str) -> Engine:
+        engine = create_engine(
+            uri.replace("postgresql+asyncpg://", "postgresql://"),
+            echo=settings.DB_ECHO,
+            poolclass=InstrumentedQueuePool,
+            **_pool_args(self.allotment["sync"]),
+        )
+        _instrument(engine)
+        return engine
+
+    def _async(self) -> Tuple[AsyncEngine, sessionmaker]:
+        # Engine and session factory are read under the lock together, so a
+        # concurrent dispose() can't leave a caller holding None
+        with self._lock:
+            if self._async_engine is None:
+                self._async_engine = self._create_async_engine(self.database_uri)
+                self._async_replicas = [self._create_async_engine(uri) for uri in self.replica_uris]
+                routing = {}
+                if self._async_replicas:
+                    routing = {
+                        "sync_session_class": RoutingSession,
+                        "primary": self._async_engine.sync_engine,
+                        "replicas": [engine.sync_engine for engine in self._async_replicas],
+                    }
+                self._async_sessions = sessionmaker(
+                    self._async_engine, class_=AsyncSession, expire_on_commit=False, **routing
+                )
+            return self._async_engine, self._async_sessions
+
+    def _sync(self) -> Tuple[Engine, sessionmaker]:
+        with self._lock:
+            if self._sync_engine is None:
+                self._sync_engine = self._create_sync_engine(self.database_uri)
+                self._sync_replicas = [self._create_sync_engine(uri) for uri in self.replica_uris]
+                routing = {}
+                if self._sync_replicas:
+                    routing = {
+                        "class_": RoutingSession,
+                        "primary": self._sync_engine,
+                        "replicas": self._sync_replicas,
+                    }
+                self._sync_sessions = sessionmaker(
+                    self._sync_engine, expire_on_commit=False, **routing
+                )
+            return self._sync_engine, self._sync_sessions
+
+    def async_engine(self) -> AsyncEngine:
+        return self._async()[0]
+
+    def sync_engine(self) -> Engine:
+        return self._sync()[0]
+
+    def async_session(self) -> AsyncSession:
+        """New asyncpg session; use as `async with engines.async_session() as db`."""
+        return self._async()[1]()
+
+    def sync_session(self) -> Session:
+        """New psycopg2 session."""
+        return self._sync()[1]()
+
+    def _engines(self) -> List[Tuple[str, Optional[Union[Engine, AsyncEngine]]]]:
+        named = [("async", self._async_engine), ("sync", self._sync_engine)]
+        for driver, replicas in (("async", self._async_replicas), ("sync", self._sync_replicas)):
+            named += [(f"{driver}_replica_{i}", engine) for i, engine in enumerate(replicas)]
+        return named
+
+    def stats(self) -> Dict[str, dict]:
+        """Pool occupancy and checkout waits for each engine built so far."""
+        result = {}
+        for name, engine in self._engines():
+            if engine is None:
+                continue
+            pool = engine.pool
+            stats: Optional[PoolStats] = getattr(pool, "checkout_stats", None)
+            if stats is None:
+                continue
+            capacity = self.allotment[name.split("_")[0]]
+            checked_out = pool.checkedout()
+            result[name] = {
+                "capacity": capacity,
+                "checked_out": checked_out,
+                "idle": pool.checkedin(),
+                "saturation": round(checked_out / capacity, 3),
+                "peak_checked_out": stats.peak_checked_out,
+                "checkouts": stats.checkouts,
+                "timeouts": stats.timeouts,
+                "wait_seconds_total": round(stats.wait_seconds, 3),
+                "wait_ms_avg": round(stats.wait_seconds * 1000 / max(stats.checkouts, 1), 3),
+                "wait_ms_max": round(stats.max_wait_seconds * 1000, 3),
+            }
+        return result
+
+    async def dispose(self) -> None:
+        """Close every pooled connection; engines are rebuilt if used again."""
+        with self._lock:
+            built = [engine for _, engine in self._engines() if engine is not None]
+            self._async_engine, self._sync_engine = None, None
+            self._async_replicas, self._sync_replicas = [], []
+            self._async_sessions, self._sync_sessions = None, None
+        for engine in built:
+            if isinstance(engine, AsyncEngine):
+                await engine.dispose()
+            else:
+                engine.dispose()
+
+
+engines = EngineRegistry(
+    settings.DATABASE_URI,
+    settings.DB_POOL_BUDGET,
+    settings.DB_POOL_SYNC_SHARE,
+    settings.DATABASE_REPLICA_URIS,
+)
@@ -0,0 +1,137 @@
+"""
+Per-request SQL accounting.
+
+`instrument` hooks an engine's cursor events to time every statement. Slow
+statements are logged with their bind parameters wherever they run. Inside a
+`track()` block, which `QueryStatsMiddleware` opens around each HTTP request,
+statements are also counted and grouped by text. The same statement sent
+many times in one request is logged as a suspected N+1. In debug mode the
+count and total database time are returned in response headers.
+
+The tracked stats live in a context variable. Sync resolvers, thread-pool
+calls and asyncpg's greenlets all inherit the request's context, so they add
+to the same stats; background workers have none and are only slow-logged.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Longest statement or parameter text put in a log line
+_LOG_LIMIT = 1000
+
+
+class QueryStats:
+    """Statements one request sent, and the time spent waiting on them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements sent at least `threshold` times, most frequent first."""
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+    def summary(self) -> str:
+        return "\n".join(f"{n:>4} x {s}" for s, n in self.statements.most_common())
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track() -> Iterator[QueryStats]:
+    """Count the statements sent by the enclosed code."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _clip(text: str) -> str:
+    return text if len(text) <= _LOG_LIMIT else text[:_LOG_LIMIT] + "..."
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if settings.DB_SLOW_QUERY_MS and elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms): %s parameters=%s",
+            elapsed * 1000, _clip(statement), _clip(repr(parameters)),
+        )
+
+
+def _handle_error(exception_context):
+    # The after hook doesn't run for failed statements; drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def instrument(engine: Engine) -> None:
+    """Time the statements of a sync engine, or of an async engine's `sync_engine`."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def report(stats: QueryStats, what: str) -> None:
+    """Log the statements `what` repeated often enough to suggest an N+1."""
+    for statement, count in stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD):
+        logger.warning("Suspected N+1 in %s: %d x %s", what, count, _clip(statement))
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware tracking the statements each request sends.
+
+    With DEBUG on, responses carry `X-DB-Query-Count` and `X-DB-Time-Ms`
+    covering the queries sent before the response started.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Time-Ms"] = f"{stats.seconds * 1000:.1f}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                report(stats, f"{scope['method']} {scope['path']}")
@@ -0,0 +1,229 @@
+"""
+Read-replica routing for the sync and async sessions.
+
+With DATABASE_REPLICA_URIS set, sessions from the engine registry are
+`RoutingSession`s. A session reads from one replica until it writes; after
+that, and for anything that isn't a plain SELECT (including FOR UPDATE and
+text statements), it uses the primary. Work that must see the primary from
+its first read runs inside `on_primary()`:
+
+- GraphQL mutations (the `ReplicaRouting` extension)
+- REST requests other than GET/HEAD (the middleware)
+- authentication lookups
+
+Read-your-writes: when a session commits a write during a request, the
+requester (keyed by a hash of its Authorization header) is pinned to the
+primary for DB_REPLICA_STICKY_SECONDS. The pin lives in the shared cache, so
+every worker honours it. Responses read from a lagging replica right after
+someone else's write may have been cached under the new generation, so the
+cache is invalidated again once the sticky window has passed.
+
+To try it locally without streaming replication, point
+DATABASE_REPLICA_URIS at a second database on the same server. Reads land
+there, which makes the routing visible (see tests/test_replica_routing.py).
+"""
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Sequence
+
+from sqlalchemy import Select, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import cache
+from app.core.config import settings
+
+
+class Requester:
+    """Who the current request is for, and whether they wrote recently.
+
+    Sessions ask from inside SQLAlchemy, where nothing can be awaited, so the
+    pin is loaded before the request runs and saved before its response
+    starts (see the middleware), never looked up from the event loop.
+    """
+
+    __slots__ = ("actor", "_sticky", "_unsaved")
+
+    def __init__(self, actor: Optional[str]):
+        self.actor = actor
+        self._sticky = False
+        self._unsaved = False
+
+    async def load(self) -> None:
+        if self.actor is not None:
+            self._sticky = await cache.get_async(_sticky_key(self.actor)) is not None
+
+    def sticky(self) -> bool:
+        return self._sticky
+
+    def wrote(self) -> None:
+        if self.actor is not None:
+            self._sticky = self._unsaved = True
+
+    async def save(self) -> None:
+        if self._unsaved:
+            self._unsaved = False
+            await cache.set_async(_sticky_key(self.actor), "1", settings.DB_REPLICA_STICKY_SECONDS)
+
+
+_requester: ContextVar[Optional[Requester]] = ContextVar("db_requester", default=None)
+_force_primary: ContextVar[bool] = ContextVar("db_force_primary", default=False)
+
+
+def _sticky_key(actor: str) -> str:
+    return f"sticky:{actor}"
+
+
+def actor_for(authorization: Optional[str]) -> Optional[str]:
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()[:32]
+
+
+@contextmanager
+def on_primary() -> Iterator[None]:
+    """Route every statement of sessions used in the block to the primary."""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def _reads_from_replica() -> bool:
+    if _force_primary.get():
+        return False
+    requester = _requester.get()
+    return requester is None or not requester.sticky()
+
+
+class _DeferredInvalidation:
+    """Invalidate the cache once no write happened for `delay` seconds."""
+
+    def __init__(self):
+        self._deadline = 0.0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, delay: float) -> None:
+        with self._condition:
+            self._deadline = time.monotonic() + delay
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="replica-cache-invalidation", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self) -> None:
+        with self._condition:
+            while True:
+                while not self._deadline:
+                    self._condition.wait()
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                self._deadline = 0.0
+                self._condition.release()
+                try:
+                    cache.invalidate()
+                finally:
+                    self._condition.acquire()
+
+
+_deferred_invalidation = _DeferredInvalidation()
+
+
+class RoutingSession(Session):
+    """Session sending reads to a replica and writes to the primary."""
+
+    def __init__(self, *args, primary: Engine, replicas: Sequence[Engine], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replicas: List[Engine] = list(replicas)
+        self.replica: Optional[Engine] = None
+        self.wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if not self.wrote:
+            if self._flushing or not _is_plain_select(clause):
+                self.wrote = True
+            elif _reads_from_replica():
+                # Stay on one replica, so the session sees a single snapshot
+                if self.replica is None:
+                    self.replica = random.choice(self.replicas)
+                return self.replica
+        return self.primary
+
+
+def _is_plain_select(clause) -> bool:
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session: RoutingSession) -> None:
+    if not session.wrote:
+        return
+    session.wrote = False
+    session.replica = None
+    requester = _requester.get()
+    if requester is not None:
+        requester.wrote()
+    _deferred_invalidation.schedule(settings.DB_REPLICA_STICKY_SECONDS)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _after_rollback(session: RoutingSession) -> None:
+    session.wrote = False
+    session.replica = None
+
+
+class ReplicaRoutingMiddleware:
+    """Pure ASGI middleware setting up replica routing for each request.
+
+    Requests carrying an Authorization header are keyed by it for stickiness.
+    REST requests that may write (anything but GET and HEAD) use the
+    primary throughout; GraphQL decides per operation.
+    """
+
+    def __init__(self, app: ASGIApp, graphql_path: str = "/graphql"):
+        self.app = app
+        self.graphql_path = graphql_path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+                break
+        requester = Requester(actor_for(authorization))
+        await requester.load()
+
+        async def send_after_saving(message: Message) -> None:
+            # Pinned before the client sees the response, and so before it
+            # can send its next request
+            if message["type"] == "http.response.start":
+                await requester.save()
+            await send(message)
+
+        token = _requester.set(requester)
+        try:
+            if scope["method"] in ("GET", "HEAD") or scope["path"].startswith(self.graphql_path):
+                await self.app(scope, receive, send_after_saving)
+            else:
+                with on_primary():
+                    await self.app(scope, receive, send_after_saving)
+        finally:
+            _requester.reset(token)
+            # Writes committed after the response started
+            await requester.save()
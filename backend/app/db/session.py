@@ -1,24 +1,10 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import declarative_base
 
-from app.core.config import settings
+from app.db.engines import engines
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URI,
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=10,
-    poolclass=NullPool if settings.TESTING else None,
-)
-
-# Create async session factory
-async_session_factory = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+# Create async session factory; the engine is built on first use
+async_session_factory = engines.async_session
 
 # Dependency to get DB session
 async def get_db() -> AsyncSession:
@@ -0,0 +1,274 @@
+"""
+Native asyncio resolvers backed by asyncpg and the async services.
+
+Enabled with `GRAPHQL_ASYNC_RESOLVERS`; the sync resolvers in `schema.py`
+stay the default. Both expose the same GraphQL schema.
+"""
+import strawberry
+from typing import List, Optional
+from uuid import UUID
+
+from strawberry import relay
+from strawberry.types import Info
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.middleware import get_current_user_from_context_async, require_authenticated_user_async
+from app.graphql.batch import KudosBatch, validate_message
+from app.graphql.db_context import GraphQLSession
+from app.graphql.hot_feed import hot_feed
+from app.graphql.loaders import AsyncReactionSummaryLoader
+from app.graphql.reaction_buffer import reaction_buffer
+from app.graphql.selection import FULL_KUDOS_SELECTION, KudosSelection, kudos_selection
+from app.graphql.pubsub import KUDOS_CREATED, REACTION_CHANGED, pubsub
+from app.graphql.pagination import (
+    DEFAULT_PAGE_SIZE,
+    build_connection,
+    clamp_page_size,
+    decode_cursor,
+    decode_search_cursor,
+    encode_search_cursor,
+)
+from app.graphql.types import (
+    Kudos,
+    KudosSearchResult,
+    ReactionChange,
+    ReactionState,
+    SearchOrder,
+    SendKudosInput,
+    SendKudosResult,
+    ToggleReactionInput,
+    User,
+    build_reaction_summaries,
+    to_kudos,
+    to_search_results,
+    to_user,
+)
+from app.models.kudos import Kudos as KudosModel
+from app.repository.kudos_search import clean_query
+from app.schemas.kudos import KudosCreate
+from app.services.kudos_service import KudosService
+from app.services.user_service import UserService
+
+
+async def to_kudos_page(
+    db: AsyncSession,
+    kudos_list: List[KudosModel],
+    user_id: Optional[UUID] = None,
+    selection: KudosSelection = FULL_KUDOS_SELECTION,
+) -> List[Kudos]:
+    if not selection.reactions:
+        return [to_kudos(kudos, selection=selection) for kudos in kudos_list]
+    loader = AsyncReactionSummaryLoader(db, user_id)
+    states = await loader.load_many(kudos.id for kudos in kudos_list)
+    return [
+        to_kudos(kudos, build_reaction_summaries(state), selection)
+        for kudos, state in zip(kudos_list, states)
+    ]
+
+
+async def get_users(info: Info, limit: int = 20) -> List[User]:
+    async with GraphQLSession() as db:
+        users = await UserService(db).get_all_users(limit=limit)
+        return [to_user(user) for user in users]
+
+
+async def get_kudos_received(info: Info, user_id: UUID, limit: int = 20) -> List[Kudos]:
+    selection = kudos_selection(info)
+    async with GraphQLSession() as db:
+        kudos_list = await KudosService(db).get_user_received_kudos(
+            user_id, limit=limit, with_sender=selection.sender, with_receiver=selection.receiver
+        )
+        return await to_kudos_page(db, kudos_list, selection=selection)
+
+
+async def get_kudos_list(info: Info, limit: int = 100) -> List[Kudos]:
+    current_user = await get_current_user_from_context_async(info)
+    user_id = current_user.id if current_user else None
+
+    page = hot_feed.get_page(limit, await cache.generation_async()) if hot_feed else None
+    if page is not None:
+        return [entry.to_kudos(user_id) for entry in page]
+
+    selection = kudos_selection(info)
+    async with GraphQLSession() as db:
+        kudos_list = await KudosService(db).get_kudos_feed(
+            limit=limit, with_sender=selection.sender, with_receiver=selection.receiver
+        )
+        return await to_kudos_page(db, kudos_list, user_id, selection)
+
+
+async def get_users_connection(
+    info: Info, first: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None
+) -> relay.Connection[User]:
+    first = clamp_page_size(first)
+    async with GraphQLSession() as db:
+        users = await UserService(db).get_users_page(limit=first + 1, after=decode_cursor(after))
+        return build_connection(users, first, lambda page: [to_user(user) for user in page])
+
+
+async def get_kudos_connection(
+    info: Info, first: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None
+) -> relay.Connection[Kudos]:
+    current_user = await get_current_user_from_context_async(info)
+    user_id = current_user.id if current_user else None
+    first = clamp_page_size(first)
+
+    page = (
+        hot_feed.get_page(first + 1, await cache.generation_async())
+        if hot_feed and not after
+        else None
+    )
+    if page is not None:
+        return build_connection(page, first, lambda entries: [e.to_kudos(user_id) for e in entries])
+
+    selection = kudos_selection(info, "edges", "node")
+    async with GraphQLSession() as db:
+        kudos_list = await KudosService(db).get_kudos_feed(
+            limit=first + 1,
+            after=decode_cursor(after),
+            with_sender=selection.sender,
+            with_receiver=selection.receiver,
+        )
+        page = await to_kudos_page(db, kudos_list[:first], user_id, selection)
+        return build_connection(kudos_list, first, lambda _: page)
+
+
+async def get_kudos_received_connection(
+    info: Info, user_id: UUID, first: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None
+) -> relay.Connection[Kudos]:
+    first = clamp_page_size(first)
+    selection = kudos_selection(info, "edges", "node")
+    async with GraphQLSession() as db:
+        kudos_list = await KudosService(db).get_user_received_kudos(
+            user_id,
+            limit=first + 1,
+            after=decode_cursor(after),
+            with_sender=selection.sender,
+            with_receiver=selection.receiver,
+        )
+        page = await to_kudos_page(db, kudos_list[:first], selection=selection)
+        return build_connection(kudos_list, first, lambda _: page)
+
+
+async def search_kudos(
+    info: Info,
+    query: str,
+    first: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    order: SearchOrder = SearchOrder.RELEVANCE,
+) -> relay.Connection[KudosSearchResult]:
+    text = clean_query(query, settings.SEARCH_QUERY_MAX_LENGTH)
+    first = clamp_page_size(first)
+    if not text:
+        return build_connection([], first, list)
+
+    current_user = await get_current_user_from_context_async(info)
+    user_id = current_user.id if current_user else None
+    selection = kudos_selection(info, "edges", "node", "kudos")
+    async with GraphQLSession() as db:
+        hits = await KudosService(db).search_kudos(
+            text,
+            order,
+            limit=first + 1,
+            after=decode_search_cursor(after),
+            with_sender=selection.sender,
+            with_receiver=selection.receiver,
+        )
+        page = hits[:first]
+        kudos = await to_kudos_page(db, [hit.kudos for hit in page], user_id, selection)
+        return build_connection(
+            hits, first, lambda _: to_search_results(page, kudos), cursor=encode_search_cursor
+        )
+
+
+async def send_kudos(info: Info, input: SendKudosInput) -> Optional[Kudos]:
+    current_user = await require_authenticated_user_async(info)
+    message = validate_message(input.message)
+
+    async with GraphQLSession() as db:
+        created_kudos = await KudosService(db).create_kudos(
+            KudosCreate(
+                sender_id=current_user.id,
+                receiver_id=UUID(input.receiverId),
+                message=message,
+            )
+        )
+        await db.commit()
+
+    # A brand new kudos has no reactions yet
+    result = to_kudos(created_kudos, build_reaction_summaries(ReactionState({}, set())))
+    generation = await cache.invalidate_async()
+    if hot_feed:
+        hot_feed.add(created_kudos, generation)
+    pubsub.publish(KUDOS_CREATED, result)
+    return result
+
+
+async def send_kudos_batch(info: Info, inputs: List[SendKudosInput]) -> List[SendKudosResult]:
+    """Send many kudos in one call; each item reports its own kudos or error"""
+    current_user = await require_authenticated_user_async(info)
+    batch = KudosBatch(current_user, inputs)
+
+    async with GraphQLSession() as db:
+        rows = batch.rows(await UserService(db).get_users_by_ids(batch.receiver_ids))
+        results = batch.complete(rows, await KudosService(db).insert_kudos_batch(rows))
+        await db.commit()
+
+    await batch.announce_async()
+    return results
+
+
+async def toggle_reaction(info: Info, input: ToggleReactionInput) -> bool:
+    """Toggle a reaction - add if not exists, remove if exists"""
+    current_user = await require_authenticated_user_async(info)
+
+    kudos_id = UUID(input.kudosId)
+    async with GraphQLSession() as db:
+        service = KudosService(db)
+        if reaction_buffer:
+            db_reacted, db_count = await service.get_reaction_state(
+                current_user.id, kudos_id, input.reactionType
+            )
+            added, count = reaction_buffer.toggle(
+                kudos_id, current_user.id, input.reactionType, db_reacted, db_count
+            )
+        else:
+            added, count = await service.toggle_reaction(current_user.id, kudos_id, input.reactionType)
+            await db.commit()
+
+    generation = await cache.invalidate_async()
+    if hot_feed:
+        hot_feed.apply_reaction(kudos_id, current_user.id, input.reactionType, added, generation)
+    pubsub.publish(
+        REACTION_CHANGED,
+        ReactionChange(
+            kudos_id=str(kudos_id),
+            user_id=str(current_user.id),
+            reaction_type=input.reactionType,
+            added=added,
+            count=count,
+        ),
+    )
+    return added
+
+
+@strawberry.type(name="Query")
+class AsyncQuery:
+    users: List[User] = strawberry.field(resolver=get_users)
+    kudos_received: List[Kudos] = strawberry.field(resolver=get_kudos_received)
+    kudos: List[Kudos] = strawberry.field(resolver=get_kudos_list)
+    users_connection: relay.Connection[User] = strawberry.field(resolver=get_users_connection)
+    kudos_connection: relay.Connection[Kudos] = strawberry.field(resolver=get_kudos_connection)
+    kudos_received_connection: relay.Connection[Kudos] = strawberry.field(
+        resolver=get_kudos_received_connection
+    )
+    search_kudos: relay.Connection[KudosSearchResult] = strawberry.field(resolver=search_kudos)
+
+
+@strawberry.type(name="Mutation")
+class AsyncMutation:
+    send_kudos: Kudos = strawberry.field(resolver=send_kudos)
+    send_kudos_batch: List[SendKudosResult] = strawberry.field(resolver=send_kudos_batch)
+    toggle_reaction: bool = strawberry.field(resolver=toggle_reaction)
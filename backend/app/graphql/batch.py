@@ -0,0 +1,129 @@
+"""
+Shared steps of the sync and async `sendKudosBatch` resolvers.
+
+A batch checks each message with `validate_message`, as `sendKudos` does,
+validates every receiver with one query and inserts all valid items with a
+multi-row `INSERT ... RETURNING`; invalid items are reported per index
+instead of failing the whole call.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+from uuid import UUID, uuid4
+
+from pydantic import ValidationError
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.graphql.hot_feed import hot_feed
+from app.graphql.pubsub import KUDOS_CREATED, pubsub
+from app.graphql.types import (
+    ReactionState,
+    SendKudosInput,
+    SendKudosResult,
+    build_reaction_summaries,
+    to_kudos,
+)
+from app.models.kudos import Kudos as KudosModel
+from app.models.user import User as UserModel
+from app.schemas.kudos import KudosBase
+
+
+def validate_message(message: str) -> str:
+    """Check a kudos message against the KudosBase rules; raises ValueError if broken."""
+    try:
+        return KudosBase(message=message).message
+    except ValidationError as error:
+        raise ValueError(f"Invalid message: {error.errors()[0]['msg']}") from None
+
+
+class PendingKudos(NamedTuple):
+    index: int
+    receiver_id: UUID
+    message: str
+
+
+class KudosBatch:
+    def __init__(self, sender: UserModel, inputs: List[SendKudosInput]):
+        if len(inputs) > settings.KUDOS_BATCH_MAX_SIZE:
+            raise Exception(f"At most {settings.KUDOS_BATCH_MAX_SIZE} kudos can be sent per batch")
+        self.sender = sender
+        self.receivers: Dict[UUID, UserModel] = {}
+        self.results: List[SendKudosResult] = [SendKudosResult(index=i) for i in range(len(inputs))]
+        self.pending: List[PendingKudos] = []
+        self.created: List[KudosModel] = []
+        for index, item in enumerate(inputs):
+            try:
+                receiver_id = UUID(item.receiverId)
+            except ValueError:
+                self.results[index].error = "Invalid receiver id"
+                continue
+            # The same rules as a single sendKudos
+            try:
+                message = validate_message(item.message)
+            except ValueError as error:
+                self.results[index].error = str(error)
+                continue
+            self.pending.append(PendingKudos(index, receiver_id, message))
+
+    @property
+    def receiver_ids(self) -> List[UUID]:
+        return list({item.receiver_id for item in self.pending})
+
+    def rows(self, receivers: Iterable[UserModel]) -> List[dict]:
+        """Rows to insert for the items whose receiver exists, in input order."""
+        self.receivers = {user.id: user for user in receivers}
+        accepted = []
+        for item in self.pending:
+            if item.receiver_id in self.receivers:
+                accepted.append(item)
+            else:
+                self.results[item.index].error = f"Receiver with id {item.receiver_id} not found"
+        self.pending = accepted
+        return [
+            {
+                "id": uuid4(),
+                "sender_id": self.sender.id,
+                "receiver_id": item.receiver_id,
+                "message": item.message,
+            }
+            for item in accepted
+        ]
+
+    def complete(self, rows: List[dict], inserted: List[Tuple[UUID, datetime]]) -> List[SendKudosResult]:
+        """Fill in the results from the `RETURNING id, created_at` rows."""
+        # A brand new kudos has no reactions yet
+        reactions = build_reaction_summaries(ReactionState({}, set()))
+        created_at = dict(inserted)
+        for item, row in zip(self.pending, rows):
+            kudos = KudosModel(**row, created_at=created_at[row["id"]])
+            # Attach the users without backref events, the sender may be a cached instance
+            set_committed_value(kudos, "sender", self.sender)
+            set_committed_value(kudos, "receiver", self.receivers[item.receiver_id])
+            self.created.append(kudos)
+            self.results[item.index].kudos = to_kudos(kudos, reactions)
+        return self.results
+
+    def announce(self) -> None:
+        """Propagate the committed batch to the hot feed, caches and subscribers."""
+        if self.created:
+            self._add_to_hot_feed(cache.invalidate())
+            self._publish()
+
+    async def announce_async(self) -> None:
+        """Async counterpart of announce."""
+        if self.created:
+            self._add_to_hot_feed(await cache.invalidate_async())
+            self._publish()
+
+    def _add_to_hot_feed(self, generation: str) -> None:
+        if hot_feed:
+            for kudos in self.created[-hot_feed.size:]:
+                hot_feed.add(kudos, generation)
+
+    def _publish(self) -> None:
+        # A campaign-sized batch would overflow every subscriber's queue; live
+        # clients only need the newest items
+        for result in self.results[-(pubsub.max_queue_size // 2):]:
+            if result.kudos is not None:
+                pubsub.publish(KUDOS_CREATED, result.kudos)
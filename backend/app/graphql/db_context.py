@@ -2,25 +2,10 @@
 Database context manager for GraphQL resolvers.
 This properly handles async SQLAlchemy sessions to avoid greenlet errors.
 """
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+from app.db.engines import engines
 
-# Create a new engine specifically for GraphQL
-graphql_engine = create_async_engine(
-    settings.DATABASE_URI,
-    echo=False,  # Don't log SQL in GraphQL context
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-)
-
-# Create session factory
-GraphQLSession = sessionmaker(
-    graphql_engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False
-)
+# Sessions on the shared asyncpg engine
+GraphQLSession = engines.async_session
 
 async def get_session():
     """Get a database session for GraphQL resolvers."""
@@ -28,4 +13,4 @@ async def get_session():
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
@@ -0,0 +1,284 @@
+"""
+Strawberry schema extensions.
+"""
+import hashlib
+import json
+import time
+from inspect import isawaitable
+
+from graphql import ExecutionResult
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+from app.core import tracing
+from app.core.cache import LRUCache, cache
+from app.core.config import settings
+from app.core.metrics import graphql_operation_duration, graphql_resolver_duration
+from app.db.routing import on_primary
+from app.graphql.persisted_queries import not_allowed, persisted_query_store, query_hash
+
+
+def response_cache_key(execution_context, generation: str) -> str:
+    """Key a query result by cache generation, operation, variables and viewer."""
+    request = execution_context.context["request"]
+    payload = json.dumps(
+        [
+            execution_context.operation_name,
+            execution_context.query,
+            execution_context.variables,
+            # The bearer token identifies the viewer without a DB lookup
+            request.headers.get("Authorization", ""),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.sha256(payload.encode()).hexdigest()
+    return f"gql:{generation}:{digest}"
+
+
+class ResponseCache(SchemaExtension):
+    """Serve repeated queries from the shared cache.
+
+    Only successful query operations are cached. Mutations that change what
+    queries return call `cache.invalidate()`. The hook is async so Redis is
+    never waited on from the event loop; the routers always execute async.
+    """
+
+    async def on_execute(self):
+        execution_context = self.execution_context
+        if execution_context.operation_type != OperationType.QUERY:
+            yield
+            return
+
+        key = response_cache_key(execution_context, await cache.generation_async())
+        cached = await cache.get_async(key)
+        if cached is not None:
+            execution_context.result = ExecutionResult(data=json.loads(cached))
+            yield
+            return
+
+        yield
+
+        result = execution_context.result
+        if result is not None and not result.errors and result.data is not None:
+            await cache.set_async(key, json.dumps(result.data), settings.CACHE_TTL_SECONDS)
+
+
+class DocumentCache(SchemaExtension):
+    """Reuse parsed and validated documents across requests.
+
+    Entries are keyed by the sha256 of the query text, the same hash clients
+    use for persisted queries, and hold the document plus its validation
+    errors once validated.
+    """
+
+    documents = LRUCache(settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+
+    def on_parse(self):
+        execution_context = self.execution_context
+        self.key = query_hash(execution_context.query)
+        self.entry = self.documents.get(self.key)
+        if self.entry is not None:
+            execution_context.graphql_document = self.entry[0]
+            yield
+            return
+
+        yield
+
+        if execution_context.graphql_document is not None:
+            self.entry = [execution_context.graphql_document, None]
+            self.documents.set(self.key, self.entry, float("inf"))
+
+    def on_validate(self):
+        execution_context = self.execution_context
+        if execution_context.errors is not None:
+            # Refused by an earlier extension; those errors aren't the document's
+            yield
+            return
+        entry = getattr(self, "entry", None)
+        if entry is not None and entry[1] is not None:
+            execution_context.errors = list(entry[1])
+            yield
+            return
+
+        yield
+
+        if entry is not None and execution_context.errors is not None:
+            entry[1] = tuple(execution_context.errors)
+
+
+class PersistedQueriesOnly(SchemaExtension):
+    """Refuse documents missing from the persisted query manifest.
+
+    The HTTP router already refuses them before parsing; this also covers
+    queries and mutations sent over WebSockets. It must come before
+    DocumentCache, so the refusal isn't cached as a validation error.
+    """
+
+    def on_validate(self):
+        execution_context = self.execution_context
+        if not persisted_query_store.allows(execution_context.query):
+            # Set before validating, which then reports these errors instead
+            execution_context.errors = [not_allowed().to_graphql_error()]
+        yield
+
+
+class ReplicaRouting(SchemaExtension):
+    """Run mutations on the primary database, including their first reads.
+
+    Queries are left to the session's routing, which reads from replicas
+    unless the requester wrote recently.
+    """
+
+    def on_execute(self):
+        if self.execution_context.operation_type == OperationType.QUERY:
+            yield
+            return
+        with on_primary():
+            yield
+
+
+class Metrics(SchemaExtension):
+    """Record latency per operation name.
+
+    Operation names come from clients, so only the first
+    `max_operation_names` distinct names get their own series and later ones
+    are counted as "other". Resolver timings come from `time_root_resolvers`.
+    """
+
+    max_operation_names = 200
+    operation_names: set = set()
+
+    def on_operation(self):
+        started = time.perf_counter()
+        yield
+        execution_context = self.execution_context
+        try:
+            operation_type = execution_context.operation_type.value
+        except Exception:
+            # The document didn't parse, or names no operation
+            operation_type = "unknown"
+        name = execution_context.operation_name or "anonymous"
+        if name not in self.operation_names:
+            if len(self.operation_names) >= self.max_operation_names:
+                name = "other"
+            else:
+                self.operation_names.add(name)
+        graphql_operation_duration.observe(time.perf_counter() - started, operation_type, name)
+
+
+def _timed(resolve, field: str):
+    async def observe_async(result, started: float):
+        try:
+            return await result
+        finally:
+            graphql_resolver_duration.observe(time.perf_counter() - started, field)
+
+    def timed(root, info, **kwargs):
+        started = time.perf_counter()
+        result = resolve(root, info, **kwargs)
+        if isawaitable(result):
+            return observe_async(result, started)
+        graphql_resolver_duration.observe(time.perf_counter() - started, field)
+        return result
+
+    return timed
+
+
+def _wrap_root_resolvers(schema, wrap) -> None:
+    graphql_schema = schema._schema
+    for root_type in (graphql_schema.query_type, graphql_schema.mutation_type):
+        if root_type is None:
+            continue
+        for name, field in root_type.fields.items():
+            if field.resolve is not None:
+                field.resolve = wrap(field.resolve, f"{root_type.name}.{name}")
+
+
+def time_root_resolvers(schema) -> None:
+    """Record latency of every Query and Mutation field resolver.
+
+    Nested fields are attribute reads on objects the root resolvers built, so
+    only root fields are wrapped. A `resolve` extension hook would run for
+    every field of every result, which costs several percent on large pages.
+    """
+    _wrap_root_resolvers(schema, _timed)
+
+
+class Tracing(SchemaExtension):
+    """Record a trace of a sampled share of operations.
+
+    The operation is the root span, with parse, validate and execute spans
+    under it. Root resolvers (see `trace_root_resolvers`), `traced` helpers
+    and SQL statements nest under execute.
+    """
+
+    def on_operation(self):
+        root = tracing.start_trace("graphql.operation")
+        if root is None:
+            yield
+            return
+        error = None
+        with tracing.activate(root):
+            try:
+                yield
+            except BaseException as exc:
+                error = exc
+                raise
+            finally:
+                execution_context = self.execution_context
+                try:
+                    root.set("graphql.operation.type", execution_context.operation_type.value)
+                except Exception:
+                    pass
+                root.set("graphql.operation.name", execution_context.operation_name or "anonymous")
+                result = execution_context.result
+                if result is not None and result.errors:
+                    root.set("graphql.errors", len(result.errors))
+                tracing.end_trace(root, error)
+
+    def on_parse(self):
+        with tracing.span("graphql.parse"):
+            yield
+
+    def on_validate(self):
+        with tracing.span("graphql.validate"):
+            yield
+
+    def on_execute(self):
+        with tracing.span("graphql.execute"):
+            yield
+
+
+def _traced(resolve, field: str):
+    async def finish_async(result, child):
+        with tracing.activate(child):
+            try:
+                value = await result
+            except BaseException as error:
+                child.finish(error)
+                raise
+        child.finish()
+        return value
+
+    def traced(root, info, **kwargs):
+        child = tracing.start_span(field, **{"graphql.field.path": str(info.path.key)})
+        if child is None:
+            return resolve(root, info, **kwargs)
+        with tracing.activate(child):
+            try:
+                result = resolve(root, info, **kwargs)
+            except BaseException as error:
+                child.finish(error)
+                raise
+        if isawaitable(result):
+            return finish_async(result, child)
+        child.finish()
+        return result
+
+    return traced
+
+
+def trace_root_resolvers(schema) -> None:
+    """Add a span per Query and Mutation field resolver to sampled traces."""
+    _wrap_root_resolvers(schema, _traced)
@@ -0,0 +1,194 @@
+"""
+In-process ring buffer of the newest kudos, used to answer first-page feed
+requests without touching the database.
+
+Each entry keeps the hydrated kudos plus the set of users behind every
+reaction type, so counts and the per-viewer `userReacted` flag are both
+derived in memory. The buffer is seeded at startup, along with any toggles
+the reaction buffer hasn't flushed yet, and kept current by the `sendKudos`
+and `toggleReaction` mutations of this process.
+
+Other processes write too, so the buffer only answers while it is known to
+match the shared cache generation, which every write bumps. Its own writes
+move it on to the generation they bumped to, as long as nothing else bumped
+it in between. Any other change of generation means a write it hasn't seen:
+requests go to the database while the buffer is reseeded in the background.
+Without Redis there is no shared generation, and the buffer never answers.
+"""
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+from uuid import UUID
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.graphql.reaction_buffer import reaction_buffer
+from app.graphql.sync_db import get_sync_db
+from app.graphql.sync_repositories import sync_kudos_repository, sync_reaction_repository
+from app.graphql.types import Kudos, ReactionState, build_reaction_summaries, to_user
+from app.models.kudos import Kudos as KudosModel
+
+logger = logging.getLogger(__name__)
+
+
+class HotFeedEntry:
+    __slots__ = ("id", "created_at", "kudos", "reactors")
+
+    def __init__(self, kudos: KudosModel, reactors: Dict[str, Set[UUID]]):
+        self.id = kudos.id
+        self.created_at = kudos.created_at
+        self.kudos = Kudos(
+            id=str(kudos.id),
+            sender_id=str(kudos.sender_id),
+            receiver_id=str(kudos.receiver_id),
+            message=kudos.message,
+            created_at=kudos.created_at.isoformat() if kudos.created_at else "",
+            updated_at=kudos.updated_at.isoformat() if kudos.updated_at else "",
+            sender=to_user(kudos.sender) if kudos.sender else None,
+            receiver=to_user(kudos.receiver) if kudos.receiver else None,
+        )
+        self.reactors = reactors
+
+    def to_kudos(self, user_id: Optional[UUID] = None) -> Kudos:
+        """Materialize the kudos with reaction counts and the viewer's own reactions."""
+        state = ReactionState(
+            counts={t: len(users) for t, users in self.reactors.items()},
+            user_reactions={t for t, users in self.reactors.items() if user_id in users},
+        )
+        base = self.kudos
+        return Kudos(
+            id=base.id,
+            sender_id=base.sender_id,
+            receiver_id=base.receiver_id,
+            message=base.message,
+            created_at=base.created_at,
+            updated_at=base.updated_at,
+            sender=base.sender,
+            receiver=base.receiver,
+            reactions=build_reaction_summaries(state),
+        )
+
+
+class HotFeed:
+    def __init__(self, size: int):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries: Deque[HotFeedEntry] = deque(maxlen=size)
+        self._by_id: Dict[UUID, HotFeedEntry] = {}
+        # True while the buffer holds every kudos in the table
+        self._complete = False
+        # Cache generation the buffer matches; None until seeded
+        self._generation: Optional[str] = None
+        self._reseeding = False
+        self._lock = threading.Lock()
+
+    def seed(self) -> None:
+        """Load the newest kudos and their reactions from the database."""
+        # Read before loading: a write landing meanwhile bumps the generation
+        # past this one, so the buffer is found stale rather than missing it
+        generation = cache.generation()
+        with get_sync_db() as db:
+            kudos_list = sync_kudos_repository.list(db, limit=self.size)
+            ids = [k.id for k in kudos_list]
+            reactors = sync_reaction_repository.reactors_by_kudos(db, ids)
+            if reaction_buffer:
+                # Toggles still waiting in the buffer aren't in the database yet
+                reaction_buffer.overlay_reactors(ids, reactors)
+            entries = [HotFeedEntry(k, reactors.get(k.id, {})) for k in kudos_list]
+
+        with self._lock:
+            self._entries = deque(entries, maxlen=self.size)
+            self._by_id = {entry.id: entry for entry in entries}
+            self._complete = len(entries) < self.size
+            self._generation = generation
+        logger.info("Hot feed seeded with %d kudos", len(entries))
+
+    def get_page(self, limit: int, generation: str) -> Optional[List[HotFeedEntry]]:
+        """Return the newest `limit` entries, or None if the buffer can't answer.
+
+        `generation` is the cache's current one, read by the caller.
+        """
+        shared = cache.shared
+        with self._lock:
+            current = shared and generation == self._generation
+            if current and (limit <= len(self._entries) or self._complete):
+                self.hits += 1
+                return list(self._entries)[:limit]
+            if shared and not current and self._generation is not None:
+                self._reseed_in_background()
+            self.misses += 1
+            return None
+
+    def add(self, kudos: KudosModel, generation: str) -> None:
+        """Push a freshly created kudos (with sender/receiver loaded) onto the buffer.
+
+        `generation` is the one the write bumped the cache to.
+        """
+        entry = HotFeedEntry(kudos, {})
+        with self._lock:
+            if self._generation is None:
+                return
+            if len(self._entries) == self.size:
+                evicted = self._entries.pop()
+                self._by_id.pop(evicted.id, None)
+                self._complete = False
+            self._insert(entry)
+            self._caught_up(generation)
+
+    def apply_reaction(
+        self, kudos_id: UUID, user_id: UUID, reaction_type: str, added: bool, generation: str
+    ) -> None:
+        with self._lock:
+            entry = self._by_id.get(kudos_id)
+            if entry is not None:
+                users = entry.reactors.setdefault(reaction_type, set())
+                if added:
+                    users.add(user_id)
+                else:
+                    users.discard(user_id)
+            self._caught_up(generation)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _caught_up(self, generation: str) -> None:
+        # A batch applies several writes under one bump, hence the 0
+        if self._generation is not None and int(generation) - int(self._generation) in (0, 1):
+            self._generation = generation
+
+    def _reseed_in_background(self) -> None:
+        # One at a time; requests meanwhile read from the database
+        if not self._reseeding:
+            self._reseeding = True
+            threading.Thread(target=self._reseed, name="hot-feed-seed", daemon=True).start()
+
+    def _reseed(self) -> None:
+        try:
+            self.seed()
+        except Exception:
+            logger.exception("Failed to reseed hot feed")
+        finally:
+            with self._lock:
+                self._reseeding = False
+
+    def _insert(self, entry: HotFeedEntry) -> None:
+        # New kudos are almost always the newest; fall back to an ordered insert
+        # for the rare out-of-order commit.
+        index = 0
+        for index, existing in enumerate(self._entries):
+            if _sort_key(existing) < _sort_key(entry):
+                break
+        else:
+            index = len(self._entries)
+        self._entries.insert(index, entry)
+        self._by_id[entry.id] = entry
+
+
+def _sort_key(entry: HotFeedEntry):
+    return (entry.created_at, entry.id)
+
+
+hot_feed: Optional[HotFeed] = HotFeed(settings.HOT_FEED_SIZE) if settings.HOT_FEED_ENABLED else None
@@ -0,0 +1,149 @@
+"""
+HTTP caching and compression for the `/graphql` endpoint.
+
+Queries sent over GET get a strong ETag derived from the cache generation,
+which every mutation bumps through `cache.invalidate()`, the raw query string
+and the Authorization header. Per-viewer fields such as `userReacted` are
+therefore covered: another viewer, or the same viewer after any write, gets
+a different tag. A request whose `If-None-Match` holds the current tag is
+answered `304 Not Modified` before the operation is parsed or executed.
+
+Tags are only issued while the generation is shared through Redis. During
+an outage each worker bumps its own local generation, so one worker could
+confirm a tag that another's write has made stale.
+
+Responses of at least GRAPHQL_COMPRESS_MIN_BYTES are compressed, with brotli
+when the client accepts it and the `brotli` package is installed, otherwise
+gzip. Compressed bodies carry their own tags (`"<tag>-br"`, `"<tag>-gzip"`),
+since a strong tag names exact bytes.
+"""
+import gzip
+import hashlib
+from typing import List, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+from strawberry import UNSET
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.graphql.persisted_queries import PersistedQueryRouter
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+# Browsers and shared caches must revalidate, and only the viewer may store it
+CACHE_CONTROL = "private, no-cache"
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Content codings the client accepts, ignoring any refused with q=0."""
+    encodings = []
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.append(coding.strip().lower())
+    return encodings
+
+
+def pick_encoding(accept_encoding: str) -> Optional[str]:
+    encodings = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in encodings:
+        return "br"
+    if "gzip" in encodings or "*" in encodings:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        # Quality 5 keeps most of brotli's size win at gzip-like speed
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=5)
+
+
+async def etag_for(request: Request) -> Optional[str]:
+    """The tag a GET query's response would carry, or None if it can't have one."""
+    if request.method != "GET" or not request.url.query:
+        return None
+    generation = await cache.generation_async()
+    if not cache.shared:
+        return None
+    digest = hashlib.sha256(
+        "\n".join([
+            generation,
+            request.url.query,
+            request.headers.get("Authorization", ""),
+        ]).encode()
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def matching_tag(request: Request, etag: str) -> Optional[str]:
+    """The tag in `If-None-Match` naming a representation of `etag`, if any."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return None
+    base = etag[:-1]
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag in (etag, f'{base}-br"', f'{base}-gzip"'):
+            return tag
+    return None
+
+
+class CachingGraphQLRouter(PersistedQueryRouter):
+    """GraphQL router adding conditional GET and response compression."""
+
+    async def run(self, request: Request, context=UNSET, root_value=UNSET) -> Response:
+        etag = await etag_for(request) if settings.GRAPHQL_HTTP_CACHE_ENABLED else None
+        if etag is not None:
+            held = matching_tag(request, etag)
+            if held is not None:
+                headers = _cache_headers(held)
+                headers["Vary"] += ", Accept-Encoding"
+                return Response(status_code=304, headers=headers)
+
+        response = await super().run(request, context=context, root_value=root_value)
+
+        # Only successful results are tagged; GET never executes mutations
+        if (
+            etag is not None
+            and response.status_code == 200
+            and getattr(request.state, "graphql_cacheable", False)
+        ):
+            response.headers.update(_cache_headers(etag))
+        self.compress_response(request, response)
+        return response
+
+    async def process_result(self, request: Request, result):
+        request.state.graphql_cacheable = not result.errors and result.data is not None
+        return await super().process_result(request, result)
+
+    def compress_response(self, request: Request, response: Response) -> None:
+        minimum = settings.GRAPHQL_COMPRESS_MIN_BYTES
+        if not minimum or len(response.body) < minimum or "content-encoding" in response.headers:
+            return
+        vary = response.headers.get("Vary")
+        response.headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+        encoding = pick_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return
+        response.body = compress(response.body, encoding)
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Content-Length"] = str(len(response.body))
+        etag = response.headers.get("ETag")
+        if etag:
+            response.headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+
+
+def _cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Authorization"}
@@ -0,0 +1,85 @@
+"""
+Batch loaders for GraphQL resolvers.
+
+Resolvers that return a page of kudos hand every ID on the page to a loader
+up front, so reaction data is fetched with one grouped query per page instead
+of one query per kudos.
+"""
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.graphql.reaction_buffer import reaction_buffer
+from app.graphql.sync_repositories import sync_reaction_repository
+from app.graphql.types import ReactionState
+from app.repository.reaction_repository import reaction_repository
+
+
+class ReactionSummaryLoader:
+    """DataLoader-style loader for reaction counts and the viewer's own reactions.
+
+    Results are memoized per loader, so a loader should live no longer than
+    the request that created it.
+    """
+
+    def __init__(self, db: Session, user_id: Optional[UUID] = None):
+        self.db = db
+        self.user_id = user_id
+        self._cache: Dict[UUID, ReactionState] = {}
+
+    def load(self, kudos_id: UUID) -> ReactionState:
+        return self.load_many([kudos_id])[0]
+
+    def load_many(self, kudos_ids: Iterable[UUID]) -> List[ReactionState]:
+        ids = list(kudos_ids)
+        missing = list(dict.fromkeys(k for k in ids if k not in self._cache))
+        if missing:
+            counts = sync_reaction_repository.count_by_kudos(self.db, missing)
+            user_reactions: Dict[UUID, Set[str]] = {}
+            if self.user_id:
+                user_reactions = sync_reaction_repository.user_reaction_types(
+                    self.db, missing, self.user_id
+                )
+            for kudos_id in missing:
+                self._cache[kudos_id] = ReactionState(
+                    counts=counts.get(kudos_id, {}),
+                    user_reactions=user_reactions.get(kudos_id, set()),
+                )
+        states = [self._cache[k] for k in ids]
+        if reaction_buffer:
+            states = reaction_buffer.overlay(ids, states, self.user_id)
+        return states
+
+
+class AsyncReactionSummaryLoader:
+    """Async counterpart of ReactionSummaryLoader for the asyncpg resolvers."""
+
+    def __init__(self, db: AsyncSession, user_id: Optional[UUID] = None):
+        self.db = db
+        self.user_id = user_id
+        self._cache: Dict[UUID, ReactionState] = {}
+
+    async def load(self, kudos_id: UUID) -> ReactionState:
+        return (await self.load_many([kudos_id]))[0]
+
+    async def load_many(self, kudos_ids: Iterable[UUID]) -> List[ReactionState]:
+        ids = list(kudos_ids)
+        missing = list(dict.fromkeys(k for k in ids if k not in self._cache))
+        if missing:
+            counts = await reaction_repository.count_by_kudos(self.db, kudos_ids=missing)
+            user_reactions: Dict[UUID, Set[str]] = {}
+            if self.user_id:
+                user_reactions = await reaction_repository.user_reaction_types(
+                    self.db, kudos_ids=missing, user_id=self.user_id
+                )
+            for kudos_id in missing:
+                self._cache[kudos_id] = ReactionState(
+                    counts=counts.get(kudos_id, {}),
+                    user_reactions=user_reactions.get(kudos_id, set()),
+                )
+        states = [self._cache[k] for k in ids]
+        if reaction_buffer:
+            states = reaction_buffer.overlay(ids, states, self.user_id)
+        return states
@@ -0,0 +1,87 @@
+"""
+Keyset pagination helpers for GraphQL connections.
+
+Cursors are opaque base64 strings wrapping the `(created_at, id)` of the last
+row on a page; search cursors put the result's rank in front. The repositories
+turn a decoded cursor into a seek predicate, so fetching page N costs the
+same as fetching page one.
+"""
+import base64
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from strawberry import relay
+
+from app.repository.kudos_search import SearchCursor
+
+T = TypeVar("T")
+N = TypeVar("N")
+
+Cursor = Tuple[datetime, UUID]
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    if not cursor:
+        return None
+    try:
+        created_at, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def encode_search_cursor(row) -> str:
+    # repr() round-trips the float, so the seek resumes exactly after this row
+    raw = f"{row.rank!r}|{row.created_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_search_cursor(cursor: Optional[str]) -> Optional[SearchCursor]:
+    if not cursor:
+        return None
+    try:
+        rank, created_at, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return float(rank), datetime.fromisoformat(created_at), UUID(id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def clamp_page_size(first: int) -> int:
+    return max(1, min(first, MAX_PAGE_SIZE))
+
+
+def build_connection(
+    rows: List[T],
+    first: int,
+    convert: Callable[[List[T]], List[N]],
+    cursor: Optional[Callable[[T], str]] = None,
+) -> relay.Connection[N]:
+    """Build a connection from `first + 1` rows fetched in cursor order."""
+    has_next_page = len(rows) > first
+    rows = rows[:first]
+    if cursor is None:
+        cursors = [encode_cursor(row.created_at, row.id) for row in rows]
+    else:
+        cursors = [cursor(row) for row in rows]
+    edges = [
+        relay.Edge(cursor=cursor, node=node)
+        for cursor, node in zip(cursors, convert(rows))
+    ]
+    return relay.Connection(
+        edges=edges,
+        page_info=relay.PageInfo(
+            has_next_page=has_next_page,
+            has_previous_page=False,
+            start_cursor=cursors[0] if cursors else None,
+            end_cursor=cursors[-1] if cursors else None,
+        ),
+    )
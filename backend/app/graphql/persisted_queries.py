@@ -0,0 +1,158 @@
+"""
+Persisted queries for the `/graphql` endpoint.
+
+Clients may send `extensions.persistedQuery.sha256Hash` instead of the full
+query text (Apollo's automatic persisted queries protocol). Unknown hashes
+answer `PersistedQueryNotFound`, and the client retries once with both the
+hash and the query, which registers it in the shared cache.
+
+With `GRAPHQL_PERSISTED_QUERIES_ONLY` on, only documents listed in the
+manifest (`GRAPHQL_PERSISTED_QUERIES_MANIFEST`, a JSON object of
+`{sha256: query}`) are executed and nothing new can be registered. The HTTP
+router refuses other documents before parsing them; the `PersistedQueriesOnly`
+extension and `AllowListSchema` refuse them on every transport, WebSocket
+operations included.
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import strawberry
+from graphql import ExecutionResult, GraphQLError
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.http.exceptions import HTTPException
+
+from app.core.cache import cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PersistedQueryError(Exception):
+    def __init__(self, message: str, code: str):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+    def to_graphql_error(self) -> GraphQLError:
+        return GraphQLError(self.message, extensions={"code": self.code})
+
+
+def not_allowed() -> PersistedQueryError:
+    return PersistedQueryError("PersistedQueryNotAllowed", "PERSISTED_QUERY_NOT_ALLOWED")
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+def load_manifest(path: Optional[str]) -> Dict[str, str]:
+    if not path:
+        return {}
+    with open(path) as manifest_file:
+        manifest = json.load(manifest_file)
+    for digest, query in manifest.items():
+        if query_hash(query) != digest:
+            raise ValueError(f"Persisted query manifest entry {digest} does not match its query")
+    logger.info("Loaded %d persisted queries from %s", len(manifest), path)
+    return manifest
+
+
+class PersistedQueryStore:
+    def __init__(self, manifest: Dict[str, str], allow_list_only: bool = False, ttl: int = 86400):
+        self.manifest = manifest
+        self.allow_list_only = allow_list_only
+        self.ttl = ttl
+
+    def _key(self, digest: str) -> str:
+        return f"apq:{digest}"
+
+    def allows(self, query: Optional[str]) -> bool:
+        """Whether a document may run: any may, unless only the manifest's are allowed."""
+        return not self.allow_list_only or (query is not None and query_hash(query) in self.manifest)
+
+    async def resolve(
+        self, query: Optional[str], extensions: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Return the query text to execute for a request."""
+        persisted = (extensions or {}).get("persistedQuery")
+        if persisted is None:
+            if query is not None and not self.allows(query):
+                raise not_allowed()
+            return query
+
+        digest = persisted.get("sha256Hash")
+        if persisted.get("version") != 1 or not isinstance(digest, str):
+            raise PersistedQueryError("Unsupported persisted query version", "PERSISTED_QUERY_NOT_SUPPORTED")
+
+        if query is not None:
+            if query_hash(query) != digest:
+                raise PersistedQueryError("provided sha does not match query", "INVALID_PERSISTED_QUERY")
+            if digest in self.manifest:
+                return query
+            if self.allow_list_only:
+                raise not_allowed()
+            await cache.set_async(self._key(digest), query, self.ttl)
+            return query
+
+        stored = self.manifest.get(digest)
+        if stored is None and not self.allow_list_only:
+            stored = await cache.get_async(self._key(digest))
+        if stored is None:
+            raise PersistedQueryError("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+        return stored
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """GraphQLRouter that resolves persisted query hashes before execution."""
+
+    def __init__(self, *args, store: PersistedQueryStore, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.store = store
+
+    async def parse_http_body(self, request) -> GraphQLRequestData:
+        content_type = request.content_type or ""
+
+        if "application/json" in content_type:
+            data = self.parse_json(await request.get_body())
+        elif content_type.startswith("multipart/form-data"):
+            data = await self.parse_multipart(request)
+        elif request.method == "GET":
+            data = self.parse_query_params(request.query_params)
+            if "extensions" in data:
+                data["extensions"] = json.loads(data["extensions"])
+        else:
+            raise HTTPException(400, "Unsupported content type")
+
+        return GraphQLRequestData(
+            query=await self.store.resolve(data.get("query"), data.get("extensions")),
+            variables=data.get("variables"),
+            operation_name=data.get("operationName"),
+        )
+
+    async def execute_operation(self, request, context, root_value) -> ExecutionResult:
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except PersistedQueryError as error:
+            return ExecutionResult(data=None, errors=[error.to_graphql_error()])
+
+
+class AllowListSchema(strawberry.Schema):
+    """Schema refusing subscriptions whose document isn't in the manifest.
+
+    Strawberry runs no extensions for subscriptions, so `PersistedQueriesOnly`
+    never sees them.
+    """
+
+    async def subscribe(self, query: str, *args, **kwargs):
+        if not persisted_query_store.allows(query):
+            return ExecutionResult(data=None, errors=[not_allowed().to_graphql_error()])
+        return await super().subscribe(query, *args, **kwargs)
+
+
+persisted_query_store = PersistedQueryStore(
+    load_manifest(settings.GRAPHQL_PERSISTED_QUERIES_MANIFEST),
+    allow_list_only=settings.GRAPHQL_PERSISTED_QUERIES_ONLY,
+)
@@ -0,0 +1,94 @@
+"""
+In-process pub/sub feeding GraphQL subscriptions.
+
+Every subscriber owns a bounded asyncio queue. Publishing never blocks: a
+subscriber whose queue is full is evicted and its subscription ends with an
+error, so one slow client can't hold messages for everyone else.
+`publish` is thread-safe and may be called from sync resolvers.
+"""
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KUDOS_CREATED = "kudos_created"
+REACTION_CHANGED = "reaction_changed"
+
+
+class SlowConsumerError(Exception):
+    pass
+
+
+_EVICTED = object()
+
+
+class Subscriber:
+    __slots__ = ("queue", "loop", "evicted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.loop = loop
+        self.evicted = False
+
+    async def get(self) -> Any:
+        message = await self.queue.get()
+        if message is _EVICTED:
+            raise SlowConsumerError("Subscription dropped: client is not keeping up")
+        return message
+
+
+class PubSub:
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self.evictions = 0
+        self._topics: Dict[str, Set[Subscriber]] = {}
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str) -> AsyncIterator[Subscriber]:
+        subscriber = Subscriber(asyncio.get_running_loop(), self.max_queue_size)
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            with self._lock:
+                self._topics.get(topic, set()).discard(subscriber)
+
+    def publish(self, topic: str, message: Any) -> None:
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(self._deliver, topic, subscriber, message)
+            except RuntimeError:
+                # Loop already closed; the subscription is going away
+                pass
+
+    def subscriber_count(self, topic: str) -> int:
+        with self._lock:
+            return len(self._topics.get(topic, ()))
+
+    def _deliver(self, topic: str, subscriber: Subscriber, message: Any) -> None:
+        if subscriber.evicted:
+            return
+        try:
+            subscriber.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            subscriber.evicted = True
+            self.evictions += 1
+            with self._lock:
+                self._topics.get(topic, set()).discard(subscriber)
+            # Make room for the eviction marker so the consumer wakes up
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(_EVICTED)
+            logger.warning("Evicted slow %s subscriber", topic)
+
+
+pubsub = PubSub(settings.SUBSCRIPTION_QUEUE_SIZE)
@@ -0,0 +1,205 @@
+"""
+Opt-in write-behind buffer for reaction toggles (`REACTION_BUFFER_ENABLED`).
+
+Toggles only update an in-memory map of the desired state per
+(user, kudos, type); repeated toggles of the same reaction coalesce. A
+background thread writes the net changes to `reactions` and `reaction_counts`
+in one transaction every `REACTION_BUFFER_FLUSH_MS`, or sooner once
+`REACTION_BUFFER_MAX_PENDING` reactions are waiting. Readers apply the
+pending changes on top of what they load from the database via `overlay`.
+
+Pending changes are flushed on graceful shutdown; a hard kill loses at most
+one flush interval of toggles. Like the hot feed, the overlay is per process,
+so other workers see a toggle once it has been flushed. Each flush bumps the
+cache generation again, so responses other workers cached from the database
+before the flush landed last at most one flush interval.
+"""
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.graphql.sync_db import get_sync_db
+from app.graphql.sync_repositories import sync_reaction_repository
+from app.graphql.types import ReactionState
+
+logger = logging.getLogger(__name__)
+
+# (user_id, kudos_id, reaction_type)
+ReactionKey = Tuple[UUID, UUID, str]
+
+
+class ReactionBuffer:
+    def __init__(self, flush_interval_ms: int, max_pending: int):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.flushes = 0
+        # Desired state per reaction, and the state the database had (or will
+        # have once the in-flight flush lands) when it was first buffered
+        self._pending: Dict[ReactionKey, bool] = {}
+        self._base: Dict[ReactionKey, bool] = {}
+        # Reactions being written by the current flush
+        self._flushing: Dict[ReactionKey, bool] = {}
+        self._flushing_base: Dict[ReactionKey, bool] = {}
+        # Net count change per (kudos_id, reaction_type) not yet in the database
+        self._deltas: Dict[Tuple[UUID, str], int] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="reaction-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write out everything still pending."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def toggle(
+        self, kudos_id: UUID, user_id: UUID, reaction_type: str, db_reacted: bool, db_count: int
+    ) -> Tuple[bool, int]:
+        """Buffer a toggle given the database state; returns the new state and count."""
+        key = (user_id, kudos_id, reaction_type)
+        with self._lock:
+            if key in self._pending:
+                current = self._pending[key]
+            else:
+                current = self._flushing.get(key, db_reacted)
+                self._base[key] = current
+            reacted = not current
+            if reacted == self._base[key]:
+                # Toggled back; nothing to write
+                del self._pending[key]
+                del self._base[key]
+            else:
+                self._pending[key] = reacted
+            counter = (kudos_id, reaction_type)
+            self._deltas[counter] = self._deltas.get(counter, 0) + (1 if reacted else -1)
+            count = db_count + self._deltas[counter]
+            full = len(self._pending) >= self.max_pending
+
+        if full:
+            self._wake.set()
+        return reacted, count
+
+    def overlay(
+        self, kudos_ids: Iterable[UUID], states: List[ReactionState], user_id: Optional[UUID]
+    ) -> List[ReactionState]:
+        """Apply unflushed toggles to reaction states loaded from the database."""
+        with self._lock:
+            if not self._deltas:
+                return states
+            result = []
+            for kudos_id, state in zip(kudos_ids, states):
+                counts = dict(state.counts)
+                user_reactions = set(state.user_reactions)
+                for (counter_kudos_id, reaction_type), delta in self._deltas.items():
+                    if counter_kudos_id != kudos_id:
+                        continue
+                    counts[reaction_type] = counts.get(reaction_type, 0) + delta
+                    key = (user_id, kudos_id, reaction_type)
+                    reacted = self._pending.get(key, self._flushing.get(key))
+                    if reacted is True:
+                        user_reactions.add(reaction_type)
+                    elif reacted is False:
+                        user_reactions.discard(reaction_type)
+                result.append(ReactionState(counts, user_reactions))
+            return result
+
+    def overlay_reactors(
+        self, kudos_ids: Iterable[UUID], reactors: Dict[UUID, Dict[str, Set[UUID]]]
+    ) -> None:
+        """Apply unflushed toggles, in place, to the users behind each kudos' reactions.
+
+        Unlike the count deltas these are idempotent, so it doesn't matter
+        whether `reactors` was loaded before or after an in-flight flush landed.
+        """
+        ids = set(kudos_ids)
+        with self._lock:
+            # In-flight first: a reaction toggled again since is pending
+            for changes in (self._flushing, self._pending):
+                for (user_id, kudos_id, reaction_type), reacted in changes.items():
+                    if kudos_id not in ids:
+                        continue
+                    users = reactors.setdefault(kudos_id, {}).setdefault(reaction_type, set())
+                    if reacted:
+                        users.add(user_id)
+                    else:
+                        users.discard(user_id)
+
+    def flush(self) -> int:
+        """Write pending toggles in one transaction; returns how many were written."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            self._flushing, self._pending = self._pending, {}
+            self._flushing_base, self._base = self._base, {}
+            batch = dict(self._flushing)
+
+        try:
+            with get_sync_db() as db:
+                sync_reaction_repository.apply_toggles(
+                    db,
+                    added=[key for key, reacted in batch.items() if reacted],
+                    removed=[key for key, reacted in batch.items() if not reacted],
+                )
+        except Exception:
+            self._requeue()
+            raise
+
+        with self._lock:
+            for (_, kudos_id, reaction_type), reacted in batch.items():
+                counter = (kudos_id, reaction_type)
+                self._deltas[counter] = self._deltas.get(counter, 0) - (1 if reacted else -1)
+            self._deltas = {counter: delta for counter, delta in self._deltas.items() if delta}
+            self._flushing, self._flushing_base = {}, {}
+            self.flushes += 1
+        # Another worker may have rendered and cached these kudos from the
+        # database, without this process's overlay, since the toggle
+        # invalidated the cache
+        cache.invalidate()
+        return len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"pending": len(self._pending), "flushes": self.flushes}
+
+    def _requeue(self) -> None:
+        # Put a failed batch back so the next flush retries it
+        with self._lock:
+            for key, reacted in self._flushing.items():
+                base = self._flushing_base[key]
+                if key in self._pending:
+                    # Toggled again meanwhile, relative to a flush that never landed
+                    self._base[key] = base
+                    if self._pending[key] == base:
+                        del self._pending[key]
+                        del self._base[key]
+                else:
+                    self._pending[key] = reacted
+                    self._base[key] = base
+            self._flushing, self._flushing_base = {}, {}
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush reaction buffer, will retry")
+
+
+reaction_buffer: Optional[ReactionBuffer] = (
+    ReactionBuffer(settings.REACTION_BUFFER_FLUSH_MS, settings.REACTION_BUFFER_MAX_PENDING)
+    if settings.REACTION_BUFFER_ENABLED
+    else None
+)
@@ -2,131 +2,87 @@ import strawberry
 from typing import List, Optional
 from uuid import UUID
 
+from strawberry import relay
 from strawberry.fastapi import GraphQLRouter
 from strawberry.types import Info
 
 from app.models.kudos import Kudos as KudosModel
-from app.models.user import User as UserModel
-from app.models.reaction import Reaction as ReactionModel
 from app.graphql.sync_db import get_sync_db
-from app.graphql.sync_repositories import sync_user_repository, sync_kudos_repository
+from app.graphql.batch import KudosBatch, validate_message
+from app.graphql.extensions import (
+    DocumentCache,
+    Metrics,
+    PersistedQueriesOnly,
+    ReplicaRouting,
+    ResponseCache,
+    Tracing,
+    time_root_resolvers,
+    trace_root_resolvers,
+)
+from app.graphql.hot_feed import hot_feed
+from app.graphql.loaders import ReactionSummaryLoader
+from app.graphql.persisted_queries import AllowListSchema, persisted_query_store
+from app.graphql.reaction_buffer import reaction_buffer
+from app.graphql.selection import FULL_KUDOS_SELECTION, KudosSelection, kudos_selection
+from app.graphql.pubsub import KUDOS_CREATED, REACTION_CHANGED, pubsub
+from app.graphql.subscriptions import Subscription
+from app.graphql.types import (
+    Kudos,
+    KudosSearchResult,
+    ReactionChange,
+    ReactionSummary,
+    SearchOrder,
+    SendKudosInput,
+    SendKudosResult,
+    ToggleReactionInput,
+    User,
+    build_reaction_summaries,
+    to_kudos,
+    to_search_results,
+    to_user,
+)
+from app.graphql.pagination import (
+    DEFAULT_PAGE_SIZE,
+    build_connection,
+    clamp_page_size,
+    decode_cursor,
+    decode_search_cursor,
+    encode_search_cursor,
+)
+from app.graphql.sync_repositories import (
+    sync_kudos_repository,
+    sync_reaction_repository,
+    sync_user_repository,
+)
+from app.graphql.async_resolvers import AsyncMutation, AsyncQuery
+from app.core import tracing
+from app.core.cache import cache
+from app.core.config import settings
 from app.core.middleware import get_current_user_from_context, require_authenticated_user
+from app.core.tracing import traced
+from app.repository.kudos_search import clean_query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, text
-
-@strawberry.type
-class User:
-    id: str
-    email: str
-    name: str
-    avatar_url: Optional[str] = None
-
-@strawberry.type
-class ReactionSummary:
-    reaction_type: str
-    count: int
-    user_reacted: bool = False
-    
-    @strawberry.field
-    def reactionType(self) -> str:
-        return self.reaction_type
-    
-    @strawberry.field
-    def userReacted(self) -> bool:
-        return self.user_reacted
-
-@strawberry.type
-class Kudos:
-    id: str
-    sender_id: str
-    receiver_id: str
-    message: str
-    created_at: str
-    updated_at: str
-    sender: Optional[User] = None
-    receiver: Optional[User] = None
-    reactions: List[ReactionSummary] = strawberry.field(default_factory=list)
-    
-    @strawberry.field
-    def createdAt(self) -> str:
-        return self.created_at
-    
-    @strawberry.field
-    def senderId(self) -> str:
-        return self.sender_id
-        
-    @strawberry.field  
-    def receiverId(self) -> str:
-        return self.receiver_id
-
-@strawberry.input
-class SendKudosInput:
-    receiverId: str
-    message: str
-
-@strawberry.input
-class ToggleReactionInput:
-    kudosId: str
-    reactionType: str
-
-def to_user(user: UserModel) -> User:
-    return User(
-        id=str(user.id),
-        email=user.email,
-        name=user.name,
-        avatar_url=user.avatar_url
-    )
 
 def get_reaction_summaries(db: Session, kudos_id: UUID, user_id: Optional[UUID] = None) -> List[ReactionSummary]:
     """Get reaction summaries for a kudos with counts and user reaction status"""
-    # Get count by reaction type
-    reaction_counts = db.query(
-        ReactionModel.reaction_type,
-        func.count(ReactionModel.id).label('count')
-    ).filter(
-        ReactionModel.kudos_id == kudos_id
-    ).group_by(ReactionModel.reaction_type).all()
-    
-    # Get user's reactions if user_id provided
-    user_reactions = set()
-    if user_id:
-        user_reaction_types = db.query(ReactionModel.reaction_type).filter(
-            ReactionModel.kudos_id == kudos_id,
-            ReactionModel.user_id == user_id
-        ).all()
-        user_reactions = {r.reaction_type for r in user_reaction_types}
-    
-    # Always show these 4 reaction types with their counts
-    default_reactions = ['❤️', '👏', '🎉', '🚀']
-    reaction_map = {r.reaction_type: r.count for r in reaction_counts}
-    
-    summaries = []
-    for reaction_type in default_reactions:
-        count = reaction_map.get(reaction_type, 0)
-        user_reacted = reaction_type in user_reactions
-        summaries.append(ReactionSummary(
-            reaction_type=reaction_type,
-            count=count,
-            user_reacted=user_reacted
-        ))
-    
-    return summaries
+    return build_reaction_summaries(ReactionSummaryLoader(db, user_id).load(kudos_id))
 
-def to_kudos(kudos: KudosModel, user_id: Optional[UUID] = None) -> Kudos:
-    with get_sync_db() as db:
-        reactions = get_reaction_summaries(db, kudos.id, user_id)
-    
-    return Kudos(
-        id=str(kudos.id),
-        sender_id=str(kudos.sender_id),
-        receiver_id=str(kudos.receiver_id),
-        message=kudos.message,
-        created_at=kudos.created_at.isoformat() if kudos.created_at else "",
-        updated_at=kudos.updated_at.isoformat() if kudos.updated_at else "",
-        sender=to_user(kudos.sender) if kudos.sender else None,
-        receiver=to_user(kudos.receiver) if kudos.receiver else None,
-        reactions=reactions
-    )
+@traced("to_kudos_page")
+def to_kudos_page(
+    db: Session,
+    kudos_list: List[KudosModel],
+    user_id: Optional[UUID] = None,
+    selection: KudosSelection = FULL_KUDOS_SELECTION,
+) -> List[Kudos]:
+    """Convert a page of kudos, loading reactions for the whole page in one batch"""
+    if not selection.reactions:
+        return [to_kudos(kudos, selection=selection) for kudos in kudos_list]
+    loader = ReactionSummaryLoader(db, user_id)
+    states = loader.load_many(kudos.id for kudos in kudos_list)
+    return [
+        to_kudos(kudos, build_reaction_summaries(state), selection)
+        for kudos, state in zip(kudos_list, states)
+    ]
 
 def get_users(info: Info, limit: int = 20) -> List[User]:
     with get_sync_db() as db:
@@ -134,9 +90,16 @@ def get_users(info: Info, limit: int = 20) -> List[User]:
         return [to_user(user) for user in users]
 
 def get_kudos_received(info: Info, user_id: UUID, limit: int = 20) -> List[Kudos]:
+    selection = kudos_selection(info)
     with get_sync_db() as db:
-        kudos_list = sync_kudos_repository.get_received_kudos(db, receiver_id=user_id, limit=limit)
-        return [to_kudos(kudos) for kudos in kudos_list]
+        kudos_list = sync_kudos_repository.get_received_kudos(
+            db,
+            receiver_id=user_id,
+            limit=limit,
+            with_sender=selection.sender,
+            with_receiver=selection.receiver,
+        )
+        return to_kudos_page(db, kudos_list, selection=selection)
 
 def send_kudos(
     info: Info,
@@ -144,68 +107,188 @@ def send_kudos(
 ) -> Optional[Kudos]:
     # Require authentication
     current_user = require_authenticated_user(info)
+    message = validate_message(input.message)
     
     with get_sync_db() as db:
         # Create the kudos object using authenticated user as sender
         kudos = KudosModel(
             sender_id=current_user.id,
             receiver_id=UUID(input.receiverId),
-            message=input.message
+            message=message
         )
         created_kudos = sync_kudos_repository.create(db, kudos)
-        return to_kudos(created_kudos, current_user.id)
+        result = to_kudos(created_kudos, get_reaction_summaries(db, created_kudos.id, current_user.id))
+
+    generation = cache.invalidate()
+    if hot_feed:
+        hot_feed.add(created_kudos, generation)
+    pubsub.publish(KUDOS_CREATED, result)
+    return result
 
 def get_kudos_list(info: Info, limit: int = 100) -> List[Kudos]:
     # Get current user for reaction context (optional)
     current_user = get_current_user_from_context(info)
     user_id = current_user.id if current_user else None
     
+    page = hot_feed.get_page(limit, cache.generation()) if hot_feed else None
+    if page is not None:
+        return [entry.to_kudos(user_id) for entry in page]
+    
+    selection = kudos_selection(info)
+    with get_sync_db() as db:
+        kudos_list = sync_kudos_repository.list(
+            db, limit=limit, with_sender=selection.sender, with_receiver=selection.receiver
+        )
+        return to_kudos_page(db, kudos_list, user_id, selection)
+
+def get_users_connection(
+    info: Info, first: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None
+) -> relay.Connection[User]:
+    first = clamp_page_size(first)
     with get_sync_db() as db:
-        kudos_list = sync_kudos_repository.list(db, limit=limit)
-        return [to_kudos(kudos, user_id) for kudos in kudos_list]
+        users = sync_user_repository.list_page(db, limit=first + 1, after=decode_cursor(after))
+        return build_connection(users, first, lambda page: [to_user(user) for user in page])
+
+def get_kudos_connection(
+    info: Info, first: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None
+) -> relay.Connection[Kudos]:
+    current_user = get_current_user_from_context(info)
+    user_id = current_user.id if current_user else None
+    first = clamp_page_size(first)
+
+    page = hot_feed.get_page(first + 1, cache.generation()) if hot_feed and not after else None
+    if page is not None:
+        return build_connection(page, first, lambda entries: [e.to_kudos(user_id) for e in entries])
+
+    selection = kudos_selection(info, "edges", "node")
+    with get_sync_db() as db:
+        kudos_list = sync_kudos_repository.list_page(
+            db,
+            limit=first + 1,
+            after=decode_cursor(after),
+            with_sender=selection.sender,
+            with_receiver=selection.receiver,
+        )
+        return build_connection(
+            kudos_list, first, lambda page: to_kudos_page(db, page, user_id, selection)
+        )
+
+def get_kudos_received_connection(
+    info: Info, user_id: UUID, first: int = DEFAULT_PAGE_SIZE, after: Optional[str] = None
+) -> relay.Connection[Kudos]:
+    first = clamp_page_size(first)
+    selection = kudos_selection(info, "edges", "node")
+    with get_sync_db() as db:
+        kudos_list = sync_kudos_repository.get_received_kudos_page(
+            db,
+            receiver_id=user_id,
+            limit=first + 1,
+            after=decode_cursor(after),
+            with_sender=selection.sender,
+            with_receiver=selection.receiver,
+        )
+        return build_connection(
+            kudos_list, first, lambda page: to_kudos_page(db, page, selection=selection)
+        )
+
+def search_kudos(
+    info: Info,
+    query: str,
+    first: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+    order: SearchOrder = SearchOrder.RELEVANCE,
+) -> relay.Connection[KudosSearchResult]:
+    text = clean_query(query, settings.SEARCH_QUERY_MAX_LENGTH)
+    first = clamp_page_size(first)
+    if not text:
+        return build_connection([], first, list)
+
+    current_user = get_current_user_from_context(info)
+    user_id = current_user.id if current_user else None
+    selection = kudos_selection(info, "edges", "node", "kudos")
+    with get_sync_db() as db:
+        hits = sync_kudos_repository.search(
+            db,
+            text,
+            order,
+            limit=first + 1,
+            after=decode_search_cursor(after),
+            rank_window=settings.SEARCH_RANK_WINDOW,
+            scan_rows=settings.SEARCH_SCAN_ROWS,
+            max_scan_rows=settings.SEARCH_MAX_SCAN_ROWS,
+            with_sender=selection.sender,
+            with_receiver=selection.receiver,
+        )
+        return build_connection(
+            hits,
+            first,
+            lambda page: to_search_results(
+                page, to_kudos_page(db, [hit.kudos for hit in page], user_id, selection)
+            ),
+            cursor=encode_search_cursor,
+        )
+
+def send_kudos_batch(info: Info, inputs: List[SendKudosInput]) -> List[SendKudosResult]:
+    """Send many kudos in one call; each item reports its own kudos or error"""
+    current_user = require_authenticated_user(info)
+    batch = KudosBatch(current_user, inputs)
+
+    with get_sync_db() as db:
+        rows = batch.rows(sync_user_repository.get_many(db, batch.receiver_ids))
+        results = batch.complete(rows, sync_kudos_repository.insert_many(db, rows))
+
+    batch.announce()
+    return results
 
 def toggle_reaction(info: Info, input: ToggleReactionInput) -> bool:
     """Toggle a reaction - add if not exists, remove if exists"""
     # Require authentication
     current_user = require_authenticated_user(info)
     
+    kudos_id = UUID(input.kudosId)
+    user_id = current_user.id
+    reaction_type = input.reactionType
+
     with get_sync_db() as db:
-        kudos_id = UUID(input.kudosId)
-        user_id = current_user.id
-        reaction_type = input.reactionType
-        
-        # Check if reaction already exists
-        existing_reaction = db.query(ReactionModel).filter(
-            ReactionModel.kudos_id == kudos_id,
-            ReactionModel.user_id == user_id,
-            ReactionModel.reaction_type == reaction_type
-        ).first()
-        
-        if existing_reaction:
-            # Remove reaction
-            db.delete(existing_reaction)
-            db.commit()
-            return False  # Removed
-        else:
-            # Add reaction
-            new_reaction = ReactionModel(
-                kudos_id=kudos_id,
-                user_id=user_id,
-                reaction_type=reaction_type
+        if reaction_buffer:
+            db_reacted, db_count = sync_reaction_repository.reaction_state(
+                db, kudos_id, user_id, reaction_type
             )
-            db.add(new_reaction)
-            db.commit()
-            return True  # Added
+            added, count = reaction_buffer.toggle(kudos_id, user_id, reaction_type, db_reacted, db_count)
+        else:
+            added, count = sync_reaction_repository.toggle(db, kudos_id, user_id, reaction_type)
+
+    generation = cache.invalidate()
+    if hot_feed:
+        hot_feed.apply_reaction(kudos_id, user_id, reaction_type, added, generation)
+    pubsub.publish(
+        REACTION_CHANGED,
+        ReactionChange(
+            kudos_id=str(kudos_id),
+            user_id=str(user_id),
+            reaction_type=reaction_type,
+            added=added,
+            count=count,
+        ),
+    )
+    return added
 
 @strawberry.type
 class Query:
     users: List[User] = strawberry.field(resolver=get_users)
     kudos_received: List[Kudos] = strawberry.field(resolver=get_kudos_received)
     kudos: List[Kudos] = strawberry.field(resolver=get_kudos_list)
+    users_connection: relay.Connection[User] = strawberry.field(resolver=get_users_connection)
+    kudos_connection: relay.Connection[Kudos] = strawberry.field(resolver=get_kudos_connection)
+    kudos_received_connection: relay.Connection[Kudos] = strawberry.field(
+        resolver=get_kudos_received_connection
+    )
+    search_kudos: relay.Connection[KudosSearchResult] = strawberry.field(resolver=search_kudos)
 
 @strawberry.type
 class Mutation:
     send_kudos: Kudos = strawberry.field(resolver=send_kudos)
+    send_kudos_batch: List[SendKudosResult] = strawberry.field(resolver=send_kudos_batch)
     toggle_reaction: bool = strawberry.field(resolver=toggle_reaction)
     
     @strawberry.field
@@ -219,5 +302,33 @@ class Mutation:
 def get_context(request, response=None):
     return {"request": request, "response": response}
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+def build_schema(async_resolvers: bool = settings.GRAPHQL_ASYNC_RESOLVERS) -> strawberry.Schema:
+    """Build the schema with either the sync (psycopg2) or async (asyncpg) resolvers."""
+    extensions = [DocumentCache]
+    allow_list_only = persisted_query_store.allow_list_only
+    if allow_list_only:
+        extensions.insert(0, PersistedQueriesOnly)
+    if settings.METRICS_ENABLED:
+        extensions.insert(0, Metrics)
+    if tracing.enabled():
+        extensions.insert(0, Tracing)
+    if settings.CACHE_ENABLED:
+        extensions.append(ResponseCache)
+    if settings.DATABASE_REPLICA_URIS:
+        extensions.append(ReplicaRouting)
+    if async_resolvers:
+        query, mutation = AsyncQuery, AsyncMutation
+    else:
+        query, mutation = Query, Mutation
+    schema_class = AllowListSchema if allow_list_only else strawberry.Schema
+    schema = schema_class(
+        query=query, mutation=mutation, subscription=Subscription, extensions=extensions
+    )
+    if settings.METRICS_ENABLED:
+        time_root_resolvers(schema)
+    if tracing.enabled():
+        trace_root_resolvers(schema)
+    return schema
+
+schema = build_schema()
 graphql_router = GraphQLRouter(schema, context_getter=get_context)
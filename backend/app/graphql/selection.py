@@ -0,0 +1,58 @@
+"""
+Work out which parts of a kudos the client selected, so resolvers only join
+users and load reactions when the query asks for them.
+"""
+from typing import Iterable, NamedTuple, Set
+
+from strawberry.types import Info
+from strawberry.types.nodes import SelectedField, Selection
+
+
+class KudosSelection(NamedTuple):
+    sender: bool = True
+    receiver: bool = True
+    reactions: bool = True
+
+
+FULL_KUDOS_SELECTION = KudosSelection()
+
+
+def _field_names(selections: Iterable[Selection]) -> Set[str]:
+    # Fragments and inline fragments contribute their fields directly
+    names: Set[str] = set()
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            names.add(selection.name)
+        else:
+            names |= _field_names(selection.selections)
+    return names
+
+
+def _children(selections: Iterable[Selection], name: str) -> list:
+    children = []
+    for selection in selections:
+        if isinstance(selection, SelectedField):
+            if selection.name == name:
+                children += selection.selections
+        else:
+            children += _children(selection.selections, name)
+    return children
+
+
+def kudos_selection(info: Info, *path: str) -> KudosSelection:
+    """Selection of the kudos returned by the current field.
+
+    `path` leads from the field to the kudos objects, e.g. `("edges", "node")`
+    for connections.
+    """
+    selections = []
+    for field in info.selected_fields:
+        selections += field.selections
+    for name in path:
+        selections = _children(selections, name)
+    names = _field_names(selections)
+    return KudosSelection(
+        sender="sender" in names,
+        receiver="receiver" in names,
+        reactions="reactions" in names,
+    )
@@ -0,0 +1,27 @@
+"""
+GraphQL subscriptions, fed by the in-process pub/sub in `pubsub.py`.
+"""
+import strawberry
+from typing import AsyncGenerator, Optional
+
+from app.graphql.pubsub import KUDOS_CREATED, REACTION_CHANGED, pubsub
+from app.graphql.types import Kudos, ReactionChange
+
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    async def kudos_created(self) -> AsyncGenerator[Kudos, None]:
+        async with pubsub.subscribe(KUDOS_CREATED) as subscriber:
+            while True:
+                yield await subscriber.get()
+
+    @strawberry.subscription
+    async def reaction_changed(
+        self, kudos_id: Optional[str] = None
+    ) -> AsyncGenerator[ReactionChange, None]:
+        async with pubsub.subscribe(REACTION_CHANGED) as subscriber:
+            while True:
+                change = await subscriber.get()
+                if kudos_id is None or change.kudos_id == kudos_id:
+                    yield change
@@ -1,13 +1,29 @@
 """
 Synchronous repository methods for GraphQL to avoid greenlet issues.
 """
-from typing import List, Optional
-from uuid import UUID
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
 
 from app.models.user import User
 from app.models.kudos import Kudos
+from app.models.reaction import Reaction
+from app.models.reaction_count import ReactionCount
+from app.repository.keyset import seek_after, seek_before
+from app.repository.kudos_repository import user_options
+from app.repository.kudos_search import (
+    KudosSearchHit,
+    SearchCursor,
+    SearchOrder,
+    scanned_enough,
+    search_statement,
+    to_hits,
+    wider_scan,
+)
+from app.repository.reaction_repository import TOGGLE_REACTION_SQL, toggle_params
 
 
 class SyncUserRepository:
@@ -15,10 +31,20 @@ class SyncUserRepository:
         """Get list of users."""
         return db.query(User).limit(limit).all()
 
+    def list_page(
+        self, db: Session, limit: int = 20, after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[User]:
+        """Get a page of users in signup order, starting after the cursor."""
+        return seek_after(db.query(User), User, after).limit(limit).all()
+
     def get(self, db: Session, id: UUID) -> Optional[User]:
         """Get user by ID."""
         return db.query(User).filter(User.id == id).first()
 
+    def get_many(self, db: Session, ids: Iterable[UUID]) -> List[User]:
+        """Get the users among the given IDs that exist, in one query."""
+        return db.query(User).filter(User.id.in_(list(ids))).all()
+
     def get_by_id(self, db: Session, user_id: UUID) -> Optional[User]:
         """Get user by ID (alias for compatibility)."""
         return self.get(db, user_id)
@@ -36,27 +62,103 @@ class SyncUserRepository:
 
 
 class SyncKudosRepository:
-    def list(self, db: Session, limit: int = 100) -> List[Kudos]:
+    def list(
+        self, db: Session, limit: int = 100, with_sender: bool = True, with_receiver: bool = True
+    ) -> List[Kudos]:
         """Get list of kudos with sender and receiver info."""
         return (
             db.query(Kudos)
-            .options(joinedload(Kudos.sender), joinedload(Kudos.receiver))
+            .options(*user_options(joinedload, with_sender=with_sender, with_receiver=with_receiver))
             .order_by(Kudos.created_at.desc())
             .limit(limit)
             .all()
         )
 
-    def get_received_kudos(self, db: Session, receiver_id: UUID, limit: int = 20) -> List[Kudos]:
+    def get_received_kudos(
+        self,
+        db: Session,
+        receiver_id: UUID,
+        limit: int = 20,
+        with_sender: bool = True,
+        with_receiver: bool = True,
+    ) -> List[Kudos]:
         """Get kudos received by a user."""
         return (
             db.query(Kudos)
-            .options(joinedload(Kudos.sender), joinedload(Kudos.receiver))
+            .options(*user_options(joinedload, with_sender=with_sender, with_receiver=with_receiver))
             .filter(Kudos.receiver_id == receiver_id)
             .order_by(Kudos.created_at.desc())
             .limit(limit)
             .all()
         )
 
+    def list_page(
+        self,
+        db: Session,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        with_sender: bool = True,
+        with_receiver: bool = True,
+    ) -> List[Kudos]:
+        """Get a page of kudos, newest first, starting after the cursor."""
+        query = db.query(Kudos).options(
+            *user_options(joinedload, with_sender=with_sender, with_receiver=with_receiver)
+        )
+        return seek_before(query, Kudos, after).limit(limit).all()
+
+    def get_received_kudos_page(
+        self,
+        db: Session,
+        receiver_id: UUID,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        with_sender: bool = True,
+        with_receiver: bool = True,
+    ) -> List[Kudos]:
+        """Get a page of kudos received by a user, newest first, starting after the cursor."""
+        query = (
+            db.query(Kudos)
+            .options(*user_options(joinedload, with_sender=with_sender, with_receiver=with_receiver))
+            .filter(Kudos.receiver_id == receiver_id)
+        )
+        return seek_before(query, Kudos, after).limit(limit).all()
+
+    def search(
+        self,
+        db: Session,
+        text: str,
+        order: SearchOrder = SearchOrder.RELEVANCE,
+        limit: int = 20,
+        after: Optional[SearchCursor] = None,
+        rank_window: int = 1000,
+        scan_rows: int = 10000,
+        max_scan_rows: int = 200000,
+        with_sender: bool = True,
+        with_receiver: bool = True,
+    ) -> List[KudosSearchHit]:
+        """Get a page of kudos matching a web-style search, starting after the cursor."""
+        options = user_options(joinedload, with_sender=with_sender, with_receiver=with_receiver)
+
+        def fetch(scan_rows: Optional[int]):
+            statement = search_statement(text, order, limit, after, rank_window, scan_rows, options)
+            return db.execute(statement).all()
+
+        rows = fetch(scan_rows)
+        if not scanned_enough(rows, order, limit, rank_window, scan_rows):
+            wider = wider_scan(rows, order, rank_window, scan_rows, max_scan_rows)
+            if wider:
+                rows = fetch(wider)
+            if not wider or not scanned_enough(rows, order, limit, rank_window, wider):
+                rows = fetch(None)
+        return to_hits(rows)
+
+    def insert_many(self, db: Session, rows: List[dict]) -> List[Tuple[UUID, datetime]]:
+        """Insert many kudos with multi-row INSERT ... RETURNING; returns (id, created_at) in row order."""
+        if not rows:
+            return []
+        stmt = insert(Kudos).returning(Kudos.id, Kudos.created_at, sort_by_parameter_order=True)
+        return [tuple(row) for row in db.execute(stmt, rows)]
+
     def create(self, db: Session, kudos: Kudos) -> Kudos:
         """Create a new kudos."""
         db.add(kudos)
@@ -65,5 +167,164 @@ class SyncKudosRepository:
         return kudos
 
 
+# Counters that disagree with an aggregate over `reactions` (zero counters
+# with no reactions are fine)
+RECONCILE_DRIFT_SQL = """
+SELECT count(*) FROM (
+    SELECT r.kudos_id, r.reaction_type, count(*) AS actual
+    FROM reactions r
+    GROUP BY r.kudos_id, r.reaction_type
+) a
+FULL OUTER JOIN reaction_counts c
+    ON c.kudos_id = a.kudos_id AND c.reaction_type = a.reaction_type
+WHERE coalesce(a.actual, 0) <> coalesce(c.count, 0)
+"""
+
+
+class SyncReactionRepository:
+    def count_by_kudos(self, db: Session, kudos_ids: Iterable[UUID]) -> Dict[UUID, Dict[str, int]]:
+        """Get reaction counts per type for many kudos from the counter table."""
+        ids = list(kudos_ids)
+        counts: Dict[UUID, Dict[str, int]] = {}
+        if not ids:
+            return counts
+        rows = (
+            db.query(ReactionCount.kudos_id, ReactionCount.reaction_type, ReactionCount.count)
+            .filter(ReactionCount.kudos_id.in_(ids))
+            .all()
+        )
+        for kudos_id, reaction_type, count in rows:
+            counts.setdefault(kudos_id, {})[reaction_type] = count
+        return counts
+
+    def toggle(self, db: Session, kudos_id: UUID, user_id: UUID, reaction_type: str) -> Tuple[bool, int]:
+        """Toggle a user's reaction and its counter in one statement; returns (reacted, count)."""
+        reacted, count = db.execute(
+            TOGGLE_REACTION_SQL, toggle_params(kudos_id, user_id, reaction_type)
+        ).one()
+        return reacted, count
+
+    def apply_toggles(
+        self,
+        db: Session,
+        added: List[Tuple[UUID, UUID, str]],
+        removed: List[Tuple[UUID, UUID, str]],
+    ) -> Dict[Tuple[UUID, str], int]:
+        """Write batched reaction changes, keyed (user_id, kudos_id, type), and update their counters.
+
+        Counters move by the rows actually inserted or deleted, so changes another
+        writer already made are not counted twice. Returns the applied deltas.
+        """
+        deltas: Dict[Tuple[UUID, str], int] = {}
+        if removed:
+            rows = db.execute(
+                delete(Reaction)
+                .where(tuple_(Reaction.user_id, Reaction.kudos_id, Reaction.reaction_type).in_(removed))
+                .returning(Reaction.kudos_id, Reaction.reaction_type)
+                .execution_options(synchronize_session=False)
+            )
+            for kudos_id, reaction_type in rows:
+                deltas[(kudos_id, reaction_type)] = deltas.get((kudos_id, reaction_type), 0) - 1
+        if added:
+            rows = db.execute(
+                insert(Reaction)
+                .values([
+                    {"id": uuid4(), "user_id": user_id, "kudos_id": kudos_id, "reaction_type": reaction_type}
+                    for user_id, kudos_id, reaction_type in added
+                ])
+                .on_conflict_do_nothing(constraint="uq_user_kudos_reaction")
+                .returning(Reaction.kudos_id, Reaction.reaction_type)
+            )
+            for kudos_id, reaction_type in rows:
+                deltas[(kudos_id, reaction_type)] = deltas.get((kudos_id, reaction_type), 0) + 1
+        for (kudos_id, reaction_type), delta in deltas.items():
+            if delta:
+                self.adjust_count(db, kudos_id, reaction_type, delta)
+        return deltas
+
+    def reaction_state(
+        self, db: Session, kudos_id: UUID, user_id: UUID, reaction_type: str
+    ) -> Tuple[bool, int]:
+        """Whether the user has a reaction and its current count, in one query."""
+        reacted = (
+            select(Reaction.id)
+            .where(
+                Reaction.kudos_id == kudos_id,
+                Reaction.user_id == user_id,
+                Reaction.reaction_type == reaction_type,
+            )
+            .exists()
+        )
+        count = (
+            select(ReactionCount.count)
+            .where(ReactionCount.kudos_id == kudos_id, ReactionCount.reaction_type == reaction_type)
+            .scalar_subquery()
+        )
+        return tuple(db.execute(select(reacted, func.coalesce(count, 0))).one())
+
+    def adjust_count(self, db: Session, kudos_id: UUID, reaction_type: str, delta: int) -> int:
+        """Atomically add delta to a kudos' counter for one reaction type; returns the new count."""
+        stmt = insert(ReactionCount).values(
+            kudos_id=kudos_id, reaction_type=reaction_type, count=max(delta, 0)
+        )
+        return db.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_reaction_counts_kudos_type",
+                set_={"count": ReactionCount.count + delta, "updated_at": func.now()},
+            ).returning(ReactionCount.count)
+        ).scalar_one()
+
+    def rebuild_counts(self, db: Session) -> int:
+        """Rebuild all counters from `reactions`; returns how many counters were wrong."""
+        # Block concurrent toggles so no adjustment lands between the delete and the insert
+        db.execute(text("LOCK TABLE reactions IN SHARE MODE"))
+        drifted = db.execute(text(RECONCILE_DRIFT_SQL)).scalar_one()
+        db.execute(delete(ReactionCount))
+        db.execute(
+            insert(ReactionCount).from_select(
+                ["kudos_id", "reaction_type", "count"],
+                select(Reaction.kudos_id, Reaction.reaction_type, func.count(Reaction.id))
+                .group_by(Reaction.kudos_id, Reaction.reaction_type),
+                include_defaults=False,
+            )
+        )
+        return drifted
+
+    def user_reaction_types(
+        self, db: Session, kudos_ids: Iterable[UUID], user_id: UUID
+    ) -> Dict[UUID, Set[str]]:
+        """Get the reaction types a user has left on each of the given kudos."""
+        ids = list(kudos_ids)
+        reacted: Dict[UUID, Set[str]] = {}
+        if not ids:
+            return reacted
+        rows = (
+            db.query(Reaction.kudos_id, Reaction.reaction_type)
+            .filter(Reaction.user_id == user_id, Reaction.kudos_id.in_(ids))
+            .all()
+        )
+        for kudos_id, reaction_type in rows:
+            reacted.setdefault(kudos_id, set()).add(reaction_type)
+        return reacted
+
+    def reactors_by_kudos(
+        self, db: Session, kudos_ids: Iterable[UUID]
+    ) -> Dict[UUID, Dict[str, Set[UUID]]]:
+        """Get the users behind every reaction type for each of the given kudos."""
+        ids = list(kudos_ids)
+        reactors: Dict[UUID, Dict[str, Set[UUID]]] = {}
+        if not ids:
+            return reactors
+        rows = (
+            db.query(Reaction.kudos_id, Reaction.reaction_type, Reaction.user_id)
+            .filter(Reaction.kudos_id.in_(ids))
+            .all()
+        )
+        for kudos_id, reaction_type, user_id in rows:
+            reactors.setdefault(kudos_id, {}).setdefault(reaction_type, set()).add(user_id)
+        return reactors
+
+
 sync_user_repository = SyncUserRepository()
-sync_kudos_repository = SyncKudosRepository()
\ No newline at end of file
+sync_kudos_repository = SyncKudosRepository()
+sync_reaction_repository = SyncReactionRepository()
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Strawberry types shared by the sync and async GraphQL resolvers.
+"""
+import strawberry
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from app.core.tracing import traced
+from app.graphql.selection import FULL_KUDOS_SELECTION, KudosSelection
+from app.models.kudos import Kudos as KudosModel
+from app.models.user import User as UserModel
+from app.repository import kudos_search
+
+
+class ReactionState(NamedTuple):
+    counts: Dict[str, int]
+    user_reactions: Set[str]
+
+
+@strawberry.type
+class User:
+    id: str
+    email: str
+    name: str
+    avatar_url: Optional[str] = None
+
+@strawberry.type
+class ReactionSummary:
+    reaction_type: str
+    count: int
+    user_reacted: bool = False
+    
+    @strawberry.field
+    def reactionType(self) -> str:
+        return self.reaction_type
+    
+    @strawberry.field
+    def userReacted(self) -> bool:
+        return self.user_reacted
+
+@strawberry.type
+class Kudos:
+    id: str
+    sender_id: str
+    receiver_id: str
+    message: str
+    created_at: str
+    updated_at: str
+    sender: Optional[User] = None
+    receiver: Optional[User] = None
+    reactions: List[ReactionSummary] = strawberry.field(default_factory=list)
+    
+    @strawberry.field
+    def createdAt(self) -> str:
+        return self.created_at
+    
+    @strawberry.field
+    def senderId(self) -> str:
+        return self.sender_id
+        
+    @strawberry.field  
+    def receiverId(self) -> str:
+        return self.receiver_id
+
+SearchOrder = strawberry.enum(kudos_search.SearchOrder)
+
+@strawberry.type
+class KudosSearchResult:
+    """A kudos matching a search. `snippet` is HTML with matched words in <mark>."""
+    kudos: Kudos
+    rank: float
+    snippet: str
+
+@strawberry.type
+class ReactionChange:
+    kudos_id: str
+    user_id: str
+    reaction_type: str
+    added: bool
+    count: int
+
+@strawberry.type
+class SendKudosResult:
+    """Outcome of one item of a sendKudosBatch call, in input order."""
+    index: int
+    kudos: Optional[Kudos] = None
+    error: Optional[str] = None
+
+@strawberry.input
+class SendKudosInput:
+    receiverId: str
+    message: str
+
+@strawberry.input
+class ToggleReactionInput:
+    kudosId: str
+    reactionType: str
+
+def to_user(user: UserModel) -> User:
+    return User(
+        id=str(user.id),
+        email=user.email,
+        name=user.name,
+        avatar_url=user.avatar_url
+    )
+
+# Always show these 4 reaction types with their counts
+DEFAULT_REACTIONS = ['❤️', '👏', '🎉', '🚀']
+
+def build_reaction_summaries(state: ReactionState) -> List[ReactionSummary]:
+    """Build the fixed list of reaction summaries from loaded reaction state"""
+    return [
+        ReactionSummary(
+            reaction_type=reaction_type,
+            count=state.counts.get(reaction_type, 0),
+            user_reacted=reaction_type in state.user_reactions
+        )
+        for reaction_type in DEFAULT_REACTIONS
+    ]
+
+@traced("to_kudos")
+def to_kudos(
+    kudos: KudosModel,
+    reactions: Optional[List[ReactionSummary]] = None,
+    selection: KudosSelection = FULL_KUDOS_SELECTION,
+) -> Kudos:
+    # Only touch relationships that were selected, anything else was not loaded
+    return Kudos(
+        id=str(kudos.id),
+        sender_id=str(kudos.sender_id),
+        receiver_id=str(kudos.receiver_id),
+        message=kudos.message,
+        created_at=kudos.created_at.isoformat() if kudos.created_at else "",
+        updated_at=kudos.updated_at.isoformat() if kudos.updated_at else "",
+        sender=to_user(kudos.sender) if selection.sender and kudos.sender else None,
+        receiver=to_user(kudos.receiver) if selection.receiver and kudos.receiver else None,
+        reactions=reactions or []
+    )
+
+def to_search_results(hits: List[kudos_search.KudosSearchHit], kudos: List[Kudos]) -> List[KudosSearchResult]:
+    """Pair search hits with their converted kudos, in page order."""
+    return [
+        KudosSearchResult(kudos=node, rank=hit.rank, snippet=hit.snippet)
+        for hit, node in zip(hits, kudos)
+    ]
@@ -1,39 +1,29 @@
 import logging
-from fastapi import FastAPI, Depends, Request, Response
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from starlette.middleware.base import BaseHTTPMiddleware
-from strawberry.fastapi import GraphQLRouter
+from starlette.concurrency import run_in_threadpool
 
 from app.api.auth import router as auth_router
+from app.api.metrics import router as metrics_router
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.core.password_hashing import password_hasher
+from app.core.security_headers import SecurityHeadersMiddleware
+from app.core.tracing import exporter as trace_exporter
+from app.db.engines import engines
+from app.db.query_stats import QueryStatsMiddleware
+from app.db.routing import ReplicaRoutingMiddleware
+from app.graphql.hot_feed import hot_feed
+from app.graphql.reaction_buffer import reaction_buffer
+from app.graphql.http_cache import CachingGraphQLRouter
+from app.graphql.persisted_queries import persisted_query_store
 from app.graphql.schema import schema
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Security Headers Middleware
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        
-        # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        
-        # Content Security Policy
-        csp = "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; font-src 'self' data:; connect-src 'self' http://localhost:8001 http://localhost:3001 ws://localhost:3001;"
-        response.headers["Content-Security-Policy"] = csp
-        
-        # Only add HSTS in production with HTTPS
-        if settings.ENVIRONMENT == "production":
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        
-        return response
-
 app = FastAPI(
     title="Peer Bonus API",
     description="API for Peer Bonus application",
@@ -54,6 +44,16 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers for now
 )
 
+if settings.DB_QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+if settings.DATABASE_REPLICA_URIS:
+    app.add_middleware(ReplicaRoutingMiddleware, graphql_path="/graphql")
+
+# Outermost, so request latency includes the other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -61,18 +61,37 @@ async def health_check():
 
 # API routes
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router, tags=["metrics"])
 
 # GraphQL endpoint
-graphql_router = GraphQLRouter(schema)
+graphql_router = CachingGraphQLRouter(schema, store=persisted_query_store)
 app.include_router(graphql_router, prefix="/graphql")
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting up...")
+    await run_in_threadpool(password_hasher.start)
+    if reaction_buffer:
+        reaction_buffer.start()
+    if hot_feed:
+        try:
+            await run_in_threadpool(hot_feed.seed)
+        except Exception:
+            # Keep serving; feed requests fall through to the database
+            logger.exception("Failed to seed hot feed")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down...")
+    if reaction_buffer:
+        try:
+            await run_in_threadpool(reaction_buffer.stop)
+        except Exception:
+            logger.exception("Failed to flush buffered reactions")
+    password_hasher.shutdown()
+    await engines.dispose()
+    trace_exporter.close()
 
 if __name__ == "__main__":
     import uvicorn
@@ -18,7 +18,8 @@ class Base(DeclarativeBase):
     id: Mapped[UUID] = mapped_column(
         PG_UUID(as_uuid=True), 
         primary_key=True, 
-        default=uuid4
+        default=uuid4,
+        server_default=func.gen_random_uuid()
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
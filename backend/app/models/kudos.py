@@ -1,8 +1,8 @@
 from typing import List, Optional, TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, Text
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy import Computed, ForeignKey, Index, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -28,6 +28,12 @@ class Kudos(Base):
     
     # Message
     message: Mapped[str] = mapped_column(Text, nullable=False)
+    # Maintained by Postgres for full-text search; only the search query reads it
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('english', message)", persisted=True),
+        deferred=True,
+    )
     
     # Relationships
     sender: Mapped["User"] = relationship(
@@ -46,5 +52,14 @@ class Kudos(Base):
         cascade="all, delete-orphan"
     )
 
+    # Match the feed and received-kudos orderings (created_at, id), so keyset
+    # pages are read straight off the index
+    __table_args__ = (
+        Index('ix_kudos_created_at_id', 'created_at', 'id'),
+        Index('ix_kudos_receiver_created_at', 'receiver_id', 'created_at', 'id'),
+        Index('ix_kudos_sender_id', 'sender_id'),
+        Index('ix_kudos_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+
     def __repr__(self) -> str:
         return f"<Kudos {self.id} from {self.sender_id} to {self.receiver_id}>"
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -33,9 +33,11 @@ class Reaction(Base):
     user: Mapped["User"] = relationship("User", back_populates="reactions")
     kudos: Mapped["Kudos"] = relationship("Kudos", back_populates="reactions")
     
-    # Ensure one reaction per user per kudos per type
+    # Ensure one reaction per user per kudos per type; the second index serves
+    # lookups by kudos_id alone, which can't use the constraint's leading column
     __table_args__ = (
         UniqueConstraint('user_id', 'kudos_id', 'reaction_type', name='uq_user_kudos_reaction'),
+        Index('ix_reactions_kudos_type_user', 'kudos_id', 'reaction_type', 'user_id'),
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,32 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+class ReactionCount(Base):
+    """Denormalized per-kudos, per-type reaction counter.
+
+    Maintained by the reaction toggle in the same transaction as the
+    `reactions` row change; rebuilt from `reactions` by
+    `scripts.reconcile_reaction_counts`.
+    """
+    __tablename__ = "reaction_counts"
+    
+    kudos_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), 
+        ForeignKey("kudos.id"), 
+        nullable=False
+    )
+    reaction_type: Mapped[str] = mapped_column(String(10), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    
+    # One counter per kudos per type; also serves lookups by kudos_id
+    __table_args__ = (
+        UniqueConstraint('kudos_id', 'reaction_type', name='uq_reaction_counts_kudos_type'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ReactionCount {self.kudos_id} {self.reaction_type}={self.count}>"
@@ -1,6 +1,6 @@
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -54,5 +54,10 @@ class User(Base):
         cascade="all, delete-orphan"
     )
 
+    # Keyset order of the users connection
+    __table_args__ = (
+        Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+
     def __repr__(self) -> str:
         return f"<User {self.email}>"
@@ -0,0 +1,40 @@
+"""
+Keyset (seek) pagination predicates shared by the sync and async repositories.
+
+Both `Query` and `Select` support `filter` and `order_by`, so the same helpers
+serve the psycopg2 repositories used by GraphQL and the asyncpg ones.
+"""
+from datetime import datetime
+from typing import Optional, Tuple, TypeVar
+from uuid import UUID
+
+from sqlalchemy import and_, or_
+
+Q = TypeVar("Q")
+
+
+def older_than(model, cursor: Tuple[datetime, UUID]):
+    """Rows before the (created_at, id) cursor in newest-first order."""
+    created_at, id = cursor
+    return and_(
+        model.created_at <= created_at,
+        or_(model.created_at < created_at, and_(model.created_at == created_at, model.id < id)),
+    )
+
+
+def seek_before(query: Q, model, after: Optional[Tuple[datetime, UUID]]) -> Q:
+    """Order newest first and seek past the (created_at, id) cursor."""
+    if after:
+        query = query.filter(older_than(model, after))
+    return query.order_by(model.created_at.desc(), model.id.desc())
+
+
+def seek_after(query: Q, model, after: Optional[Tuple[datetime, UUID]]) -> Q:
+    """Order oldest first and seek past the (created_at, id) cursor."""
+    if after:
+        created_at, id = after
+        query = query.filter(
+            model.created_at >= created_at,
+            or_(model.created_at > created_at, and_(model.created_at == created_at, model.id > id)),
+        )
+    return query.order_by(model.created_at.asc(), model.id.asc())
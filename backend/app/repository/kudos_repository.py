@@ -1,14 +1,35 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.kudos import Kudos
 from app.repository.base_repository import BaseRepository
+from app.repository.keyset import seek_before
+from app.repository.kudos_search import (
+    KudosSearchHit,
+    SearchCursor,
+    SearchOrder,
+    scanned_enough,
+    search_statement,
+    to_hits,
+    wider_scan,
+)
 from app.schemas.kudos import KudosCreate, KudosUpdate
 
+def user_options(loader, *, with_sender: bool = True, with_receiver: bool = True) -> list:
+    """Eager-load options for the sender and receiver that were asked for."""
+    options = []
+    if with_sender:
+        options.append(loader(Kudos.sender))
+    if with_receiver:
+        options.append(loader(Kudos.receiver))
+    return options
+
+
 class KudosRepository(BaseRepository[Kudos, KudosCreate, KudosUpdate]):
     def __init__(self):
         super().__init__(Kudos)
@@ -47,4 +68,78 @@ class KudosRepository(BaseRepository[Kudos, KudosCreate, KudosUpdate]):
         )
         return result.scalars().all()
 
+    async def list_page(
+        self,
+        db: AsyncSession,
+        *,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        with_sender: bool = True,
+        with_receiver: bool = True,
+    ) -> List[Kudos]:
+        query = select(Kudos).options(
+            *user_options(selectinload, with_sender=with_sender, with_receiver=with_receiver)
+        )
+        result = await db.execute(seek_before(query, Kudos, after).limit(limit))
+        return result.scalars().all()
+
+    async def get_received_kudos_page(
+        self,
+        db: AsyncSession,
+        *,
+        receiver_id: UUID,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        with_sender: bool = True,
+        with_receiver: bool = True,
+    ) -> List[Kudos]:
+        query = (
+            select(Kudos)
+            .options(*user_options(selectinload, with_sender=with_sender, with_receiver=with_receiver))
+            .where(Kudos.receiver_id == receiver_id)
+        )
+        result = await db.execute(seek_before(query, Kudos, after).limit(limit))
+        return result.scalars().all()
+
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        text: str,
+        order: SearchOrder = SearchOrder.RELEVANCE,
+        limit: int = 20,
+        after: Optional[SearchCursor] = None,
+        rank_window: int = 1000,
+        scan_rows: int = 10000,
+        max_scan_rows: int = 200000,
+        with_sender: bool = True,
+        with_receiver: bool = True,
+    ) -> List[KudosSearchHit]:
+        options = user_options(selectinload, with_sender=with_sender, with_receiver=with_receiver)
+
+        async def fetch(scan_rows: Optional[int]):
+            statement = search_statement(text, order, limit, after, rank_window, scan_rows, options)
+            return (await db.execute(statement)).all()
+
+        rows = await fetch(scan_rows)
+        if not scanned_enough(rows, order, limit, rank_window, scan_rows):
+            wider = wider_scan(rows, order, rank_window, scan_rows, max_scan_rows)
+            if wider:
+                rows = await fetch(wider)
+            if not wider or not scanned_enough(rows, order, limit, rank_window, wider):
+                rows = await fetch(None)
+        return to_hits(rows)
+
+    async def insert_many(self, db: AsyncSession, *, rows: List[dict]) -> List[Tuple[UUID, datetime]]:
+        if not rows:
+            return []
+        stmt = insert(Kudos).returning(Kudos.id, Kudos.created_at, sort_by_parameter_order=True)
+        result = await db.execute(stmt, rows)
+        return [tuple(row) for row in result]
+
+    async def add(self, db: AsyncSession, *, kudos: Kudos) -> Kudos:
+        db.add(kudos)
+        await db.flush()
+        return await self.get_with_relations(db, id=kudos.id)
+
 kudos_repository = KudosRepository()
@@ -0,0 +1,226 @@
+"""
+Full-text kudos search shared by the sync and async repositories.
+
+Matches come from `kudos.search_vector`, a generated
+`to_tsvector('english', message)` column with a GIN index. Queries use web
+search syntax (`"exact phrase"`, `or`, `-excluded`) through
+`websearch_to_tsquery`.
+
+Both orders work on the newest matches, each with its own keyset:
+
+- RECENT: newest first on (created_at, id), like the feed.
+- RELEVANCE: `ts_rank_cd` first, then (created_at, id), over a window of at
+  most SEARCH_RANK_WINDOW of the newest matches. Kudos written between two
+  page fetches shift that window, which can drop a result at its edge.
+
+Finding the newest matches needs one of two plans, and the planner can't be
+trusted to choose: it guesses the same share of rows for every word missing
+from its statistics, a unique name and a fairly common word alike, and
+walking created_at for a name nobody used in years reads the whole table. So
+a search first filters the newest SEARCH_SCAN_ROWS kudos (past the cursor)
+straight off the created_at index, which finds enough for any term in
+regular use. Only if that finds too few matches (less than a page for RECENT,
+less than the whole window for RELEVANCE) is the term looked up in the GIN
+index, by a statement that can't fall back to walking created_at.
+
+The index lookup ranks every match, which takes seconds for a term in a few
+percent of 5M kudos: common enough to be searched, too rare to fill the
+relevance window from the first scan. RELEVANCE therefore first scans again,
+as far back as the first scan's share of matches says the window needs, up
+to SEARCH_MAX_SCAN_ROWS. A relevance scan also counts the kudos it read, so
+one that reached the oldest stands however few it found.
+
+The index keeps no word positions, so a phrase is checked against every
+kudos holding all of its words. A phrase of common words that never appear
+together is the one slow search: about 2s on 5M kudos.
+
+The page is picked by id first; `ts_headline`, the costly part, then runs on
+those rows only. Snippets are HTML: the message is escaped and matched words
+are wrapped in `<mark>`.
+"""
+import html
+import math
+from datetime import datetime
+from enum import Enum
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, cast, func, null, select, true, tuple_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+
+from app.models.kudos import Kudos
+from app.repository.keyset import older_than, seek_before
+
+SEARCH_CONFIG = "english"
+
+# Private-use characters marking matches in ts_headline output, swapped for
+# <mark> tags once the rest of the snippet is escaped
+_START, _STOP = "\ue000", "\ue001"
+HEADLINE_OPTIONS = f"StartSel={_START}, StopSel={_STOP}, MaxWords=35, MinWords=15"
+
+# (rank, created_at, id) of the last result on a page
+SearchCursor = Tuple[float, datetime, UUID]
+
+
+class SearchOrder(Enum):
+    RELEVANCE = "relevance"
+    RECENT = "recent"
+
+
+class KudosSearchHit(NamedTuple):
+    kudos: Kudos
+    rank: float
+    snippet: str
+
+    @property
+    def created_at(self) -> datetime:
+        return self.kudos.created_at
+
+    @property
+    def id(self) -> UUID:
+        return self.kudos.id
+
+
+def clean_query(text: str, max_length: int) -> str:
+    """The search text with surrounding whitespace dropped; rejects overlong input."""
+    text = text.strip()
+    if len(text) > max_length:
+        raise ValueError(f"Search query is longer than {max_length} characters")
+    return text
+
+
+def _matches(vector, query):
+    return vector.bool_op("@@")(query)
+
+
+def _newest_matches(
+    query, before: Optional[Tuple[datetime, UUID]], limit: int, scan_rows: Optional[int]
+):
+    """The newest `limit` matches older than `before`, newest first.
+
+    Taken from the newest `scan_rows` kudos, or from the GIN index when
+    `scan_rows` is None.
+    """
+    columns = (Kudos.id, Kudos.created_at, Kudos.search_vector)
+    if scan_rows:
+        source = seek_before(select(*columns), Kudos, before).limit(scan_rows).subquery("scanned")
+        matches = select(source).where(_matches(source.c.search_vector, query))
+    else:
+        lookup = select(*columns).where(_matches(Kudos.search_vector, query))
+        if before:
+            lookup = lookup.where(older_than(Kudos, before))
+        # Materialized, the lookup is planned without the ORDER BY ... LIMIT
+        # below, so the GIN index is the only way in
+        source = lookup.cte("matches").prefix_with("MATERIALIZED")
+        matches = select(source)
+    # float8, so a rank survives the round trip through a cursor unchanged
+    rank = cast(func.ts_rank_cd(source.c.search_vector, query), DOUBLE_PRECISION)
+    return (
+        matches.with_only_columns(source.c.id, source.c.created_at, rank.label("rank"))
+        .order_by(source.c.created_at.desc(), source.c.id.desc())
+        .limit(limit)
+        .cte("candidates")
+    )
+
+
+def search_statement(
+    text: str,
+    order: SearchOrder,
+    limit: int,
+    after: Optional[SearchCursor],
+    rank_window: int,
+    scan_rows: Optional[int],
+    options: list,
+) -> Select:
+    """SELECT (Kudos, rank, headline, found, scanned) for one page of matches, in `order`.
+
+    `found` counts the candidates the page was cut from, and for a RELEVANCE
+    scan `scanned` counts the kudos the scan read (NULL otherwise). The
+    statement always returns a row for them; on an empty page, that row's
+    other columns are NULL.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+    if order is SearchOrder.RELEVANCE:
+        candidates = _newest_matches(query, None, rank_window, scan_rows)
+        page = select(candidates)
+        if after:
+            page = page.where(
+                tuple_(candidates.c.rank, candidates.c.created_at, candidates.c.id)
+                < tuple_(*after)
+            )
+        page = page.order_by(
+            candidates.c.rank.desc(), candidates.c.created_at.desc(), candidates.c.id.desc()
+        )
+    else:
+        candidates = _newest_matches(query, after[1:] if after else None, limit, scan_rows)
+        page = select(candidates).order_by(candidates.c.created_at.desc(), candidates.c.id.desc())
+    page = page.limit(limit).subquery("page")
+    scanned = null()
+    if order is SearchOrder.RELEVANCE and scan_rows:
+        # Off the created_at index alone, without reading the rows again
+        read = seek_before(select(Kudos.id), Kudos, None).limit(scan_rows).subquery("read")
+        scanned = select(func.count()).select_from(read).scalar_subquery()
+    found = (
+        select(func.count().label("found"), scanned.label("scanned"))
+        .select_from(candidates)
+        .subquery("found")
+    )
+
+    # Strip the markers from the message itself, so every one in the output is ours
+    document = func.translate(Kudos.message, _START + _STOP, "")
+    headline = func.ts_headline(SEARCH_CONFIG, document, query, HEADLINE_OPTIONS)
+    ordering = (page.c.created_at.desc(), page.c.id.desc())
+    if order is SearchOrder.RELEVANCE:
+        ordering = (page.c.rank.desc(),) + ordering
+    return (
+        select(Kudos, page.c.rank, headline.label("headline"), found.c.found, found.c.scanned)
+        .select_from(found)
+        .outerjoin(page, true())
+        .outerjoin(Kudos, Kudos.id == page.c.id)
+        .options(*options)
+        .order_by(*ordering)
+    )
+
+
+def scanned_enough(
+    rows: Sequence[Any], order: SearchOrder, limit: int, rank_window: int, scan_rows: int
+) -> bool:
+    """Whether a page cut from a scan of `scan_rows` kudos stands.
+
+    A relevance page is only right if the scan filled the whole window, or
+    read every kudos: otherwise older matches that belong in it were never
+    ranked.
+    """
+    found, scanned = rows[0].found, rows[0].scanned
+    if scanned is not None and scanned < scan_rows:
+        return True
+    return found >= (rank_window if order is SearchOrder.RELEVANCE else limit)
+
+
+def wider_scan(
+    rows: Sequence[Any], order: SearchOrder, rank_window: int, scan_rows: int, max_scan_rows: int
+) -> Optional[int]:
+    """How many kudos to scan for a relevance window a scan of `scan_rows` fell short of.
+
+    None when that is more than `max_scan_rows`, or the scan found nothing
+    to go by: the index is cheaper for terms that rare.
+    """
+    found = rows[0].found
+    if order is not SearchOrder.RELEVANCE or not found:
+        return None
+    # A quarter more, so the share of matches can vary a little with age
+    wanted = math.ceil(scan_rows * rank_window / found * 1.25)
+    return wanted if wanted <= max_scan_rows else None
+
+
+def to_hits(rows: Sequence[Any]) -> List[KudosSearchHit]:
+    return [
+        KudosSearchHit(kudos, rank, highlight(headline))
+        for kudos, rank, headline, _, _ in rows
+        if kudos is not None
+    ]
+
+
+def highlight(headline: str) -> str:
+    """HTML snippet from ts_headline output, with matches in <mark> tags."""
+    return html.escape(headline).replace(_START, "<mark>").replace(_STOP, "</mark>")
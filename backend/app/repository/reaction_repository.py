@@ -0,0 +1,144 @@
+from typing import Dict, Iterable, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.reaction import Reaction
+from app.models.reaction_count import ReactionCount
+from app.repository.base_repository import BaseRepository
+from app.schemas.reaction import ReactionCreate, ReactionUpdate
+
+# Toggle a reaction and its counter in one statement. Deleting and inserting in
+# the same snapshot means a concurrent toggle of the same reaction either waits
+# on the row lock or hits ON CONFLICT DO NOTHING instead of a unique violation.
+# Returns whether the user has the reaction afterwards and the new count; a
+# toggle that lost a race with an identical insert is a no-op that reports the
+# reaction as present.
+TOGGLE_REACTION_SQL = text("""
+WITH deleted AS (
+    DELETE FROM reactions
+    WHERE kudos_id = :kudos_id AND user_id = :user_id AND reaction_type = :reaction_type
+    RETURNING 1
+), inserted AS (
+    INSERT INTO reactions (id, kudos_id, user_id, reaction_type)
+    SELECT :id, :kudos_id, :user_id, :reaction_type
+    WHERE NOT EXISTS (SELECT 1 FROM deleted)
+    ON CONFLICT ON CONSTRAINT uq_user_kudos_reaction DO NOTHING
+    RETURNING 1
+), delta AS (
+    SELECT (SELECT count(*) FROM inserted) - (SELECT count(*) FROM deleted) AS value
+), counted AS (
+    INSERT INTO reaction_counts (kudos_id, reaction_type, count)
+    SELECT :kudos_id, :reaction_type, greatest(value, 0) FROM delta
+    ON CONFLICT ON CONSTRAINT uq_reaction_counts_kudos_type
+    DO UPDATE SET count = reaction_counts.count + (SELECT value FROM delta), updated_at = now()
+    RETURNING count
+)
+SELECT
+    EXISTS (SELECT 1 FROM inserted) OR NOT EXISTS (SELECT 1 FROM deleted) AS reacted,
+    (SELECT count FROM counted) AS count
+""")
+
+
+def toggle_params(kudos_id: UUID, user_id: UUID, reaction_type: str) -> dict:
+    return {
+        "id": uuid4(),
+        "kudos_id": kudos_id,
+        "user_id": user_id,
+        "reaction_type": reaction_type,
+    }
+
+
+class ReactionRepository(BaseRepository[Reaction, ReactionCreate, ReactionUpdate]):
+    def __init__(self):
+        super().__init__(Reaction)
+
+    async def get_user_reaction(
+        self, db: AsyncSession, *, user_id: UUID, kudos_id: UUID, reaction_type: str
+    ) -> Optional[Reaction]:
+        result = await db.execute(
+            select(Reaction).where(
+                Reaction.user_id == user_id,
+                Reaction.kudos_id == kudos_id,
+                Reaction.reaction_type == reaction_type,
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def count_by_kudos(
+        self, db: AsyncSession, *, kudos_ids: Iterable[UUID]
+    ) -> Dict[UUID, Dict[str, int]]:
+        ids = list(kudos_ids)
+        counts: Dict[UUID, Dict[str, int]] = {}
+        if not ids:
+            return counts
+        result = await db.execute(
+            select(ReactionCount.kudos_id, ReactionCount.reaction_type, ReactionCount.count)
+            .where(ReactionCount.kudos_id.in_(ids))
+        )
+        for kudos_id, reaction_type, count in result.all():
+            counts.setdefault(kudos_id, {})[reaction_type] = count
+        return counts
+
+    async def user_reaction_types(
+        self, db: AsyncSession, *, kudos_ids: Iterable[UUID], user_id: UUID
+    ) -> Dict[UUID, Set[str]]:
+        ids = list(kudos_ids)
+        reacted: Dict[UUID, Set[str]] = {}
+        if not ids:
+            return reacted
+        result = await db.execute(
+            select(Reaction.kudos_id, Reaction.reaction_type).where(
+                Reaction.user_id == user_id, Reaction.kudos_id.in_(ids)
+            )
+        )
+        for kudos_id, reaction_type in result.all():
+            reacted.setdefault(kudos_id, set()).add(reaction_type)
+        return reacted
+
+    async def adjust_count(
+        self, db: AsyncSession, *, kudos_id: UUID, reaction_type: str, delta: int
+    ) -> int:
+        stmt = insert(ReactionCount).values(
+            kudos_id=kudos_id, reaction_type=reaction_type, count=max(delta, 0)
+        )
+        result = await db.execute(
+            stmt.on_conflict_do_update(
+                constraint="uq_reaction_counts_kudos_type",
+                set_={"count": ReactionCount.count + delta, "updated_at": func.now()},
+            ).returning(ReactionCount.count)
+        )
+        return result.scalar_one()
+
+    async def reaction_state(
+        self, db: AsyncSession, *, kudos_id: UUID, user_id: UUID, reaction_type: str
+    ) -> Tuple[bool, int]:
+        reacted = (
+            select(Reaction.id)
+            .where(
+                Reaction.kudos_id == kudos_id,
+                Reaction.user_id == user_id,
+                Reaction.reaction_type == reaction_type,
+            )
+            .exists()
+        )
+        count = (
+            select(ReactionCount.count)
+            .where(ReactionCount.kudos_id == kudos_id, ReactionCount.reaction_type == reaction_type)
+            .scalar_subquery()
+        )
+        result = await db.execute(select(reacted, func.coalesce(count, 0)))
+        return tuple(result.one())
+
+    async def toggle(
+        self, db: AsyncSession, *, kudos_id: UUID, user_id: UUID, reaction_type: str
+    ) -> Tuple[bool, int]:
+        result = await db.execute(
+            TOGGLE_REACTION_SQL, toggle_params(kudos_id, user_id, reaction_type)
+        )
+        reacted, count = result.one()
+        return reacted, count
+
+reaction_repository = ReactionRepository()
@@ -1,4 +1,5 @@
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 from uuid import UUID
 
 from sqlalchemy import select
@@ -7,6 +8,7 @@ from sqlalchemy.orm import selectinload
 
 from app.models.user import User
 from app.repository.base_repository import BaseRepository
+from app.repository.keyset import seek_after
 from app.schemas.user import UserCreate, UserUpdate
 
 class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
@@ -19,6 +21,10 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         )
         return result.scalar_one_or_none()
 
+    async def get_many(self, db: AsyncSession, *, ids: List[UUID]) -> List[User]:
+        result = await db.execute(select(User).where(User.id.in_(ids)))
+        return result.scalars().all()
+
     async def get_with_kudos(
         self, db: AsyncSession, *, id: UUID, include_sent: bool = True, include_received: bool = True
     ) -> Optional[User]:
@@ -32,4 +38,10 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         result = await db.execute(query)
         return result.scalar_one_or_none()
 
+    async def list_page(
+        self, db: AsyncSession, *, limit: int = 20, after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[User]:
+        result = await db.execute(seek_after(select(User), User, after).limit(limit))
+        return result.scalars().all()
+
 user_repository = UserRepository()
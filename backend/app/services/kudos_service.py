@@ -1,30 +1,91 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.repository.kudos_repository import KudosRepository
-from app.repository.user_repository import UserRepository
+from app.core.config import settings
+from app.repository.kudos_repository import kudos_repository
+from app.repository.kudos_search import KudosSearchHit, SearchCursor, SearchOrder
+from app.repository.reaction_repository import reaction_repository
+from app.repository.user_repository import user_repository
 from app.schemas.kudos import KudosCreate, Kudos
 from app.models.kudos import Kudos as KudosModel
 
 
 class KudosService:
     def __init__(self, db: AsyncSession):
-        self.kudos_repo = KudosRepository(db)
-        self.user_repo = UserRepository(db)
+        self.kudos_repo = kudos_repository
+        self.user_repo = user_repository
+        self.reaction_repo = reaction_repository
         self.db = db
 
-    async def create_kudos(self, kudos_data: KudosCreate, sender_id: str) -> KudosModel:
-        receiver = await self.user_repo.get_by_id(kudos_data.receiver_id)
+    async def create_kudos(self, kudos_data: KudosCreate) -> KudosModel:
+        receiver = await self.user_repo.get(self.db, kudos_data.receiver_id)
         if not receiver:
             raise ValueError(f"Receiver with id {kudos_data.receiver_id} not found")
-        
-        kudos = await self.kudos_repo.create_kudos(kudos_data, sender_id)
-        return kudos
 
-    async def get_kudos_feed(self, limit: int = 20, offset: int = 0) -> List[KudosModel]:
-        return await self.kudos_repo.get_kudos_feed(limit, offset)
+        kudos = KudosModel(
+            sender_id=kudos_data.sender_id,
+            receiver_id=kudos_data.receiver_id,
+            message=kudos_data.message,
+        )
+        return await self.kudos_repo.add(self.db, kudos=kudos)
+
+    async def insert_kudos_batch(self, rows: List[dict]) -> List[Tuple[UUID, datetime]]:
+        """Insert pre-validated kudos rows; returns (id, created_at) in row order."""
+        return await self.kudos_repo.insert_many(self.db, rows=rows)
+
+    async def get_kudos_feed(
+        self, limit: int = 20, after: Optional[Tuple[datetime, UUID]] = None, **relations: bool
+    ) -> List[KudosModel]:
+        return await self.kudos_repo.list_page(self.db, limit=limit, after=after, **relations)
+
+    async def get_user_received_kudos(
+        self,
+        user_id: UUID,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        **relations: bool,
+    ) -> List[KudosModel]:
+        return await self.kudos_repo.get_received_kudos_page(
+            self.db, receiver_id=user_id, limit=limit, after=after, **relations
+        )
+
+    async def search_kudos(
+        self,
+        text: str,
+        order: SearchOrder = SearchOrder.RELEVANCE,
+        limit: int = 20,
+        after: Optional[SearchCursor] = None,
+        **relations: bool,
+    ) -> List[KudosSearchHit]:
+        return await self.kudos_repo.search(
+            self.db,
+            text=text,
+            order=order,
+            limit=limit,
+            after=after,
+            rank_window=settings.SEARCH_RANK_WINDOW,
+            scan_rows=settings.SEARCH_SCAN_ROWS,
+            max_scan_rows=settings.SEARCH_MAX_SCAN_ROWS,
+            **relations,
+        )
+
+    async def get_user_sent_kudos(self, user_id: UUID, limit: int = 20, offset: int = 0) -> List[KudosModel]:
+        return await self.kudos_repo.get_sent_kudos(self.db, sender_id=user_id, skip=offset, limit=limit)
 
-    async def get_user_received_kudos(self, user_id: str, limit: int = 20, offset: int = 0) -> List[KudosModel]:
-        return await self.kudos_repo.get_user_received_kudos(user_id, limit, offset)
+    async def toggle_reaction(
+        self, user_id: UUID, kudos_id: UUID, reaction_type: str
+    ) -> Tuple[bool, int]:
+        """Toggle a reaction - returns whether the user has it afterwards and the new count for its type"""
+        return await self.reaction_repo.toggle(
+            self.db, kudos_id=kudos_id, user_id=user_id, reaction_type=reaction_type
+        )
 
-    async def get_user_sent_kudos(self, user_id: str, limit: int = 20, offset: int = 0) -> List[KudosModel]:
-        return await self.kudos_repo.get_user_sent_kudos(user_id, limit, offset)
\ No newline at end of file
+    async def get_reaction_state(
+        self, user_id: UUID, kudos_id: UUID, reaction_type: str
+    ) -> Tuple[bool, int]:
+        """Whether the user has the reaction and its current count"""
+        return await self.reaction_repo.reaction_state(
+            self.db, kudos_id=kudos_id, user_id=user_id, reaction_type=reaction_type
+        )
@@ -1,41 +1,44 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.repository.user_repository import UserRepository
-from app.schemas.user import UserCreate
+from app.repository.user_repository import user_repository
 from app.models.user import User
-from app.core.security import get_password_hash
+from app.core.middleware import invalidate_user
 
 
 class UserService:
     def __init__(self, db: AsyncSession):
-        self.user_repo = UserRepository(db)
+        self.user_repo = user_repository
         self.db = db
 
-    async def create_user(self, user_data: UserCreate) -> User:
-        existing_user = await self.user_repo.get_by_email(user_data.email)
-        if existing_user:
-            raise ValueError(f"User with email {user_data.email} already exists")
-        
-        hashed_password = get_password_hash(user_data.password)
-        user = await self.user_repo.create_user(user_data, hashed_password)
+    async def deactivate_user(self, user_id: UUID) -> Optional[User]:
+        """Deactivate a user; commits the session."""
+        user = await self.user_repo.get(self.db, user_id)
+        if not user:
+            return None
+        user.is_active = False
+        # Cached lookups would keep the user signed in until they expire.
+        # Commit before invalidating, or a concurrent lookup could read the
+        # still-active row and cache it again
+        await self.db.commit()
+        await invalidate_user(user_id)
         return user
 
-    async def get_user_by_id(self, user_id: str) -> Optional[User]:
-        return await self.user_repo.get_by_id(user_id)
+    async def get_user_by_id(self, user_id: UUID) -> Optional[User]:
+        return await self.user_repo.get(self.db, user_id)
+
+    async def get_users_by_ids(self, user_ids: List[UUID]) -> List[User]:
+        return await self.user_repo.get_many(self.db, ids=user_ids)
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
-        return await self.user_repo.get_by_email(email)
+        return await self.user_repo.get_by_email(self.db, email=email)
 
     async def get_all_users(self, limit: int = 100, offset: int = 0) -> List[User]:
-        return await self.user_repo.get_all_users(limit, offset)
+        return await self.user_repo.list(self.db, skip=offset, limit=limit)
 
-    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
-        user = await self.user_repo.get_by_email(email)
-        if not user:
-            return None
-        
-        from app.core.security import verify_password
-        if not verify_password(password, user.hashed_password):
-            return None
-        
-        return user
\ No newline at end of file
+    async def get_users_page(
+        self, limit: int = 20, after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[User]:
+        return await self.user_repo.list_page(self.db, limit=limit, after=after)
@@ -0,0 +1,74 @@
+"""
+Measure per-request parse + validate cost with and without the document cache.
+
+Uses the operations the frontend sends. "before" parses and validates the
+query text on every request, as Strawberry does by default; "after" is the
+hash + LRU lookup `DocumentCache` performs once a document has been seen.
+
+    python -m scripts.bench_document_cache --iterations 2000
+"""
+import argparse
+import time
+
+from graphql.validation import specified_rules
+from strawberry.schema.execute import parse_document, validate_document
+
+from app.graphql.extensions import DocumentCache
+from app.graphql.persisted_queries import query_hash
+from app.graphql.schema import schema
+
+OPERATIONS = {
+    "feed": """
+query {
+  kudos {
+    id message createdAt
+    sender { id name email avatarUrl }
+    receiver { id name email avatarUrl }
+    reactions { reactionType count userReacted }
+  }
+}
+""",
+    "users": "query { users { id name email avatarUrl } }",
+    "toggleReaction": """
+mutation ToggleReaction($input: ToggleReactionInput!) {
+  toggleReaction(input: $input)
+}
+""",
+    "sendKudos": """
+mutation SendKudos($input: SendKudosInput!) {
+  sendKudos(input: $input) { id message createdAt receiver { id name } }
+}
+""",
+}
+
+
+def parse_and_validate(query: str):
+    document = parse_document(query)
+    return document, validate_document(schema._schema, document, tuple(specified_rules))
+
+
+def per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'operation':<16}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, query in OPERATIONS.items():
+        document, errors = parse_and_validate(query)
+        assert not errors, errors
+        DocumentCache.documents.set(query_hash(query), [document, tuple(errors)], float("inf"))
+
+        before = per_call_us(lambda: parse_and_validate(query), args.iterations)
+        after = per_call_us(lambda: DocumentCache.documents.get(query_hash(query)), args.iterations)
+        print(f"{name:<16}{before:>14.1f}{after:>14.2f}{before / after:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Count the SQL statements issued by the kudos feed resolver for different
+selections and page sizes.
+
+Queries run through the sync schema with the hot feed and response cache
+bypassed, so every request reaches the database. Usage (from the backend
+directory, against a seeded database):
+
+    python -m scripts.bench_feed_queries --limits 10 50 100 500
+    python -m scripts.bench_feed_queries --limits 20 --show-sql
+"""
+import argparse
+import time
+
+import strawberry
+from sqlalchemy import event
+
+from app.db.engines import engines
+from app.graphql import schema as graphql_schema
+
+SELECTIONS = {
+    "minimal": "id message",
+    "users": "id message sender { name } receiver { name }",
+    "reactions": "id message reactions { reactionType count userReacted }",
+    "full": "id message sender { name } receiver { name } reactions { reactionType count userReacted }",
+}
+
+
+class _Request:
+    headers: dict = {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 50, 100, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--show-sql", action="store_true", help="print the statements for each selection")
+    args = parser.parse_args()
+
+    graphql_schema.hot_feed = None
+    schema = strawberry.Schema(query=graphql_schema.Query)
+    context = {"request": _Request()}
+    statements = []
+
+    def record(conn, cursor, statement, *_):
+        statements.append(statement)
+
+    event.listen(engines.sync_engine(), "before_cursor_execute", record)
+
+    print(f"{'selection':<10} {'limit':>6} {'rows':>6} {'queries':>8} {'avg ms':>8}")
+    for name, fields in SELECTIONS.items():
+        for limit in args.limits:
+            query = f"query {{ kudos(limit: {limit}) {{ {fields} }} }}"
+            statements.clear()
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                result = schema.execute_sync(query, context_value=context)
+                if result.errors:
+                    raise RuntimeError(result.errors)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / args.repeat
+            per_request = statements[: len(statements) // args.repeat]
+            rows = len(result.data["kudos"])
+            print(f"{name:<10} {limit:>6} {rows:>6} {len(per_request):>8} {elapsed_ms:>8.1f}")
+        if args.show_sql:
+            for statement in per_request:
+                print("    " + " ".join(statement.split()))
+
+
+if __name__ == "__main__":
+    main()
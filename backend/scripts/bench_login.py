@@ -0,0 +1,112 @@
+"""
+Login latency under concurrent load, with a GraphQL feed poller running alongside.
+
+Registers a throwaway user, then fires N concurrent `/api/auth/login` requests
+while one client keeps polling the feed. Reports login and feed latency
+percentiles and how many logins were refused with 503. `--inline` runs bcrypt
+on the request thread pool instead of the process pool, for comparison.
+
+    python -m scripts.bench_login --concurrency 64
+    python -m scripts.bench_login --concurrency 64 --inline
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+from app.api import auth
+from app.core.config import settings
+from app.core.password_hashing import PasswordHasher, password_hasher
+from app.main import app
+
+FEED_QUERY = "query { kudos(limit: 20) { id message reactions { count } } }"
+
+
+class InlineHasher(PasswordHasher):
+    async def _run(self, fn, *args):
+        return await run_in_threadpool(fn, *args)
+
+
+def percentiles(samples) -> dict:
+    if len(samples) < 2:
+        return {}
+    quantiles = statistics.quantiles(samples, n=100)
+    return {
+        "p50_ms": round(quantiles[49] * 1000, 1),
+        "p95_ms": round(quantiles[94] * 1000, 1),
+        "p99_ms": round(quantiles[98] * 1000, 1),
+    }
+
+
+async def run(concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+        credentials = {"email": email, "password": "bench-password"}
+        response = await client.post(
+            "/api/auth/register", json={**credentials, "name": "Bench User"}
+        )
+        response.raise_for_status()
+
+        login_latencies, feed_latencies, statuses = [], [], []
+        done = asyncio.Event()
+
+        async def login() -> None:
+            started = time.perf_counter()
+            response = await client.post("/api/auth/login", json=credentials)
+            statuses.append(response.status_code)
+            if response.status_code == 200:
+                login_latencies.append(time.perf_counter() - started)
+
+        async def poll_feed() -> None:
+            while not done.is_set():
+                started = time.perf_counter()
+                response = await client.post("/graphql", json={"query": FEED_QUERY})
+                response.raise_for_status()
+                feed_latencies.append(time.perf_counter() - started)
+
+        await login()  # warm up
+        login_latencies.clear()
+        statuses.clear()
+
+        poller = asyncio.create_task(poll_feed())
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await poller
+
+    return {
+        "logins": concurrency,
+        "ok": statuses.count(200),
+        "rejected_503": statuses.count(503),
+        "seconds": round(elapsed, 2),
+        "login": percentiles(login_latencies),
+        "feed": percentiles(feed_latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--inline", action="store_true", help="hash on the request thread pool")
+    args = parser.parse_args()
+
+    if args.inline:
+        auth.password_hasher = InlineHasher(0, 0)
+    else:
+        password_hasher.start()
+    try:
+        result = asyncio.run(run(args.concurrency))
+    finally:
+        password_hasher.shutdown()
+    result["mode"] = "inline" if args.inline else f"pool({settings.PASSWORD_HASH_WORKERS})"
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Compare per-request middleware overhead of the old and new stacks on /health.
+
+"old" is the app's middleware stack with SecurityHeadersMiddleware as it was,
+a BaseHTTPMiddleware rebuilding its headers on every request; "new" is the
+pure ASGI version. Both run under the same CORS, query stats and metrics
+middleware, and "bare" is the route with no middleware at all. Requests are
+driven straight through the ASGI callable, so no HTTP client or server time
+is included.
+
+Usage (from the backend directory):
+
+    python -m scripts.bench_middleware_stack --requests 5000 --rounds 5
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.core.security_headers import SecurityHeadersMiddleware
+from app.db.query_stats import QueryStatsMiddleware
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+
+        csp = "default-src 'self'; script-src 'self' 'unsafe-inline' 'unsafe-eval'; style-src 'self' 'unsafe-inline'; img-src 'self' data: https:; font-src 'self' data:; connect-src 'self' http://localhost:8001 http://localhost:3001 ws://localhost:3001;"
+        response.headers["Content-Security-Policy"] = csp
+
+        if settings.ENVIRONMENT == "production":
+            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+
+        return response
+
+
+def build_app(security_headers=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    if security_headers is None:
+        return app
+    app.add_middleware(security_headers)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+def _receiver():
+    # The body, then nothing until the server would report a disconnect
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    return receive
+
+
+async def _drive(app, n: int) -> float:
+    headers = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            headers[:] = message["headers"]
+
+    started = time.perf_counter()
+    for _ in range(n):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/health",
+            "raw_path": b"/health",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"localhost"), (b"origin", b"http://localhost:3001")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("localhost", 8000),
+        }
+        await app(scope, _receiver(), send)
+    elapsed = (time.perf_counter() - started) / n * 1e6
+    assert security_header_count(headers) in (0, 5, 6), headers
+    return elapsed
+
+
+def security_header_count(headers) -> int:
+    names = {b"x-content-type-options", b"x-frame-options", b"x-xss-protection",
+             b"referrer-policy", b"content-security-policy", b"strict-transport-security"}
+    return sum(1 for name, _ in headers if name in names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    apps = {
+        "bare": build_app(),
+        "old": build_app(LegacySecurityHeadersMiddleware),
+        "new": build_app(SecurityHeadersMiddleware),
+    }
+
+    async def run():
+        for app in apps.values():
+            await _drive(app, 500)  # warm up
+        # Alternate the stacks and keep each one's best round, to damp noise
+        best = {name: float("inf") for name in apps}
+        for _ in range(args.rounds):
+            for name, app in apps.items():
+                best[name] = min(best[name], await _drive(app, args.requests))
+        return best
+
+    best = asyncio.run(run())
+    for name, micros in best.items():
+        extra = f"  (+{micros - best['bare']:.1f} us over bare)" if name != "bare" else ""
+        print(f"{name:>5}: {micros:6.1f} us/request{extra}")
+    saved = best["old"] - best["new"]
+    print(f"new stack saves {saved:.1f} us/request ({saved / best['old'] * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare the sync (psycopg2) and async (asyncpg) resolver modes under concurrent feed load.
+
+Each mode gets its own in-process app, driven over the ASGI transport with
+N concurrent `kudos(limit: L)` requests. Usage (against a seeded database):
+
+    python -m scripts.bench_resolver_modes --concurrency 500 --limit 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+from strawberry.fastapi import GraphQLRouter
+
+from app.graphql.schema import build_schema
+
+FEED_QUERY = """
+query Feed($limit: Int!) {
+  kudos(limit: $limit) {
+    id message createdAt
+    sender { id name } receiver { id name }
+    reactions { reactionType count userReacted }
+  }
+}
+"""
+
+
+def build_app(async_resolvers: bool) -> FastAPI:
+    app = FastAPI()
+    app.include_router(GraphQLRouter(build_schema(async_resolvers)), prefix="/graphql")
+    return app
+
+
+async def run(async_resolvers: bool, concurrency: int, limit: int) -> dict:
+    transport = httpx.ASGITransport(app=build_app(async_resolvers))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        payload = {"query": FEED_QUERY, "variables": {"limit": limit}}
+
+        async def one() -> float:
+            started = time.perf_counter()
+            response = await client.post("/graphql", json=payload)
+            response.raise_for_status()
+            if response.json().get("errors"):
+                raise RuntimeError(response.json()["errors"])
+            return time.perf_counter() - started
+
+        await one()  # warm up pools
+        started = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(one() for _ in range(concurrency))))
+        elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "mode": "async" if async_resolvers else "sync",
+        "requests": concurrency,
+        "seconds": round(elapsed, 3),
+        "rps": round(concurrency / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 1),
+        "p95_ms": round(quantiles[94] * 1000, 1),
+        "p99_ms": round(quantiles[98] * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    for async_resolvers in (False, True):
+        print(asyncio.run(run(async_resolvers, args.concurrency, args.limit)))
+
+
+if __name__ == "__main__":
+    main()
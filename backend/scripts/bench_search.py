@@ -0,0 +1,201 @@
+"""
+Time kudos search on a large table: first and deeper pages, both orders,
+for terms from very common to unique.
+
+Seeds a scratch database (created next to the configured one) with --kudos
+rows whose messages mix a few openers with topics drawn from a skewed
+distribution, a project codename from a long tail and a unique "#n" tag, so
+there are terms of every frequency, then builds the GIN index as the
+migration would. The database is kept, so later runs skip seeding;
+--reseed starts over and --drop removes it at the end. Timings cover the
+repository call, snippets and ORM loading included. Usage (from the backend
+directory):
+
+    python -m scripts.bench_search --kudos 5000000
+    python -m scripts.bench_search --kudos 200000 --reseed --drop
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.graphql.pagination import clamp_page_size
+from app.graphql.sync_repositories import sync_kudos_repository
+from app.models.base import Base
+from app.models.kudos import Kudos
+from app.models.reaction import Reaction  # noqa: F401 - registers the relationship targets
+from app.models.user import User  # noqa: F401
+from app.repository.kudos_search import SearchOrder
+
+USERS = 10_000
+OPENERS = ["Thanks for", "Great job on", "Appreciate your help with", "Kudos for", "Nice work on"]
+# Earlier topics are picked far more often (see SEED_SQL)
+TOPICS = [
+    "the release", "the demo", "code review", "the migration", "on-call", "the incident",
+    "onboarding", "the roadmap", "the postmortem", "load testing", "the design doc",
+    "pairing", "the hackathon", "accessibility fixes", "the billing rewrite",
+    "flaky tests", "the offsite", "the latency regression", "dependency upgrades",
+    "the search feature",
+]
+# Project codenames p1..pN, log-uniform: p1 is in about 6% of kudos, p1000 in 0.008%
+PROJECTS = 200_000
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (id, email, name, password_hash, is_active, created_at)
+    SELECT gen_random_uuid(), 'user' || g || '@example.com', 'User ' || g, '', true,
+           now() - g * interval '1 hour'
+    FROM generate_series(1, {USERS}) g
+    """,
+    f"""
+    WITH u AS (SELECT array_agg(id) AS ids FROM users)
+    INSERT INTO kudos (id, message, sender_id, receiver_id, created_at)
+    SELECT gen_random_uuid(),
+           (ARRAY{OPENERS!r})[1 + floor(random() * {len(OPENERS)})::int] || ' '
+           || (ARRAY{TOPICS!r})[1 + floor(power(random(), 3) * {len(TOPICS)})::int] || ' and '
+           || (ARRAY{TOPICS!r})[1 + floor(power(random(), 3) * {len(TOPICS)})::int]
+           || ' on project p' || floor(exp(random() * ln({PROJECTS})))::int || ' #' || g,
+           ids[1 + floor(random() * {USERS})::int], ids[1 + floor(random() * {USERS})::int],
+           now() - g * interval '1 second'
+    FROM generate_series(1, :kudos) g, u
+    """,
+]
+
+# (label, query); unique tags are filled in from --kudos
+QUERIES = [
+    ("common", "thanks"),
+    ("two terms", "release demo"),
+    ("phrase", '"code review"'),
+    ("no phrase", '"demo thanks"'),
+    ("negation", "migration -incident"),
+    ("either", "hackathon or offsite"),
+    ("p1", "p1"),
+    ("p30", "p30"),
+    ("p300", "p300"),
+    ("p3000", "p3000"),
+    ("unique tag", "{tag}"),
+]
+
+
+def _url(database: str):
+    return make_url(settings.DATABASE_URI).set(drivername="postgresql+psycopg2", database=database)
+
+
+def seed(engine, kudos: int) -> None:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # Building the index once after loading beats maintaining it row by row
+        conn.execute(text("DROP INDEX ix_kudos_search_vector"))
+        conn.execute(text("SET LOCAL maintenance_work_mem = '512MB'"))
+        for statement in SEED_SQL:
+            started = time.perf_counter()
+            conn.execute(text(statement), {"kudos": kudos})
+            print(f"seeded in {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        conn.execute(text("CREATE INDEX ix_kudos_search_vector ON kudos USING gin (search_vector)"))
+        print(f"GIN index built in {time.perf_counter() - started:.1f}s")
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+def run_pages(db: Session, query: str, order: SearchOrder, pages: int, first: int):
+    """Milliseconds per page, following the cursors, and the matches seen."""
+    timings, after, seen = [], None, 0
+    for _ in range(pages):
+        started = time.perf_counter()
+        hits = sync_kudos_repository.search(
+            db,
+            query,
+            order,
+            limit=first + 1,
+            after=after,
+            rank_window=settings.SEARCH_RANK_WINDOW,
+            scan_rows=settings.SEARCH_SCAN_ROWS,
+            max_scan_rows=settings.SEARCH_MAX_SCAN_ROWS,
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+        page = hits[:first]
+        seen += len(page)
+        if len(hits) <= first:
+            break
+        last = page[-1]
+        after = (last.rank, last.created_at, last.id)
+    return timings, seen
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--kudos", type=int, default=5_000_000)
+    parser.add_argument("--database", default="peer_bench_search")
+    parser.add_argument("--first", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10, help="pages followed per run")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--drop", action="store_true", help="drop the database afterwards")
+    args = parser.parse_args()
+    first = clamp_page_size(args.first)
+
+    admin = create_engine(_url("postgres"), isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": args.database}
+        ).scalar()
+        if exists and args.reseed:
+            conn.execute(text(f"DROP DATABASE {args.database}"))
+        if not exists or args.reseed:
+            conn.execute(text(f"CREATE DATABASE {args.database} ENCODING 'UTF8' TEMPLATE template0"))
+
+    engine = create_engine(_url(args.database))
+    try:
+        with Session(engine) as db:
+            rows = db.scalar(select(func.count()).select_from(Kudos)) if exists and not args.reseed else 0
+        if rows != args.kudos:
+            print(f"seeding {args.kudos:,} kudos into {args.database}")
+            seed(engine, args.kudos)
+        else:
+            print(f"reusing {rows:,} kudos in {args.database}")
+
+        tag = str(args.kudos // 3)
+        print(f"\n{'query':<11} {'order':<10} {'matches':>9} {'p1 p50':>8} {'p1 p95':>8} "
+              f"{'deep p50':>9} {'deep p95':>9}   (ms; deep = pages 2-{args.pages})")
+        with Session(engine) as db:
+            for label, query in QUERIES:
+                query = query.format(tag=tag)
+                matches = db.scalar(
+                    select(func.count()).select_from(Kudos)
+                    .where(Kudos.search_vector.bool_op("@@")(func.websearch_to_tsquery("english", query)))
+                )
+                for order in SearchOrder:
+                    run_pages(db, query, order, args.pages, first)  # warm up
+                    firsts, deeper = [], []
+                    for _ in range(args.repeat):
+                        timings, _ = run_pages(db, query, order, args.pages, first)
+                        firsts.append(timings[0])
+                        deeper += timings[1:]
+                    row = f"{label:<11} {order.value:<10} {matches:>9,} {_p(firsts, 50):>8.2f} {_p(firsts, 95):>8.2f}"
+                    if deeper:
+                        row += f" {_p(deeper, 50):>9.2f} {_p(deeper, 95):>9.2f}"
+                    print(row)
+    finally:
+        engine.dispose()
+        if args.drop:
+            with admin.connect() as conn:
+                conn.execute(text(f"DROP DATABASE IF EXISTS {args.database}"))
+        admin.dispose()
+
+
+def _p(samples, percentile: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[percentile - 1]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Measure the server memory cost of idle `kudosCreated` subscribers.
+
+Starts the app under uvicorn in a subprocess, records its RSS, opens N
+graphql-transport-ws connections that each subscribe to `kudosCreated`, then
+records RSS again and reports the per-connection delta. Usage:
+
+    python -m scripts.bench_subscribers --connections 5000
+
+Every connection takes a file descriptor on both sides, so raise the limit
+first (`ulimit -n 20000`).
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import httpx
+import websockets
+
+SUBSCRIPTION = "subscription { kudosCreated { id message } }"
+
+
+def rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("VmRSS not found")
+
+
+def start_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+async def subscribe(url: str, index: int):
+    ws = await websockets.connect(url, subprotocols=["graphql-transport-ws"], max_queue=1)
+    await ws.send(json.dumps({"type": "connection_init"}))
+    ack = json.loads(await ws.recv())
+    if ack["type"] != "connection_ack":
+        raise RuntimeError(ack)
+    await ws.send(json.dumps({"id": str(index), "type": "subscribe", "payload": {"query": SUBSCRIPTION}}))
+    return ws
+
+
+async def open_subscribers(port: int, connections: int, batch: int) -> list:
+    url = f"ws://127.0.0.1:{port}/graphql"
+    sockets = []
+    for start in range(0, connections, batch):
+        count = min(batch, connections - start)
+        sockets += await asyncio.gather(*(subscribe(url, start + i) for i in range(count)))
+    # Let the server finish setting up the last subscriptions
+    await asyncio.sleep(2)
+    return sockets
+
+
+async def measure(pid: int, port: int, connections: int, batch: int) -> tuple:
+    # Warm up one connection so lazily imported modules don't skew the delta
+    for ws in await open_subscribers(port, 1, 1):
+        await ws.close()
+    baseline = rss_kib(pid)
+    sockets = await open_subscribers(port, connections, batch)
+    loaded = rss_kib(pid)
+    await asyncio.gather(*(ws.close() for ws in sockets))
+    return baseline, loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=250)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = start_server(args.port)
+    try:
+        baseline, loaded = asyncio.run(measure(server.pid, args.port, args.connections, args.batch))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(
+        json.dumps(
+            {
+                "connections": args.connections,
+                "baseline_rss_mib": round(baseline / 1024, 1),
+                "loaded_rss_mib": round(loaded / 1024, 1),
+                "per_connection_kib": round((loaded - baseline) / args.connections, 2),
+            }
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
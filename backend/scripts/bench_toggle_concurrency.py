@@ -0,0 +1,105 @@
+"""
+Hammer one kudos with parallel reaction toggles and check the counter stays exact.
+
+Each of --users users toggles the same reaction on the newest kudos
+--toggles times, with up to --concurrency toggles in flight (including
+several at once from the same user, like double-clicks). Afterwards the
+counter must equal the number of reaction rows and no toggle may fail.
+Usage (against a seeded database):
+
+    python -m scripts.bench_toggle_concurrency --users 50 --toggles 20 --concurrency 64
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.kudos import Kudos
+from app.models.reaction import Reaction
+from app.models.reaction_count import ReactionCount
+from app.models.user import User
+from app.repository.reaction_repository import reaction_repository
+
+REACTION_TYPE = "bench"
+
+
+async def run(users: int, toggles: int, concurrency: int) -> dict:
+    engine = create_async_engine(settings.DATABASE_URI, pool_size=concurrency, max_overflow=0)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with Session() as db:
+        kudos_id = (await db.execute(select(Kudos.id).order_by(Kudos.created_at.desc()).limit(1))).scalar_one()
+        user_ids = (await db.execute(select(User.id).limit(users))).scalars().all()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = []
+
+    async def toggle(user_id) -> None:
+        async with semaphore, Session() as db:
+            try:
+                await reaction_repository.toggle(
+                    db, kudos_id=kudos_id, user_id=user_id, reaction_type=REACTION_TYPE
+                )
+                await db.commit()
+            except Exception as error:
+                errors.append(error)
+
+    jobs = [user_id for user_id in user_ids for _ in range(toggles)]
+    random.shuffle(jobs)
+    started = time.perf_counter()
+    await asyncio.gather(*(toggle(user_id) for user_id in jobs))
+    elapsed = time.perf_counter() - started
+
+    async with Session() as db:
+        rows = (
+            await db.execute(
+                select(func.count()).select_from(Reaction).where(
+                    Reaction.kudos_id == kudos_id, Reaction.reaction_type == REACTION_TYPE
+                )
+            )
+        ).scalar_one()
+        counter = (
+            await db.execute(
+                select(ReactionCount.count).where(
+                    ReactionCount.kudos_id == kudos_id, ReactionCount.reaction_type == REACTION_TYPE
+                )
+            )
+        ).scalar_one_or_none()
+        # Leave the database as we found it
+        await db.execute(delete(Reaction).where(Reaction.reaction_type == REACTION_TYPE))
+        await db.execute(delete(ReactionCount).where(ReactionCount.reaction_type == REACTION_TYPE))
+        await db.commit()
+    await engine.dispose()
+
+    return {
+        "toggles": len(jobs),
+        "seconds": round(elapsed, 2),
+        "toggles_per_s": round(len(jobs) / elapsed, 1),
+        "errors": len(errors),
+        "reaction_rows": rows,
+        "counter": counter,
+        "consistent": not errors and rows == (counter or 0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--toggles", type=int, default=20, help="toggles per user")
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.users, args.toggles, args.concurrency))
+    print(result)
+    if not result["consistent"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Load-test harness for the GraphQL and auth endpoints.
+
+Runs each scenario for --duration seconds with --concurrency clients in a
+closed loop and prints throughput, error counts and p50/p95/p99 latency as
+JSON. By default requests go in-process to `app.main:app` over the ASGI
+transport (startup and shutdown hooks included); --base-url targets a running
+server instead. `--output` saves the run and `--compare` diffs two saved runs.
+
+    python -m scripts.load_test --duration 10 --concurrency 32 --output before.json
+    python -m scripts.load_test --base-url http://localhost:8000 --scenarios feed me
+    python -m scripts.load_test --compare before.json after.json
+
+Scenarios write to the database they run against: `send_kudos` adds kudos and
+`toggle_reaction` flips one reaction on the newest kudos. Each run registers a
+throwaway user.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import time
+import uuid
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+FEED_QUERY = """
+query Feed {
+  kudos(limit: 20) {
+    id message createdAt
+    sender { id name } receiver { id name }
+    reactions { reactionType count userReacted }
+  }
+}
+"""
+USERS_QUERY = "query Users { users(limit: 2) { id } }"
+NEWEST_KUDOS_QUERY = "query Newest { kudos(limit: 1) { id } }"
+SEND_KUDOS_MUTATION = """
+mutation Send($input: SendKudosInput!) { sendKudos(input: $input) { id } }
+"""
+TOGGLE_REACTION_MUTATION = """
+mutation Toggle($input: ToggleReactionInput!) { toggleReaction(input: $input) }
+"""
+PASSWORD = "load-test-password"
+
+
+class Session:
+    """A registered, logged-in user plus the IDs the write scenarios target."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+        self.headers: Dict[str, str] = {}
+        self.receiver_id: Optional[str] = None
+        self.kudos_id: Optional[str] = None
+
+    async def setup(self) -> None:
+        credentials = {"email": self.email, "password": PASSWORD}
+        response = await self.client.post(
+            "/api/auth/register", json={**credentials, "name": "Load Test"}
+        )
+        response.raise_for_status()
+        user_id = response.json()["id"]
+        response = await self.client.post("/api/auth/login", json=credentials)
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        users = (await self.graphql(USERS_QUERY))["users"]
+        self.receiver_id = next((u["id"] for u in users if u["id"] != user_id), user_id)
+        kudos = (await self.graphql(NEWEST_KUDOS_QUERY))["kudos"]
+        if not kudos:
+            await self.graphql(
+                SEND_KUDOS_MUTATION,
+                {"input": {"receiverId": self.receiver_id, "message": "Load test"}},
+            )
+            kudos = (await self.graphql(NEWEST_KUDOS_QUERY))["kudos"]
+        self.kudos_id = kudos[0]["id"]
+
+    async def graphql(self, query: str, variables: Optional[dict] = None) -> dict:
+        response = await self.client.post(
+            "/graphql", json={"query": query, "variables": variables}, headers=self.headers
+        )
+        response.raise_for_status()
+        body = response.json()
+        if body.get("errors"):
+            raise RuntimeError(body["errors"])
+        return body["data"]
+
+
+def _graphql(query: str, variables: Callable[[Session], Optional[dict]] = lambda s: None):
+    async def request(session: Session) -> httpx.Response:
+        return await session.client.post(
+            "/graphql",
+            json={"query": query, "variables": variables(session)},
+            headers=session.headers,
+        )
+
+    return request
+
+
+async def _login(session: Session) -> httpx.Response:
+    return await session.client.post(
+        "/api/auth/login", json={"email": session.email, "password": PASSWORD}
+    )
+
+
+async def _me(session: Session) -> httpx.Response:
+    return await session.client.get("/api/auth/me", headers=session.headers)
+
+
+SCENARIOS: Dict[str, Callable[[Session], Awaitable[httpx.Response]]] = {
+    "feed": _graphql(FEED_QUERY),
+    "send_kudos": _graphql(
+        SEND_KUDOS_MUTATION,
+        lambda s: {"input": {"receiverId": s.receiver_id, "message": "Load test kudos"}},
+    ),
+    "toggle_reaction": _graphql(
+        TOGGLE_REACTION_MUTATION,
+        lambda s: {"input": {"kudosId": s.kudos_id, "reactionType": "⚡"}},
+    ),
+    "login": _login,
+    "me": _me,
+}
+
+
+def _failed(response: httpx.Response) -> bool:
+    if response.status_code >= 400:
+        return True
+    if response.request.url.path.startswith("/graphql"):
+        return bool(response.json().get("errors"))
+    return False
+
+
+def summarize(latencies: List[float], statuses: Dict[str, int], errors: int, elapsed: float) -> dict:
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+    }
+    if len(latencies) >= 2:
+        quantiles = statistics.quantiles(latencies, n=100)
+        result.update(
+            p50_ms=round(quantiles[49] * 1000, 1),
+            p95_ms=round(quantiles[94] * 1000, 1),
+            p99_ms=round(quantiles[98] * 1000, 1),
+        )
+    return result
+
+
+async def run_scenario(session: Session, name: str, duration: float, concurrency: int) -> dict:
+    request = SCENARIOS[name]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await request(session)
+            except httpx.HTTPError as error:
+                errors += 1
+                statuses[type(error).__name__] = statuses.get(type(error).__name__, 0) + 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            status = str(response.status_code)
+            statuses[status] = statuses.get(status, 0) + 1
+            if _failed(response):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(latencies, statuses, errors, time.perf_counter() - started)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(
+    scenarios: List[str], duration: float, concurrency: int, base_url: Optional[str]
+) -> dict:
+    async with AsyncExitStack() as stack:
+        if base_url:
+            transport = None
+        else:
+            from app.main import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(
+                transport=transport,
+                base_url=base_url or "http://load-test",
+                timeout=60,
+                limits=httpx.Limits(max_connections=concurrency),
+            )
+        )
+        session = Session(client)
+        await session.setup()
+
+        results = {}
+        for name in scenarios:
+            results[name] = await run_scenario(session, name, duration, concurrency)
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "target": base_url or "in-process",
+        "duration_s": duration,
+        "concurrency": concurrency,
+        "settings": {
+            "GRAPHQL_ASYNC_RESOLVERS": settings.GRAPHQL_ASYNC_RESOLVERS,
+            "PASSWORD_HASH_WORKERS": settings.PASSWORD_HASH_WORKERS,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(before_path: str, after_path: str) -> None:
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    metrics = ["throughput_rps", "p50_ms", "p95_ms", "p99_ms", "errors"]
+    print(f"{'scenario':<16} {'metric':<15} {'before':>10} {'after':>10} {'change':>8}")
+    for name, result in after["scenarios"].items():
+        baseline = before["scenarios"].get(name)
+        if baseline is None:
+            continue
+        for metric in metrics:
+            old, new = baseline.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            change = f"{(new - old) / old * 100:+.0f}%" if old else ""
+            print(f"{name:<16} {metric:<15} {old:>10} {new:>10} {change:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=10, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--base-url", help="target a running server instead of the app in-process")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="diff two reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = asyncio.run(run(args.scenarios, args.duration, args.concurrency, args.base_url))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Rebuild the denormalized `reaction_counts` table from `reactions`.
+
+Run after restoring data, bulk-loading reactions, or whenever counters are
+suspected to have drifted. Usage (from the backend directory):
+
+    python -m scripts.reconcile_reaction_counts [--dry-run]
+"""
+import argparse
+
+from sqlalchemy import text
+
+from app.graphql.sync_db import get_sync_db
+from app.graphql.sync_repositories import RECONCILE_DRIFT_SQL, sync_reaction_repository
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only report how many counters have drifted"
+    )
+    args = parser.parse_args()
+
+    with get_sync_db() as db:
+        if args.dry_run:
+            drifted = db.execute(text(RECONCILE_DRIFT_SQL)).scalar_one()
+            print(f"{drifted} reaction counters out of sync")
+            return
+        drifted = sync_reaction_repository.rebuild_counts(db)
+    print(f"Rebuilt reaction counters ({drifted} were out of sync)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Bulk-load synthetic users, kudos and reactions through PostgreSQL COPY.
+
+Receivers and senders are drawn from Zipf-like distributions, so a few people
+collect most kudos. A share of the kudos lands in short bursts, like after an
+all-hands meeting. Reactions per kudos are heavy-tailed as well. IDs, emails,
+messages and timestamps all derive from --seed and --end, so the same
+arguments load the same rows. Every user gets one bcrypt hash of --password,
+computed once.
+
+Columns come from the models in app/models. Everything loads in one
+transaction: foreign keys and non-unique indexes are dropped for the COPYs and
+rebuilt afterwards (--keep-indexes maintains them instead), then
+`reaction_counts` is rebuilt from the loaded reactions. Usage (from the backend directory):
+
+    python -m scripts.seed_synthetic --users 50000 --kudos 3000000 --reactions 7000000
+    python -m scripts.seed_synthetic --users 1000 --kudos 20000 --reactions 50000 --seed 7 --truncate
+"""
+import argparse
+import hashlib
+import io
+import queue
+import random
+import threading
+import time
+from array import array
+from bisect import bisect
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import accumulate
+from typing import Callable, Iterator, List, Sequence
+
+from sqlalchemy import text
+
+from app.core.auth import pwd_context
+from app.graphql.sync_db import get_sync_db
+from app.graphql.sync_repositories import sync_reaction_repository
+from app.models.kudos import Kudos
+from app.models.reaction import Reaction
+from app.models.reaction_count import ReactionCount
+from app.models.user import User
+
+MESSAGES = [
+    "Thanks for jumping on the incident last night",
+    "Great demo today!",
+    "Your code review saved me hours",
+    "Thanks for mentoring the new folks",
+    "Amazing work on the release",
+    "Appreciate you covering my on-call shift",
+    "That design doc was super clear",
+    "Thanks for the help with the migration",
+]
+REACTION_TYPES = ["👍", "🎉", "❤️", "🚀", "👏", "🙌"]
+# Weights matching REACTION_TYPES
+REACTION_WEIGHTS = [40, 25, 15, 10, 7, 3]
+
+
+@lru_cache(maxsize=None)
+def _id_prefix(seed: int, kind: str) -> str:
+    digest = hashlib.blake2b(f"{seed}:{kind}".encode(), digest_size=10).hexdigest()
+    return f"{digest[:8]}-{digest[8:12]}-4{digest[13:16]}-a{digest[17:20]}-"
+
+
+def make_id(seed: int, kind: str, index: int) -> str:
+    """Deterministic UUIDv4 string for the index-th row of a kind, so rows can refer to each other.
+
+    The index is scrambled by an odd multiplier (a bijection mod 2**48), so IDs
+    land all over the primary key index like random ones do, at a fraction of
+    the cost of hashing every row.
+    """
+    return f"{_id_prefix(seed, kind)}{(index * 0x9E3779B97F4B) & 0xFFFFFFFFFFFF:012x}"
+
+
+def zipf_sampler(rng: random.Random, n: int, exponent: float) -> Callable[[], int]:
+    """Pick indexes 0..n-1 with weight 1 / rank**exponent over a shuffled ranking."""
+    cumulative = list(accumulate(1 / (rank**exponent) for rank in range(1, n + 1)))
+    ranking = list(range(n))
+    rng.shuffle(ranking)
+    total = cumulative[-1]
+    return lambda: ranking[min(bisect(cumulative, rng.random() * total), n - 1)]
+
+
+def _batches(rows: Iterator[tuple], batch_size: int, out: queue.Queue) -> None:
+    """Format rows of strings as COPY text in batches; runs on a thread so it overlaps the COPYs."""
+    try:
+        buffer, pending = io.StringIO(), 0
+        for row in rows:
+            buffer.write("\t".join(row))
+            buffer.write("\n")
+            pending += 1
+            if pending == batch_size:
+                out.put((buffer, pending))
+                buffer, pending = io.StringIO(), 0
+        if pending:
+            out.put((buffer, pending))
+        out.put(None)
+    except BaseException as error:
+        out.put(error)
+
+
+def _copy(cursor, table, columns: Sequence[str], rows: Iterator[tuple], batch_size: int) -> int:
+    """Stream rows into a table with COPY ... FROM STDIN in batches; returns the row count."""
+    statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN"
+    batches: queue.Queue = queue.Queue(maxsize=2)
+    threading.Thread(target=_batches, args=(rows, batch_size, batches), daemon=True).start()
+    total = 0
+    while (item := batches.get()) is not None:
+        if isinstance(item, BaseException):
+            raise item
+        buffer, count = item
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        total += count
+    return total
+
+
+def _defer_constraints(db, tables: List[str]) -> List[str]:
+    """Drop foreign keys and non-unique indexes of the tables; returns the DDL restoring them.
+
+    Building an index once over the loaded rows is much cheaper than
+    maintaining it row by row, and a foreign key added afterwards is checked in
+    one pass. Primary keys and unique constraints stay, so bad rows still fail.
+    """
+    foreign_keys = db.execute(
+        text(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE contype = 'f' AND conrelid::regclass::text = ANY(:tables)"
+        ),
+        {"tables": tables},
+    ).all()
+    indexes = db.execute(
+        text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = ANY(:tables) "
+            "AND indexdef NOT LIKE 'CREATE UNIQUE %'"
+        ),
+        {"tables": tables},
+    ).all()
+    for table, name, _ in foreign_keys:
+        db.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+    for name, _ in indexes:
+        db.execute(text(f'DROP INDEX "{name}"'))
+    return [definition for _, definition in indexes] + [
+        f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'
+        for table, name, definition in foreign_keys
+    ]
+
+
+class SyntheticData:
+    def __init__(self, args: argparse.Namespace, end: datetime):
+        self.args = args
+        self.seed = args.seed
+        self.rng = random.Random(args.seed)
+        self.end = end
+        self.span = args.days * 86400
+        # Kudos timestamps as seconds before `end`, kept for the reactions
+        self.kudos_age = array("d")
+
+    def users(self, password_hash: str) -> Iterator[tuple]:
+        start = self.end - timedelta(seconds=self.span)
+        for i in range(self.args.users):
+            # Sign-ups spread over the period, oldest first
+            created_at = start + timedelta(seconds=self.span * i / self.args.users)
+            yield (
+                make_id(self.seed, "user", i),
+                f"user{i}-{self.seed}@synthetic.example.com",
+                f"User {i}",
+                password_hash,
+                "t",
+                created_at.isoformat(),
+            )
+
+    def _kudos_ages(self) -> Iterator[float]:
+        rng, args = self.rng, self.args
+        bursts = [rng.random() * self.span for _ in range(args.bursts)]
+        for _ in range(args.kudos):
+            if bursts and rng.random() < args.burst_fraction:
+                age = rng.choice(bursts) - rng.expovariate(1 / args.burst_seconds)
+            else:
+                age = rng.random() * self.span
+            yield min(max(age, 0.0), self.span)
+
+    def kudos(self) -> Iterator[tuple]:
+        rng, args = self.rng, self.args
+        pick_receiver = zipf_sampler(rng, args.users, args.receiver_skew)
+        pick_sender = zipf_sampler(rng, args.users, args.sender_skew)
+        for i, age in enumerate(self._kudos_ages()):
+            self.kudos_age.append(age)
+            sender = pick_sender()
+            receiver = pick_receiver()
+            if receiver == sender:
+                receiver = (receiver + 1) % args.users
+            yield (
+                make_id(self.seed, "kudos", i),
+                f"{rng.choice(MESSAGES)} (#{i})",
+                make_id(self.seed, "user", sender),
+                make_id(self.seed, "user", receiver),
+                (self.end - timedelta(seconds=age)).isoformat(),
+            )
+
+    def reactions(self) -> Iterator[tuple]:
+        rng, args = self.rng, self.args
+        pick_user = zipf_sampler(rng, args.users, args.sender_skew)
+        type_weights = list(accumulate(REACTION_WEIGHTS))
+        # Pareto-distributed reactions per kudos, scaled to the requested total
+        alpha = args.reaction_tail
+        mean = alpha / (alpha - 1)
+        scale = args.reactions / args.kudos / mean
+        remaining = args.reactions
+        index = 0
+        for k in range(args.kudos):
+            if remaining <= 0:
+                break
+            wanted = min(int(rng.paretovariate(alpha) * scale + rng.random()), remaining)
+            seen = set()
+            for _ in range(wanted * 2):
+                if len(seen) == wanted:
+                    break
+                user = pick_user()
+                reaction_type = rng.choices(REACTION_TYPES, cum_weights=type_weights)[0]
+                if (user, reaction_type) in seen:
+                    continue
+                seen.add((user, reaction_type))
+                # Most reactions arrive within hours of the kudos
+                age = max(self.kudos_age[k] - rng.expovariate(1 / 7200), 0.0)
+                yield (
+                    make_id(self.seed, "reaction", index),
+                    make_id(self.seed, "user", user),
+                    make_id(self.seed, "kudos", k),
+                    reaction_type,
+                    (self.end - timedelta(seconds=age)).isoformat(),
+                )
+                index += 1
+            remaining -= len(seen)
+
+
+def load(args: argparse.Namespace, end: datetime) -> None:
+    data = SyntheticData(args, end)
+    password_hash = pwd_context.hash(args.password)
+    tables = [
+        (User.__table__, ["id", "email", "name", "password_hash", "is_active", "created_at"],
+         lambda: data.users(password_hash)),
+        (Kudos.__table__, ["id", "message", "sender_id", "receiver_id", "created_at"], data.kudos),
+        (Reaction.__table__, ["id", "user_id", "kudos_id", "reaction_type", "created_at"],
+         data.reactions),
+    ]
+
+    with get_sync_db() as db:
+        if args.truncate:
+            names = ", ".join(t.name for t in [ReactionCount.__table__] + [t for t, _, _ in tables])
+            db.execute(text(f"TRUNCATE {names}"))
+        restore: List[str] = []
+        if not args.keep_indexes:
+            db.execute(text(f"SET LOCAL maintenance_work_mem = '{args.maintenance_work_mem}'"))
+            restore = _defer_constraints(
+                db, [ReactionCount.__table__.name] + [t.name for t, _, _ in tables]
+            )
+        cursor = db.connection().connection.cursor()
+        for table, columns, rows in tables:
+            missing = set(columns) - set(table.columns.keys())
+            if missing:
+                raise SystemExit(f"{table.name} has no columns {sorted(missing)}")
+            started = time.perf_counter()
+            count = _copy(cursor, table, columns, rows(), args.batch_size)
+            elapsed = time.perf_counter() - started
+            print(f"{table.name:<10} {count:>10} rows in {elapsed:6.1f}s ({count / elapsed:,.0f} rows/s)")
+
+        started = time.perf_counter()
+        for statement in restore:
+            db.execute(text(statement))
+        if restore:
+            print(f"{'indexes':<10} restored in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        sync_reaction_repository.rebuild_counts(db)
+        print(f"{'counters':<10} rebuilt in {time.perf_counter() - started:.1f}s")
+
+        db.execute(text("ANALYZE"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--kudos", type=int, default=1_000_000)
+    parser.add_argument("--reactions", type=int, default=3_000_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--end", type=datetime.fromisoformat,
+        help="newest timestamp, ISO 8601 (default: today 00:00 UTC)",
+    )
+    parser.add_argument("--days", type=int, default=365, help="period the kudos span")
+    parser.add_argument("--receiver-skew", type=float, default=1.1, help="Zipf exponent")
+    parser.add_argument("--sender-skew", type=float, default=0.6, help="Zipf exponent")
+    parser.add_argument("--bursts", type=int, default=40, help="number of burst moments")
+    parser.add_argument("--burst-fraction", type=float, default=0.3, help="share of kudos in bursts")
+    parser.add_argument("--burst-seconds", type=float, default=900, help="mean burst spread")
+    parser.add_argument(
+        "--reaction-tail", type=float, default=1.5,
+        help="Pareto shape of reactions per kudos (lower is more skewed, must be > 1)",
+    )
+    parser.add_argument("--password", default="password123", help="password of every user")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows per COPY")
+    parser.add_argument(
+        "--truncate", action="store_true",
+        help="empty users, kudos, reactions and reaction_counts first",
+    )
+    parser.add_argument(
+        "--keep-indexes", action="store_true",
+        help="maintain indexes and foreign keys during the load instead of rebuilding them after",
+    )
+    parser.add_argument(
+        "--maintenance-work-mem", default="512MB", help="memory for rebuilding indexes"
+    )
+    args = parser.parse_args()
+    if args.users < 2 or args.kudos < 1 or args.reaction_tail <= 1:
+        parser.error("need at least 2 users, 1 kudos and --reaction-tail > 1")
+
+    end = args.end or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    started = time.perf_counter()
+    load(args, end)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
+from contextlib import contextmanager
+from typing import Sequence
+
 import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from app.models.base import Base
 from app.core.config import settings
+from app.db.query_stats import track
 
 
 @pytest.fixture
 async def test_db():
-    test_database_url = settings.DATABASE_URL.replace("peer", "peer_test")
+    test_database_url = make_url(settings.DATABASE_URI).set(database="peer_test")
     engine = create_async_engine(test_database_url, echo=False)
     
     async with engine.begin() as conn:
@@ -20,4 +27,66 @@ async def test_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
     
-    await engine.dispose()
\ No newline at end of file
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def scratch_database():
+    """Create throwaway databases next to the configured one.
+
+        url = scratch_database("peer_test_search", SEED_SQL)
+
+    Each is created from the models and then seeded with the given SQL
+    statements; returns its psycopg2 URL. Skips the test if Postgres isn't
+    reachable. Every database created is dropped when the session ends.
+    """
+    url = make_url(settings.DATABASE_URI).set(drivername="postgresql+psycopg2")
+    admin = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    created = []
+
+    def create(name: str, seed: Sequence[str] = ()) -> URL:
+        try:
+            with admin.connect() as conn:
+                conn.execute(text(f"DROP DATABASE IF EXISTS {name}"))
+                conn.execute(text(f"CREATE DATABASE {name} ENCODING 'UTF8' TEMPLATE template0"))
+        except OperationalError as error:
+            pytest.skip(f"Postgres not available: {error}")
+        created.append(name)
+
+        database = url.set(database=name)
+        engine = create_engine(database)
+        try:
+            Base.metadata.create_all(engine)
+            with engine.begin() as conn:
+                for statement in seed:
+                    conn.execute(text(statement))
+        finally:
+            engine.dispose()
+        return database
+
+    yield create
+
+    if created:
+        with admin.connect() as conn:
+            for name in created:
+                conn.execute(text(f"DROP DATABASE IF EXISTS {name}"))
+    admin.dispose()
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Fail if the enclosed code sends more than `limit` SQL statements.
+
+        with assert_max_queries(2):
+            schema.execute_sync(FEED_QUERY, context_value=context)
+    """
+
+    @contextmanager
+    def check(limit: int):
+        with track() as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"Expected at most {limit} queries, got {stats.count}:\n{stats.summary()}"
+        )
+
+    return check
@@ -0,0 +1,112 @@
+"""
+The shared cache against an in-memory Redis (fakeredis): generations shared
+between workers, TTLs, the local fallback while Redis is down, and async
+calls kept off the event loop.
+"""
+import asyncio
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from app.core.cache import Cache
+
+
+class _RecordingRedis(fakeredis.FakeRedis):
+    """FakeRedis noting which threads called it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def execute_command(self, *args, **options):
+        self.threads.add(threading.get_ident())
+        return super().execute_command(*args, **options)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def _cache(server, **kwargs) -> Cache:
+    return Cache(client=_RecordingRedis(server=server), **kwargs)
+
+
+def test_workers_share_values_and_generation(server):
+    first, second = _cache(server), _cache(server)
+    first.set("key", "value", ttl=60)
+    assert second.get("key") == "value"
+
+    before = second.generation()
+    first.invalidate()
+    assert second.generation() != before
+    assert first.shared and second.shared
+
+
+def test_entries_expire(server):
+    cache = _cache(server)
+    cache.set("key", "value", ttl=0.05)
+    assert cache.get("key") == "value"
+    time.sleep(0.1)
+    assert cache.get("key") is None
+
+
+def test_falls_back_to_local_cache_while_redis_is_down(server):
+    cache = _cache(server, retry_after=60)
+    server.connected = False
+
+    cache.set("key", "value", ttl=60)
+    assert cache.get("key") == "value"
+    assert not cache.shared
+    assert cache.stats()["redis_up"] is False
+
+    before = cache.generation()
+    cache.invalidate()
+    assert cache.generation() != before
+
+    # Expiry holds locally too
+    cache.set("short", "value", ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get("short") is None
+
+
+def test_recovery_invalidates_what_redis_held(server):
+    cache = _cache(server, retry_after=0)
+    before = cache.generation()
+    server.connected = False
+    cache.invalidate()  # only reaches the local counter
+    server.connected = True
+
+    # Entries Redis kept from before the outage miss that write
+    assert cache.generation() != before
+
+
+def test_async_calls_leave_the_event_loop(server):
+    cache = _cache(server)
+
+    async def use():
+        await cache.set_async("key", "value", 60)
+        value = await cache.get_async("key")
+        before = await cache.generation_async()
+        await cache.invalidate_async()
+        after = await cache.generation_async()
+        await cache.delete_async("key")
+        return value, before, after, await cache.get_async("key")
+
+    value, before, after, deleted = asyncio.run(use())
+    assert (value, deleted) == ("value", None)
+    assert before != after
+    assert threading.get_ident() not in cache._redis.threads
+
+
+def test_async_calls_without_redis_use_the_local_cache():
+    cache = Cache()
+
+    async def use():
+        await cache.set_async("key", "value", 60)
+        await cache.invalidate_async()
+        return await cache.get_async("key"), await cache.generation_async()
+
+    assert asyncio.run(use()) == ("value", "1")
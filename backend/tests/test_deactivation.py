@@ -0,0 +1,65 @@
+"""
+Deactivating an account through the API: a token whose user was cached by
+earlier requests must be refused right after, on REST and GraphQL alike.
+Runs the app against a scratch database; needs a reachable Postgres.
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.core.auth import create_access_token
+from app.core.config import settings
+from app.db.engines import engines
+from app.main import app
+
+TEST_DATABASE = "peer_test_deactivation"
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, name, password_hash, is_active)
+    VALUES (gen_random_uuid(), 'leaving@example.com', 'Leaving', '', true)
+    """,
+]
+
+SEND = """mutation($receiver: String!) {
+    sendKudos(input: {receiverId: $receiver, message: "Thanks"}) { id }
+}"""
+
+
+@pytest.fixture(scope="module")
+def user_id(scratch_database):
+    scratch_database(TEST_DATABASE, SEED_SQL)
+
+    asyncio.run(engines.dispose())
+    database_uri, engines.database_uri = engines.database_uri, str(
+        make_url(settings.DATABASE_URI).set(database=TEST_DATABASE)
+    )
+    with engines.sync_session() as db:
+        user_id = db.execute(text("SELECT id FROM users")).scalar()
+    yield str(user_id)
+
+    asyncio.run(engines.dispose())
+    engines.database_uri = database_uri
+
+
+def test_cached_token_is_refused_after_deactivation(user_id):
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': user_id})}"}
+    send = {"query": SEND, "variables": {"receiver": user_id}}
+
+    with TestClient(app) as client:
+        # Caches the token's user, on both paths
+        assert client.get("/api/auth/me", headers=headers).json()["is_active"] is True
+        assert "errors" not in client.post("/graphql", json=send, headers=headers).json()
+
+        response = client.post("/api/auth/me/deactivate", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["is_active"] is False
+
+        response = client.get("/api/auth/me", headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Inactive user"
+        errors = client.post("/graphql", json=send, headers=headers).json()["errors"]
+        assert errors[0]["message"] == "Authentication required"
@@ -0,0 +1,84 @@
+"""
+searchKudos paging: following the cursors must reach every match in the
+newest-first order and the whole rank window in relevance order, whichever
+plan served the pages. Runs against a scratch database with small scans so
+every plan is exercised; needs a reachable Postgres.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.graphql.sync_repositories import sync_kudos_repository
+from app.models.reaction import Reaction  # noqa: F401 - registers the relationship targets
+from app.models.user import User  # noqa: F401
+from app.repository.kudos_search import SearchOrder
+
+TEST_DATABASE = "peer_test_search"
+KUDOS = 5000
+SCAN_ROWS = 1000
+MAX_SCAN_ROWS = 20000
+RANK_WINDOW = 200
+PAGE = 50
+
+# Every kudos thanks someone, every 10th mentions the zebra, every 50th the
+# emu and every 1000th the yak. The relevance window is filled by the first
+# scan, by a wider one, by a wider one reading every kudos, and by the index.
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, name, password_hash, is_active)
+    VALUES (gen_random_uuid(), 'user@example.com', 'User', '', true)
+    """,
+    f"""
+    INSERT INTO kudos (id, message, sender_id, receiver_id, created_at)
+    SELECT gen_random_uuid(),
+           'Thanks for the help'
+           || CASE WHEN g % 10 = 0 THEN ' with the zebra' ELSE '' END
+           || CASE WHEN g % 50 = 0 THEN ' and the emu' ELSE '' END
+           || CASE WHEN g % 1000 = 0 THEN ' and the yak' ELSE '' END,
+           u.id, u.id, now() - g * interval '1 minute'
+    FROM generate_series(1, {KUDOS}) g, users u
+    """,
+]
+
+
+@pytest.fixture(scope="module")
+def engine(scratch_database):
+    engine = create_engine(scratch_database(TEST_DATABASE, SEED_SQL))
+    yield engine
+    engine.dispose()
+
+
+def _page_through(db: Session, query: str, order: SearchOrder) -> list:
+    """Ids of every result, following cursors the way the resolvers do."""
+    ids, after = [], None
+    while True:
+        hits = sync_kudos_repository.search(
+            db,
+            query,
+            order,
+            limit=PAGE + 1,
+            after=after,
+            rank_window=RANK_WINDOW,
+            scan_rows=SCAN_ROWS,
+            max_scan_rows=MAX_SCAN_ROWS,
+        )
+        page = hits[:PAGE]
+        ids += [hit.id for hit in page]
+        if len(hits) <= PAGE:
+            return ids
+        after = (page[-1].rank, page[-1].created_at, page[-1].id)
+
+
+@pytest.mark.parametrize(
+    "query, matches",
+    [("thanks", KUDOS), ("zebra", KUDOS // 10), ("emu", KUDOS // 50), ("yak", KUDOS // 1000)],
+)
+def test_paging_reaches_every_result(engine, query, matches):
+    with Session(engine) as db:
+        recent = _page_through(db, query, SearchOrder.RECENT)
+        relevant = _page_through(db, query, SearchOrder.RELEVANCE)
+
+    assert len(recent) == len(set(recent)) == matches
+    assert len(relevant) == len(set(relevant)) == min(matches, RANK_WINDOW)
+    # The window holds the newest matches, whatever their rank
+    assert set(relevant) == set(recent[:RANK_WINDOW])
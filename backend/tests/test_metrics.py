@@ -0,0 +1,38 @@
+"""
+The /metrics endpoint: once METRICS_TOKEN is set, only scrapes carrying it
+as a bearer token get the exposition.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.metrics import router
+from app.core.config import settings
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_open_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 200
+
+
+@pytest.mark.parametrize("authorization", [None, "Bearer wrong", "scrape-secret", b"Bearer \xe9"])
+def test_token_required_once_set(client, monkeypatch, authorization):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    headers = {"Authorization": authorization} if authorization else {}
+    response = client.get("/metrics", headers=headers)
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+
+
+def test_token_accepted(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert "# TYPE" in response.text
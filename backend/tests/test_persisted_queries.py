@@ -0,0 +1,53 @@
+"""
+The persisted query allow-list must hold on every transport, WebSocket
+subscriptions and operations included, not only for HTTP requests.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from strawberry.fastapi import GraphQLRouter
+
+from app.graphql import schema as graphql_schema
+from app.graphql.persisted_queries import persisted_query_store, query_hash
+
+ALLOWED = "query Allowed { __typename }"
+NOT_ALLOWED_ERROR = {
+    "message": "PersistedQueryNotAllowed",
+    "extensions": {"code": "PERSISTED_QUERY_NOT_ALLOWED"},
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(persisted_query_store, "allow_list_only", True)
+    monkeypatch.setattr(persisted_query_store, "manifest", {query_hash(ALLOWED): ALLOWED})
+    app = FastAPI()
+    app.include_router(GraphQLRouter(graphql_schema.build_schema()), prefix="/graphql")
+    with TestClient(app) as client:
+        yield client
+
+
+def _run_over_websocket(client, query: str) -> dict:
+    """Send one operation over graphql-transport-ws; returns the first reply."""
+    with client.websocket_connect("/graphql", subprotocols=["graphql-transport-ws"]) as ws:
+        ws.send_json({"type": "connection_init"})
+        assert ws.receive_json()["type"] == "connection_ack"
+        ws.send_json({"type": "subscribe", "id": "1", "payload": {"query": query}})
+        return ws.receive_json()
+
+
+def test_subscription_not_in_manifest_is_refused(client):
+    reply = _run_over_websocket(client, "subscription { kudosCreated { id } }")
+    assert reply["type"] == "error"
+    assert reply["payload"] == [NOT_ALLOWED_ERROR]
+
+
+def test_websocket_query_not_in_manifest_is_refused(client):
+    reply = _run_over_websocket(client, "{ __typename }")
+    assert reply["type"] == "error"
+    assert reply["payload"] == [NOT_ALLOWED_ERROR]
+
+
+def test_websocket_query_in_manifest_runs(client):
+    reply = _run_over_websocket(client, ALLOWED)
+    assert reply == {"type": "next", "id": "1", "payload": {"data": {"__typename": "Query"}}}
@@ -0,0 +1,137 @@
+"""
+Query budgets for the feed operations: each must send a fixed number of
+statements however many kudos a page holds, so an N+1 fails here instead of
+being found in production. The emitted SQL must also join users and load
+reactions only when the query selects them. Runs the sync resolvers against a
+small scratch database; needs a reachable Postgres.
+"""
+import asyncio
+import re
+
+import pytest
+import strawberry
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.db.engines import engines
+from app.db.query_stats import track
+from app.graphql import schema as graphql_schema
+
+TEST_DATABASE = "peer_test_queries"
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, name, password_hash, is_active, created_at)
+    SELECT gen_random_uuid(), 'user' || g || '@example.com', 'User ' || g, '', true,
+           now() - g * interval '1 hour'
+    FROM generate_series(1, 50) g
+    """,
+    """
+    WITH u AS (SELECT array_agg(id) AS ids FROM users)
+    INSERT INTO kudos (id, message, sender_id, receiver_id, created_at)
+    SELECT gen_random_uuid(), 'Thanks #' || g, ids[1 + g % 50], ids[1 + (g * 7) % 50],
+           now() - g * interval '1 minute'
+    FROM generate_series(1, 200) g, u
+    """,
+    """
+    INSERT INTO reactions (id, user_id, kudos_id, reaction_type)
+    SELECT gen_random_uuid(), u.id, k.id, '👍'
+    FROM (SELECT id FROM users LIMIT 5) u, kudos k
+    """,
+    """
+    INSERT INTO reaction_counts (id, kudos_id, reaction_type, count)
+    SELECT gen_random_uuid(), kudos_id, reaction_type, count(*)
+    FROM reactions GROUP BY kudos_id, reaction_type
+    """,
+]
+
+KUDOS_FIELDS = """
+    id message createdAt
+    sender { id name } receiver { id name }
+    reactions { reactionType count userReacted }
+"""
+
+# Operation -> most statements it may send
+BUDGETS = {
+    f"{{ kudos(limit: 50) {{ {KUDOS_FIELDS} }} }}": 2,
+    f"{{ kudosConnection(first: 50) {{ edges {{ node {{ {KUDOS_FIELDS} }} }} }} }}": 2,
+    f"""query($id: UUID!) {{
+        kudosReceived(userId: $id, limit: 50) {{ {KUDOS_FIELDS} }}
+    }}""": 2,
+    "{ usersConnection(first: 50) { edges { node { id name email } } } }": 1,
+    f"""{{ searchKudos(query: "thanks", first: 50) {{
+        edges {{ node {{ rank snippet kudos {{ {KUDOS_FIELDS} }} }} }}
+    }} }}""": 2,
+}
+
+
+# Operation -> (joins the sender, joins the receiver, loads reactions)
+JOINS = {
+    "{ kudosConnection(first: 5) { edges { node { id message } } } }": (False, False, False),
+    "{ kudos(limit: 5) { id sender { name } } }": (True, False, False),
+    """query($id: UUID!) {
+        kudosReceived(userId: $id, limit: 5) { id receiver { name } reactions { count } }
+    }""": (False, True, True),
+    '{ searchKudos(query: "thanks", first: 5) { edges { node { kudos { id } } } } }': (
+        False, False, False
+    ),
+    f"{{ kudos(limit: 5) {{ {KUDOS_FIELDS} }} }}": (True, True, True),
+}
+
+
+class _Request:
+    headers: dict = {}
+
+
+@pytest.fixture(scope="module")
+def schema(scratch_database):
+    scratch_database(TEST_DATABASE, SEED_SQL)
+
+    # Resolvers reach the database through the shared registry; point it at
+    # the scratch database, and keep the hot feed out of the way
+    asyncio.run(engines.dispose())
+    database_uri, engines.database_uri = engines.database_uri, str(
+        make_url(settings.DATABASE_URI).set(database=TEST_DATABASE)
+    )
+    hot_feed, graphql_schema.hot_feed = graphql_schema.hot_feed, None
+    yield strawberry.Schema(query=graphql_schema.Query, mutation=graphql_schema.Mutation)
+
+    graphql_schema.hot_feed = hot_feed
+    asyncio.run(engines.dispose())
+    engines.database_uri = database_uri
+
+
+@pytest.mark.parametrize("query", BUDGETS, ids=lambda q: q.split("(")[0].strip("{ query$"))
+def test_operation_query_budget(query, schema, assert_max_queries):
+    with engines.sync_session() as db:
+        receiver = db.execute(text("SELECT receiver_id FROM kudos LIMIT 1")).scalar()
+    with assert_max_queries(BUDGETS[query]):
+        result = schema.execute_sync(
+            query, variable_values={"id": str(receiver)}, context_value={"request": _Request()}
+        )
+    assert not result.errors
+
+
+def _joins(statements, column: str) -> bool:
+    pattern = re.compile(rf"JOIN users(?: AS \w+)? ON \w+\.id = kudos\.{column}")
+    return any(pattern.search(statement) for statement in statements)
+
+
+@pytest.mark.parametrize("query", JOINS, ids=lambda q: q.split("(")[0].strip("{ query$"))
+def test_operation_joins_only_selected_users(query, schema):
+    with engines.sync_session() as db:
+        user_id = db.execute(text("SELECT receiver_id FROM kudos LIMIT 1")).scalar()
+    with track() as stats:
+        result = schema.execute_sync(
+            query, variable_values={"id": str(user_id)}, context_value={"request": _Request()}
+        )
+    assert not result.errors
+
+    statements = list(stats.statements)
+    sender, receiver, reactions = JOINS[query]
+    assert _joins(statements, "sender_id") == sender, stats.summary()
+    assert _joins(statements, "receiver_id") == receiver, stats.summary()
+    assert any("FROM reaction" in statement for statement in statements) == reactions, (
+        stats.summary()
+    )
@@ -0,0 +1,111 @@
+"""
+Concurrent reaction toggles: however they interleave, none may fail and
+every reaction counter must equal the number of reaction rows it counts.
+Runs against a scratch database; needs a reachable Postgres.
+"""
+import asyncio
+import random
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.models.kudos import Kudos
+from app.models.reaction import Reaction
+from app.models.reaction_count import ReactionCount
+from app.models.user import User
+from app.repository.reaction_repository import reaction_repository
+
+TEST_DATABASE = "peer_test_reactions"
+USERS = 30
+CONCURRENCY = 20
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (id, email, name, password_hash, is_active)
+    SELECT gen_random_uuid(), 'user' || g || '@example.com', 'User ' || g, '', true
+    FROM generate_series(1, {USERS}) g
+    """,
+    """
+    INSERT INTO kudos (id, message, sender_id, receiver_id)
+    SELECT gen_random_uuid(), 'Thanks', id, id FROM users LIMIT 1
+    """,
+]
+
+
+@pytest.fixture(scope="module")
+def database_url(scratch_database):
+    scratch_database(TEST_DATABASE, SEED_SQL)
+    return make_url(settings.DATABASE_URI).set(database=TEST_DATABASE)
+
+
+async def _toggle_concurrently(url, jobs):
+    """Run one toggle per (user index, reaction type) job, CONCURRENCY at a time.
+
+    Returns the errors raised and, per reaction type, the reaction rows and
+    the counter.
+    """
+    engine = create_async_engine(url, pool_size=CONCURRENCY, max_overflow=0)
+    Session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with Session() as db:
+        kudos_id = await db.scalar(select(Kudos.id))
+        user_ids = (await db.scalars(select(User.id).order_by(User.email))).all()
+
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    errors = []
+
+    async def toggle(user, reaction_type):
+        async with semaphore, Session() as db:
+            try:
+                await reaction_repository.toggle(
+                    db, kudos_id=kudos_id, user_id=user_ids[user], reaction_type=reaction_type
+                )
+                await db.commit()
+            except Exception as error:
+                errors.append(error)
+
+    await asyncio.gather(*(toggle(user, reaction_type) for user, reaction_type in jobs))
+
+    totals = {}
+    async with Session() as db:
+        for reaction_type in {reaction_type for _, reaction_type in jobs}:
+            rows = await db.scalar(
+                select(func.count()).select_from(Reaction).where(
+                    Reaction.kudos_id == kudos_id, Reaction.reaction_type == reaction_type
+                )
+            )
+            counter = await db.scalar(
+                select(ReactionCount.count).where(
+                    ReactionCount.kudos_id == kudos_id, ReactionCount.reaction_type == reaction_type
+                )
+            )
+            totals[reaction_type] = (rows, counter or 0)
+    await engine.dispose()
+    return errors, totals
+
+
+def test_one_user_toggling_one_reaction(database_url):
+    # Double-clicks: the same (user, kudos, type) toggled many times at once
+    errors, totals = asyncio.run(_toggle_concurrently(database_url, [(0, "same")] * 40))
+
+    assert errors == []
+    rows, counter = totals["same"]
+    assert rows in (0, 1)
+    assert counter == rows
+
+
+def test_many_users_toggling(database_url):
+    jobs = [
+        (user, reaction_type)
+        for user in range(USERS)
+        for reaction_type in ("many-a", "many-b")
+        for _ in range(5)
+    ]
+    random.shuffle(jobs)
+    errors, totals = asyncio.run(_toggle_concurrently(database_url, jobs))
+
+    assert errors == []
+    for reaction_type, (rows, counter) in totals.items():
+        assert counter == rows, reaction_type
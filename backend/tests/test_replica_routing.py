@@ -0,0 +1,135 @@
+"""
+Replica routing against a stand-in replica: a second database on the same
+server holding different data, so each read shows where it was routed.
+Needs a reachable Postgres.
+"""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.db import routing
+from app.db.engines import EngineRegistry
+from app.models.kudos import Kudos  # noqa: F401 - registers the relationship targets
+from app.models.reaction import Reaction  # noqa: F401
+from app.models.user import User
+
+PRIMARY, REPLICA = "peer_test_primary", "peer_test_replica"
+USER_ID = uuid.uuid4()
+
+
+@pytest.fixture(scope="module")
+def registry(scratch_database):
+    # The same user in both, named after the database it lives in
+    for database in (PRIMARY, REPLICA):
+        scratch_database(database, [
+            "INSERT INTO users (id, email, name, password_hash, is_active) "
+            f"VALUES ('{USER_ID}', 'who@example.com', '{database}', '', true)"
+        ])
+
+    url = make_url(settings.DATABASE_URI)
+    registry = EngineRegistry(
+        str(url.set(database=PRIMARY)), 8, 0.5, [str(url.set(database=REPLICA))]
+    )
+    yield registry
+    asyncio.run(registry.dispose())
+
+
+@pytest.fixture
+def requester():
+    token = routing._requester.set(routing.Requester(uuid.uuid4().hex))
+    yield
+    routing._requester.reset(token)
+
+
+def _name(db, **options) -> str:
+    return db.scalar(select(User.name).where(User.id == USER_ID).execution_options(**options))
+
+
+def test_reads_go_to_replica(registry):
+    with registry.sync_session() as db:
+        assert _name(db) == REPLICA
+        assert db.scalar(select(User.name).with_for_update()) == PRIMARY
+
+
+def test_on_primary(registry):
+    with routing.on_primary(), registry.sync_session() as db:
+        assert _name(db) == PRIMARY
+
+
+def test_session_stays_on_primary_after_writing(registry):
+    with registry.sync_session() as db:
+        assert _name(db) == REPLICA
+        db.add(User(email=f"{uuid.uuid4()}@example.com", name="new", password_hash=""))
+        db.flush()
+        assert _name(db) == PRIMARY
+        db.rollback()
+        assert _name(db) == REPLICA
+
+
+def test_requester_reads_own_writes(registry, requester):
+    with registry.sync_session() as db:
+        db.add(User(email=f"{uuid.uuid4()}@example.com", name="new", password_hash=""))
+        db.commit()
+    with registry.sync_session() as db:
+        assert _name(db) == PRIMARY
+
+    # Someone else still reads from the replica
+    token = routing._requester.set(routing.Requester("someone-else"))
+    try:
+        with registry.sync_session() as db:
+            assert _name(db) == REPLICA
+    finally:
+        routing._requester.reset(token)
+
+
+def test_async_sessions_route_too(registry):
+    async def names():
+        async with registry.async_session() as db:
+            replica = await db.scalar(select(User.name).where(User.id == USER_ID))
+        with routing.on_primary():
+            async with registry.async_session() as db:
+                primary = await db.scalar(select(User.name).where(User.id == USER_ID))
+        return replica, primary
+
+    assert asyncio.run(names()) == (REPLICA, PRIMARY)
+
+
+def test_middleware_pins_writers_for_their_next_request(registry):
+    names = []
+
+    async def app(scope, receive, send):
+        if scope["method"] == "POST":
+            with registry.sync_session() as db:
+                db.add(User(email=f"{uuid.uuid4()}@example.com", name="new", password_hash=""))
+                db.commit()
+        else:
+            with registry.sync_session() as db:
+                names.append(_name(db))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def request(method: str, authorization: bytes):
+        async def send(message):
+            pass
+
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": "/api/v1/users",
+            "headers": [(b"authorization", authorization)],
+        }
+        await routing.ReplicaRoutingMiddleware(app)(scope, None, send)
+
+    async def run():
+        writer = f"Bearer {uuid.uuid4()}".encode()
+        await request("GET", writer)
+        await request("POST", writer)
+        await request("GET", writer)
+        await request("GET", f"Bearer {uuid.uuid4()}".encode())
+
+    asyncio.run(run())
+    assert names == [REPLICA, PRIMARY, REPLICA]
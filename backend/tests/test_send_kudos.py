@@ -0,0 +1,135 @@
+"""
+sendKudos and sendKudosBatch hold messages to the same rules: a batch reports
+each broken item by index and still sends the rest, a single broken kudos
+fails without being stored. Covers the sync and the async resolvers against
+a scratch database; needs a reachable Postgres.
+"""
+import asyncio
+import uuid
+
+import pytest
+import strawberry
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.engines import engines
+from app.graphql import schema as graphql_schema
+from app.graphql.async_resolvers import AsyncMutation, AsyncQuery
+
+TEST_DATABASE = "peer_test_send_kudos"
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, name, password_hash, is_active)
+    SELECT gen_random_uuid(), 'user' || g || '@example.com', 'User ' || g, '', true
+    FROM generate_series(1, 2) g
+    """,
+]
+
+SEND = """mutation($input: SendKudosInput!) {
+    sendKudos(input: $input) { message }
+}"""
+SEND_BATCH = """mutation($inputs: [SendKudosInput!]!) {
+    sendKudosBatch(inputs: $inputs) { index error kudos { message } }
+}"""
+
+SCHEMAS = {
+    "sync": strawberry.Schema(query=graphql_schema.Query, mutation=graphql_schema.Mutation),
+    "async": strawberry.Schema(query=AsyncQuery, mutation=AsyncMutation),
+}
+
+
+class _Request:
+    def __init__(self, token: str):
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="module")
+def users(scratch_database):
+    scratch_database(TEST_DATABASE, SEED_SQL)
+
+    asyncio.run(engines.dispose())
+    database_uri, engines.database_uri = engines.database_uri, str(
+        make_url(settings.DATABASE_URI).set(database=TEST_DATABASE)
+    )
+    with engines.sync_session() as db:
+        users = db.execute(text("SELECT id FROM users ORDER BY email")).scalars().all()
+    yield users
+
+    asyncio.run(engines.dispose())
+    engines.database_uri = database_uri
+
+
+def _execute(schema: strawberry.Schema, query: str, sender, variables: dict):
+    async def execute():
+        try:
+            return await schema.execute(
+                query,
+                variable_values=variables,
+                context_value={"request": _Request(create_access_token(sender))},
+            )
+        finally:
+            # The async engine belongs to this event loop
+            await engines.dispose()
+
+    return asyncio.run(execute())
+
+
+def _stored(message: str) -> int:
+    with engines.sync_session() as db:
+        return db.execute(
+            text("SELECT count(*) FROM kudos WHERE message = :message"), {"message": message}
+        ).scalar()
+
+
+@pytest.mark.parametrize("resolvers", SCHEMAS)
+def test_batch_reports_invalid_items_and_sends_the_rest(users, resolvers):
+    sender, receiver = users
+    first, last = f"Thanks {uuid.uuid4()}", f"Cheers {uuid.uuid4()}"
+    inputs = [
+        {"receiverId": str(receiver), "message": first},
+        {"receiverId": str(receiver), "message": ""},
+        {"receiverId": str(receiver), "message": "x" * 1001},
+        {"receiverId": "not-a-uuid", "message": "Thanks"},
+        {"receiverId": str(uuid.uuid4()), "message": "Thanks"},
+        {"receiverId": str(receiver), "message": last},
+    ]
+
+    result = _execute(SCHEMAS[resolvers], SEND_BATCH, sender, {"inputs": inputs})
+    assert result.errors is None
+    items = result.data["sendKudosBatch"]
+    assert [item["index"] for item in items] == list(range(len(inputs)))
+
+    assert items[0] == {"index": 0, "error": None, "kudos": {"message": first}}
+    assert items[5] == {"index": 5, "error": None, "kudos": {"message": last}}
+    for item in items[1:3]:
+        assert item["kudos"] is None
+        assert item["error"].startswith("Invalid message: ")
+    assert items[3]["error"] == "Invalid receiver id"
+    assert items[4]["error"] == f"Receiver with id {inputs[4]['receiverId']} not found"
+    assert _stored(first) == _stored(last) == 1
+
+
+@pytest.mark.parametrize("resolvers", SCHEMAS)
+@pytest.mark.parametrize("message", ["", "x" * 1001], ids=["empty", "too-long"])
+def test_single_kudos_with_an_invalid_message_is_not_sent(users, resolvers, message):
+    sender, receiver = users
+    result = _execute(
+        SCHEMAS[resolvers], SEND, sender, {"input": {"receiverId": str(receiver), "message": message}}
+    )
+    assert result.errors[0].message.startswith("Invalid message: ")
+    assert _stored(message) == 0
+
+
+@pytest.mark.parametrize("resolvers", SCHEMAS)
+def test_single_kudos_is_sent(users, resolvers):
+    sender, receiver = users
+    message = f"Thanks {uuid.uuid4()}"
+    result = _execute(
+        SCHEMAS[resolvers], SEND, sender, {"input": {"receiverId": str(receiver), "message": message}}
+    )
+    assert result.errors is None
+    assert result.data["sendKudos"] == {"message": message}
+    assert _stored(message) == 1